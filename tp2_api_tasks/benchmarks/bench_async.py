@@ -0,0 +1,201 @@
+"""
+Benchmark de latence p50/p99 des routes sync (`def`) et async (`async def`).
+
+Démarre dans un processus uvicorn les routes de lecture par ID, de
+page et de bascule de l'API, sur le service de main.py pré-rempli de
+10 000 tâches, en deux variantes (mêmes corps, sans middleware):
+- sync: routes `def` (chaque requête occupe un thread du pool de
+  Starlette, 40 au plus), comme avant les routes async;
+- async: routes `async def` sur AsyncTaskService (appels directs sur le
+  stockage en mémoire, pool borné pour SQLite), comme main.py.
+Un client asyncio ouvre ensuite 1 000 connexions HTTP persistantes qui
+envoient chacune leurs requêtes en boucle: lectures par ID (80%), pages
+de 20 tâches (10%) et bascules (10%). Affiche le débit et les latences
+p50, p99 et maximale.
+
+Usage:
+    python benchmarks/bench_async.py
+    python benchmarks/bench_async.py --storage memory sqlite --connections 1000 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+SRC = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+HOST = "127.0.0.1"
+TASKS = 10_000
+
+
+def serve(variant: str, port: int) -> None:
+    """Lance l'API (variante `variant`) pré-remplie; appelé dans le processus serveur."""
+    import uvicorn
+    from fastapi import FastAPI, HTTPException, Response
+
+    import main as api
+    import server
+    from models import Task, TaskCreate, TaskNotFoundError
+
+    api.task_service.create_many([TaskCreate(title=f"Tâche numéro {i}") for i in range(TASKS)])
+    app = FastAPI()
+    if variant == "sync":
+
+        @app.get("/tasks/{task_id}")
+        def get_task(task_id: int) -> Response:
+            try:
+                body, version = api.task_service.get_json(task_id)
+            except TaskNotFoundError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            return Response(body, media_type="application/json", headers={"ETag": f'"task-{task_id}-{version}"'})
+
+        @app.get("/tasks")
+        def list_tasks(limit: int, after_id: int) -> Response:
+            body, _, _, _ = api.task_service.list_page_json(None, after_id, limit)
+            return Response(body, media_type="application/json")
+
+        @app.patch("/tasks/{task_id}/toggle")
+        def toggle_task(task_id: int) -> Task:
+            return api.task_service.toggle(task_id)
+    else:
+
+        @app.get("/tasks/{task_id}")
+        async def get_task(task_id: int) -> Response:
+            try:
+                body, version = await api._tasks().get_json(task_id)
+            except TaskNotFoundError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            return Response(body, media_type="application/json", headers={"ETag": f'"task-{task_id}-{version}"'})
+
+        @app.get("/tasks")
+        async def list_tasks(limit: int, after_id: int) -> Response:
+            body, _, _, _ = await api._tasks().list_page_json(None, after_id, limit)
+            return Response(body, media_type="application/json")
+
+        @app.patch("/tasks/{task_id}/toggle")
+        async def toggle_task(task_id: int) -> Task:
+            return await api._tasks().toggle(task_id)
+
+    uvicorn.run(app, host=HOST, port=port, http=server.NoDelayH11Protocol, log_level="warning")
+
+
+async def connection(port: int, deadline: float, seed: int, latencies: List[float]) -> int:
+    """Connexion persistante: requêtes en boucle jusqu'à `deadline`; renvoie le nombre d'erreurs."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(HOST, port)
+    errors = 0
+    try:
+        while time.monotonic() < deadline:
+            task_id = rng.randint(1, TASKS)
+            roll = rng.random()
+            if roll < 0.8:
+                request = f"GET /tasks/{task_id} HTTP/1.1\r\nHost: bench\r\n\r\n"
+            elif roll < 0.9:
+                request = f"GET /tasks?limit=20&after_id={task_id} HTTP/1.1\r\nHost: bench\r\n\r\n"
+            else:
+                request = f"PATCH /tasks/{task_id}/toggle HTTP/1.1\r\nHost: bench\r\nContent-Length: 0\r\n\r\n"
+            start = time.perf_counter()
+            writer.write(request.encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def load(port: int, connections: int, duration: float) -> Tuple[List[float], int, float]:
+    """Charge l'API avec `connections` connexions pendant `duration` secondes."""
+    latencies: List[float] = []
+    start = time.monotonic()
+    deadline = start + duration
+    errors = await asyncio.gather(*(
+        connection(port, deadline, seed, latencies) for seed in range(connections)
+    ))
+    return latencies, sum(errors), time.monotonic() - start
+
+
+def wait_ready(port: int, timeout: float = 60.0) -> None:
+    """Attend que l'API accepte les connexions sur `port`."""
+    async def probe() -> None:
+        _, writer = await asyncio.open_connection(HOST, port)
+        writer.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"L'API ne répond pas sur le port {port}")
+
+
+def run(variant: str, storage: str, args: argparse.Namespace, directory: str) -> List[float]:
+    """Mesure une variante; renvoie req/s, p50, p99 et max (ms) et le nombre d'erreurs."""
+    env = dict(
+        os.environ,
+        TASKS_STORAGE=storage,
+        TASKS_DB_PATH=str(Path(directory) / f"{variant}.db"),
+        TASKS_LOG_LEVEL="WARNING",
+    )
+    process = subprocess.Popen(
+        [sys.executable, __file__, "--serve", variant, "--port", str(args.port)],
+        cwd=SRC,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(args.port)
+        latencies, errors, elapsed = asyncio.run(load(args.port, args.connections, args.duration))
+    finally:
+        process.terminate()
+        process.wait()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return [len(latencies) / elapsed, quantiles[49] * 1000, quantiles[98] * 1000, max(latencies) * 1000, errors]
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--storage", nargs="+", default=["memory", "sqlite"])
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--serve", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    print(f"cœurs disponibles: {os.cpu_count()}, connexions: {args.connections}")
+    print(f"{'stockage':>8} | {'routes':>6} | {'req/s':>7} | {'p50':>9} | {'p99':>9} | {'max':>9} | {'erreurs':>7}")
+    print("-" * 72)
+    with tempfile.TemporaryDirectory() as directory:
+        for storage in args.storage:
+            for variant in ("sync", "async"):
+                rps, p50, p99, worst, errors = run(variant, storage, args, directory)
+                print(
+                    f"{storage:>8} | {variant:>6} | {rps:>7.0f} | {p50:>7.1f}ms | {p99:>7.1f}ms | "
+                    f"{worst:>7.1f}ms | {errors:>7.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
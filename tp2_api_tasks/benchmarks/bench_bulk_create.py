@@ -0,0 +1,72 @@
+"""
+Benchmark de la création en masse face à la création unitaire.
+
+Compare, via le client de test FastAPI, N appels à POST /tasks avec un
+seul appel à POST /tasks/bulk, pour 10k et 100k tâches.
+
+Usage:
+    python benchmarks/bench_bulk_create.py
+    python benchmarks/bench_bulk_create.py --sizes 10000
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import main  # noqa: E402
+
+
+DEFAULT_SIZES: List[int] = [10_000, 100_000]
+
+
+def fresh_client() -> TestClient:
+    """Crée un client de test branché sur un service vierge."""
+    main.task_service = main.TaskService()
+    return TestClient(main.app)
+
+
+def bench_one_by_one(size: int) -> float:
+    """Crée `size` tâches avec POST /tasks et renvoie la durée en secondes."""
+    client = fresh_client()
+    start = time.perf_counter()
+    for i in range(size):
+        client.post("/tasks", json={"title": f"Tâche {i}"})
+    return time.perf_counter() - start
+
+
+def bench_bulk(size: int) -> float:
+    """Crée `size` tâches avec POST /tasks/bulk et renvoie la durée en secondes."""
+    client = fresh_client()
+    payload = [{"title": f"Tâche {i}"} for i in range(size)]
+    start = time.perf_counter()
+    response = client.post("/tasks/bulk", json=payload)
+    elapsed = time.perf_counter() - start
+    assert response.json()["count"] == size
+    return elapsed
+
+
+def main_bench() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"{'tâches':>8} | {'unitaire s':>10} | {'bulk s':>8} | {'gain':>6}")
+    print("-" * 42)
+    for size in args.sizes:
+        single = bench_one_by_one(size)
+        bulk = bench_bulk(size)
+        print(f"{size:>8} | {single:>10.2f} | {bulk:>8.3f} | {single / bulk:>5.0f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,113 @@
+"""
+Benchmark de l'empreinte mémoire: stockage en mémoire vs stockage en colonnes.
+
+Pour chaque volume, remplit via TaskService.create_many() (une tâche sur
+trois terminée, une sur deux avec description):
+- memory: MemoryTaskStore (objets Task, index triés, index plein texte);
+- memory sans index: MemoryTaskStore sans index plein texte (état après
+  un redémarrage depuis un instantané du journal);
+- compact: CompactTaskStore (colonnes, index plein texte à la demande).
+Affiche les octets par tâche mesurés par tracemalloc, puis le temps du
+remplissage, des compteurs de /stats, d'une page filtrée par `done` au
+milieu du stockage, de la liste complète des IDs terminés et d'une
+lecture par ID.
+
+Usage:
+    python benchmarks/bench_compact.py
+    python benchmarks/bench_compact.py --sizes 100000 1000000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compact import CompactTaskStore
+from main import TaskService
+from models import TaskCreate
+from storage import MemoryTaskStore, TaskStore
+
+
+def memory_without_index() -> TaskStore:
+    """MemoryTaskStore dont l'index plein texte sera construit à la demande."""
+    store = MemoryTaskStore()
+    store._search_index = None
+    return store
+
+
+STORES: Dict[str, Callable[[], TaskStore]] = {
+    "memory": MemoryTaskStore,
+    "memory sans index": memory_without_index,
+    "compact": CompactTaskStore,
+}
+
+
+def fill(service: TaskService, creates: List[TaskCreate]) -> None:
+    """Crée les tâches par lots, une sur trois terminée."""
+    for start in range(0, len(creates), 10_000):
+        service.create_many(creates[start:start + 10_000])
+    service.toggle_many(list(range(1, len(creates) + 1, 3)))
+
+
+def timed_us(call: Callable[[], object], repeat: int = 20) -> float:
+    """Meilleur temps d'un appel, en microsecondes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best * 1_000_000
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(
+        f"{'tâches':>8} | {'stockage':>17} | {'octets/tâche':>12} | {'remplissage':>11} | "
+        f"{'stats':>7} | {'page done':>9} | {'IDs done':>9} | {'get':>6}"
+    )
+    print("-" * 100)
+    for size in args.sizes:
+        creates = [
+            TaskCreate(title=f"Tâche numéro {i}", description="Description de la tâche" if i % 2 else None)
+            for i in range(size)
+        ]
+        for name, factory in STORES.items():
+            gc.collect()
+            tracemalloc.start()
+            service = TaskService(factory(), json_cache=False)
+            fill(service, creates)
+            gc.collect()
+            per_task = tracemalloc.get_traced_memory()[0] / size
+            tracemalloc.stop()
+            del service
+            gc.collect()
+
+            start = time.perf_counter()
+            service = TaskService(factory(), json_cache=False)
+            fill(service, creates)
+            fill_s = time.perf_counter() - start
+
+            middle = size // 2
+            stats_us = timed_us(lambda: (service.count(), service.count(done=True)))
+            page_us = timed_us(lambda: service.list_page(done=True, after_id=middle, limit=50))
+            ids_us = timed_us(lambda: service.store.ids(done=True), repeat=3)
+            get_us = timed_us(lambda: service.get_by_id(middle))
+            print(
+                f"{size:>8} | {name:>17} | {per_task:>12.0f} | {fill_s:>10.2f}s | "
+                f"{stats_us:>5.1f}µs | {page_us:>7.0f}µs | {ids_us / 1000:>7.1f}ms | {get_us:>4.1f}µs"
+            )
+            del service
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark de la compression des réponses: CPU dépensé vs octets économisés.
+
+Construit le JSON de GET /tasks pour des listes de tâches aux titres
+français typiques ("Appeler le plombier pour la fuite", une description
+sur deux), puis, pour chaque encodeur disponible et plusieurs niveaux:
+- taille compressée et ratio;
+- temps de compression et débit (Mo/s).
+Mesure enfin GET /tasks via le client de test: sans compression, gzip
+au premier appel (compression) et aux suivants (cache des corps
+compressés); ces temps incluent la décompression par le client.
+
+Usage:
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --sizes 100 1000 --repeat 20
+"""
+
+import argparse
+import gzip
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# L'application est mesurée sans son middleware, ajouté ici explicitement
+os.environ["TASKS_COMPRESSION"] = "0"
+
+from fastapi.testclient import TestClient
+
+import compress
+import main as api
+from models import TaskCreate
+
+
+VERBS = ["Appeler", "Acheter", "Préparer", "Réviser", "Envoyer", "Réserver", "Ranger", "Payer", "Relire", "Planifier"]
+OBJECTS = [
+    "le plombier pour la fuite", "du pain et du lait", "la présentation du lundi", "le rapport trimestriel",
+    "les billets de train", "le garage et la cave", "la facture d'électricité", "le contrat de location",
+    "la réunion d'équipe", "le rendez-vous chez le médecin",
+]
+DESCRIPTIONS = [
+    "À faire avant vendredi, voir le courriel de Jérôme", "Penser à la pièce jointe", "Urgent: relancer si pas de réponse",
+]
+
+
+def french_tasks(size: int) -> List[TaskCreate]:
+    """Tâches aux titres français typiques (tirage reproductible)."""
+    rng = random.Random(42)
+    return [
+        TaskCreate(
+            title=f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}",
+            description=rng.choice(DESCRIPTIONS) if i % 2 else None
+        )
+        for i in range(size)
+    ]
+
+
+def encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Encodeurs et niveaux comparés."""
+    candidates: Dict[str, Callable[[bytes], bytes]] = {
+        f"gzip -{level}": (lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0))
+        for level in (1, 6, 9)
+    }
+    if compress.brotli is not None:
+        for quality in (1, 5, 11):
+            candidates[f"br q{quality}"] = lambda data, quality=quality: compress.brotli.compress(data, quality=quality)
+    if compress.zstd is not None:
+        for level in (1, 3, 9):
+            candidates[f"zstd -{level}"] = lambda data, level=level: compress.zstd.compress(data, level=level)
+    return candidates
+
+
+def median_ms(call: Callable[[], object], repeat: int) -> float:
+    """Latence médiane d'un appel, en millisecondes."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def http_timings(size: int, repeat: int) -> List[float]:
+    """GET /tasks sans compression, gzip froid et gzip depuis le cache."""
+    service = api.TaskService()
+    api.task_service = service
+    service.create_many(french_tasks(size))
+    middleware = compress.CompressionMiddleware(api.app)
+    with TestClient(api.app) as client, TestClient(middleware) as compressed:
+        client.get("/tasks")
+        plain_ms = median_ms(lambda: client.get("/tasks"), repeat)
+
+        def cold() -> None:
+            middleware.cache = compress.CompressedBodyCache(16 * 1024 * 1024)
+            compressed.get("/tasks", headers={"Accept-Encoding": "gzip"})
+
+        cold_ms = median_ms(cold, repeat)
+        warm_ms = median_ms(lambda: compressed.get("/tasks", headers={"Accept-Encoding": "gzip"}), repeat)
+    return [plain_ms, cold_ms, warm_ms]
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'tâches':>7} | {'encodeur':>9} | {'octets':>9} | {'ratio':>6} | {'temps':>9} | {'débit':>9}")
+    print("-" * 66)
+    for size in args.sizes:
+        service = api.TaskService()
+        service.create_many(french_tasks(size))
+        body, _, _ = service.get_all_json()
+        print(f"{size:>7} | {'aucun':>9} | {len(body):>9} | {1:>6.2f} | {'-':>9} | {'-':>9}")
+        for name, encoder in encoders().items():
+            compressed = encoder(body)
+            elapsed_ms = median_ms(lambda: encoder(body), args.repeat)
+            print(
+                f"{size:>7} | {name:>9} | {len(compressed):>9} | {len(body) / len(compressed):>6.2f} | "
+                f"{elapsed_ms:>7.2f}ms | {len(body) / elapsed_ms / 1000:>5.0f}Mo/s"
+            )
+
+    print()
+    print(f"{'tâches':>7} | {'GET /tasks sans':>15} | {'gzip (froid)':>12} | {'gzip (cache)':>12}")
+    print("-" * 58)
+    for size in args.sizes:
+        plain_ms, cold_ms, warm_ms = http_timings(size, args.repeat)
+        print(f"{size:>7} | {plain_ms:>13.2f}ms | {cold_ms:>10.2f}ms | {warm_ms:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
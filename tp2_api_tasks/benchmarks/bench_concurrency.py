@@ -0,0 +1,85 @@
+"""
+Benchmark de débit du TaskService sous accès concurrent.
+
+Mesure le nombre d'opérations par seconde d'une charge mixte (90% de
+lectures, 10% d'écritures) pour 1 à 8 threads sur un service pré-rempli,
+puis vérifie la cohérence du service.
+
+Usage:
+    python benchmarks/bench_concurrency.py
+    python benchmarks/bench_concurrency.py --threads 1 4 --operations 20000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskCreate, TaskNotFoundError, TaskService  # noqa: E402
+
+
+def worker(service: TaskService, operations: int, seed: int, barrier: threading.Barrier) -> None:
+    """Exécute une charge mixte lecture/écriture sur le service."""
+    rng = random.Random(seed)
+    payload = TaskCreate(title="Tâche concurrente")
+    barrier.wait()
+    for _ in range(operations):
+        roll = rng.random()
+        task_id = rng.randint(1, 10_000)
+        try:
+            if roll < 0.6:
+                service.get_by_id(task_id)
+            elif roll < 0.8:
+                service.list_page(done=False, after_id=task_id, limit=20)
+            elif roll < 0.9:
+                service.count(done=True)
+            elif roll < 0.95:
+                service.toggle(task_id)
+            else:
+                service.create(payload)
+        except TaskNotFoundError:
+            pass
+
+
+def run(threads: int, operations: int) -> float:
+    """Renvoie le débit (opérations/s) pour `threads` threads."""
+    service = TaskService()
+    service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(10_000)])
+    barrier = threading.Barrier(threads + 1)
+    pool: List[threading.Thread] = [
+        threading.Thread(target=worker, args=(service, operations, seed, barrier))
+        for seed in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    service.check_consistency()
+    return threads * operations / elapsed
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--operations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'threads':>8} | {'ops/s':>10}")
+    print("-" * 21)
+    for threads in args.threads:
+        print(f"{threads:>8} | {run(threads, args.operations):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark du stockage journalisé (journal d'écriture + instantanés).
+
+Mesure:
+- le temps de démarrage: chargement d'un instantané de `--size` tâches
+  puis rejeu d'un journal de `--tail` enregistrements;
+- le débit d'écriture en mode "group" selon le nombre de threads, et le
+  nombre moyen d'enregistrements par fsync;
+- l'amplification d'écriture (octets écrits sur disque / octets des
+  enregistrements) avec instantanés périodiques.
+
+Usage:
+    python benchmarks/bench_journal.py
+    python benchmarks/bench_journal.py --size 1000000 --tail 100000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from journal import SYNC_ASYNC, JournaledTaskStore  # noqa: E402
+from main import TaskCreate, TaskService, TaskUpdate  # noqa: E402
+
+BATCH_SIZE = 10_000
+
+
+def fill(service: TaskService, size: int) -> None:
+    """Crée `size` tâches par lots."""
+    for start in range(0, size, BATCH_SIZE):
+        count = min(BATCH_SIZE, size - start)
+        service.create_many([
+            TaskCreate(title=f"Tâche {start + i} à préparer", description="Description")
+            for i in range(count)
+        ])
+
+
+def bench_startup(directory: str, size: int, tail: int) -> None:
+    """Instantané de `size` tâches, journal de `tail` enregistrements, puis réouverture."""
+    store = JournaledTaskStore(directory, sync_mode=SYNC_ASYNC, snapshot_every=10 ** 12)
+    service = TaskService(store)
+    fill(service, size)
+    store.snapshot(wait=True)
+
+    rng = random.Random(0)
+    for i in range(tail):
+        task_id = rng.randint(1, size)
+        kind = i % 4
+        if kind == 0:
+            service.create(TaskCreate(title=f"Nouvelle tâche {i}"))
+        elif kind == 1:
+            service.update(task_id, TaskUpdate(title=f"Tâche {task_id} renommée {i}"))
+        elif kind == 2:
+            service.toggle(task_id)
+        else:
+            service.update(task_id, TaskUpdate(description=f"Note {i}"))
+    version = store.version
+    store.close()
+
+    start = time.perf_counter()
+    reopened = JournaledTaskStore(directory)
+    elapsed = time.perf_counter() - start
+    assert reopened.version == version
+    print(f"démarrage: {reopened.count()} tâches, {tail} enregistrements rejoués en {elapsed:.2f}s")
+    reopened.close()
+
+
+def bench_group_commit(directory: str, writes: int) -> None:
+    """Débit de créations unitaires durables selon le nombre de threads."""
+    print(f"{'threads':>8} | {'écritures/s':>12} | {'enreg./fsync':>12}")
+    print("-" * 38)
+    for threads in (1, 4, 16):
+        store = JournaledTaskStore(str(Path(directory) / f"group-{threads}"))
+        service = TaskService(store)
+        per_thread = writes // threads
+
+        def worker() -> None:
+            for i in range(per_thread):
+                service.create(TaskCreate(title=f"Tâche {i}"))
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stats = store.stats()
+        store.close()
+        print(f"{threads:>8} | {per_thread * threads / elapsed:>12.0f} | {stats['records_per_fsync']:>12.1f}")
+
+
+def bench_amplification(directory: str, size: int, writes: int, snapshot_every: int) -> None:
+    """Octets écrits par enregistrement, instantanés compris."""
+    store = JournaledTaskStore(directory, sync_mode=SYNC_ASYNC, snapshot_every=snapshot_every)
+    service = TaskService(store)
+    fill(service, size)
+    rng = random.Random(0)
+    for i in range(writes):
+        service.toggle(rng.randint(1, size))
+    store.close()
+
+    stats = store.stats()
+    print(
+        f"amplification ({size} tâches, {writes} bascules, instantané tous les "
+        f"{snapshot_every} enregistrements): journal {stats['log_bytes'] / 1e6:.1f} Mo, "
+        f"{stats['snapshots']} instantanés {stats['snapshot_bytes'] / 1e6:.1f} Mo, "
+        f"{stats['log_bytes'] / stats['records']:.0f} octets/enregistrement, "
+        f"facteur {stats['write_amplification']:.2f}"
+    )
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=100_000)
+    parser.add_argument("--writes", type=int, default=4_000)
+    parser.add_argument("--snapshot-every", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        bench_startup(str(Path(directory) / "startup"), args.size, args.tail)
+        bench_group_commit(directory, args.writes)
+        bench_amplification(
+            str(Path(directory) / "amplification"), 100_000, 300_000, args.snapshot_every
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark du rendu JSON de GET /tasks: chemin FastAPI vs cache pré-encodé.
+
+Pour 1k, 10k et 100k tâches, compare via le client de test:
+- avant: la même liste renvoyée par une route `response_model=List[Task]`
+  (revalidation Pydantic puis encodeur json standard, l'ancien chemin);
+- après (froid): GET /tasks juste après les écritures, cache vide;
+- après (chaud): GET /tasks suivants, fragments déjà encodés;
+- après (10% modifiées): GET /tasks après modification d'une tâche sur 10.
+Affiche la latence médiane en millisecondes et le gain.
+
+Usage:
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --sizes 1000 10000 --repeat 20
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main as api
+import serialization
+from models import Task, TaskCreate
+
+
+def median_ms(call: Callable[[], object], repeat: int) -> float:
+    """Latence médiane d'un appel, en millisecondes."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(size: int, repeat: int) -> List[float]:
+    """Mesure les quatre scénarios pour `size` tâches."""
+    service = api.TaskService()
+    api.task_service = service
+    service.create_many([
+        TaskCreate(title=f"Tâche numéro {i}", description="Description de la tâche" if i % 2 else None)
+        for i in range(size)
+    ])
+
+    reference = FastAPI()
+
+    @reference.get("/tasks", response_model=List[Task])
+    def list_tasks() -> List[Task]:
+        return service.get_all()
+
+    with TestClient(reference) as before, TestClient(api.app) as after:
+        before_ms = median_ms(lambda: before.get("/tasks"), repeat)
+
+        cold = []
+        for _ in range(repeat):
+            service._json = serialization.TaskJSONCache()
+            cold.append(median_ms(lambda: after.get("/tasks"), 1))
+        cold_ms = statistics.median(cold)
+
+        warm_ms = median_ms(lambda: after.get("/tasks"), repeat)
+
+        def modified() -> None:
+            service.toggle_many(list(range(1, size + 1, 10)))
+            after.get("/tasks")
+
+        modified_ms = median_ms(modified, repeat)
+        toggle_ms = median_ms(lambda: service.toggle_many(list(range(1, size + 1, 10))), repeat)
+    return [before_ms, cold_ms, warm_ms, modified_ms - toggle_ms]
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(f"encodeur: {encoder}")
+    print(f"{'tâches':>8} | {'avant':>9} | {'froid':>9} | {'chaud':>9} | {'10% modif.':>10} | {'gain chaud':>10}")
+    print("-" * 70)
+    for size in args.sizes:
+        before_ms, cold_ms, warm_ms, modified_ms = run(size, args.repeat)
+        print(
+            f"{size:>8} | {before_ms:>7.2f}ms | {cold_ms:>7.2f}ms | {warm_ms:>7.2f}ms | "
+            f"{modified_ms:>8.2f}ms | {before_ms / warm_ms:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark du débit de l'API selon la configuration des logs.
+
+Pour chaque mode, lance un processus qui importe l'application avec les
+variables TASKS_LOG_* correspondantes (stderr redirigé vers un fichier,
+comme derrière un collecteur de logs), puis enchaîne via le client de
+test FastAPI des cycles création / lecture / mise à jour / bascule.
+Affiche les requêtes par seconde, le coût d'un appel de log sur le thread
+appelant (trace de requête et message du service) et le volume écrit.
+
+Modes:
+- off: niveau WARNING (aucune trace INFO sur ce scénario);
+- dev: écriture synchrone sur stderr (défaut);
+- production: file + thread d'écriture, main.requests échantillonné 1/100;
+- production-complet: file + thread d'écriture, sans échantillonnage;
+- production-service: main.requests 1/100 et messages du service 1/10.
+
+Usage:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --cycles 5000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+MODES: Dict[str, Dict[str, str]] = {
+    "off": {"TASKS_LOG_LEVEL": "WARNING"},
+    "dev": {"TASKS_LOG_MODE": "dev"},
+    "production": {"TASKS_LOG_MODE": "production"},
+    "production-complet": {"TASKS_LOG_MODE": "production", "TASKS_LOG_SAMPLING": ""},
+    "production-service": {
+        "TASKS_LOG_MODE": "production", "TASKS_LOG_SAMPLING": "main.requests=100,main=10",
+    },
+}
+
+
+def child(cycles: int) -> None:
+    """Exécute le scénario dans le processus courant et affiche le débit."""
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from fastapi.testclient import TestClient
+
+    import main
+
+    # Le contexte garde une seule boucle d'événements pour tout le scénario
+    with TestClient(main.app) as client:
+        for i in range(100):
+            client.post("/tasks", json={"title": f"Échauffement {i}"})
+        start = time.perf_counter()
+        for i in range(cycles):
+            payload = {"title": f"Tâche {i}", "description": "Détails"}
+            task_id = client.post("/tasks", json=payload).json()["id"]
+            client.get(f"/tasks/{task_id}")
+            client.patch(f"/tasks/{task_id}", json={"title": f"Tâche {i} renommée"})
+            client.patch(f"/tasks/{task_id}/toggle")
+        elapsed = time.perf_counter() - start
+
+    calls = 50_000
+    costs = []
+    for logger in (main.request_logger, main.logger):
+        call_start = time.perf_counter()
+        for i in range(calls):
+            logger.info("Récupération de la tâche: ID=%s", i)
+        costs.append((time.perf_counter() - call_start) / calls * 1_000_000)
+    print(cycles * 4 / elapsed, *costs)
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=2_000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.cycles)
+        return
+
+    print(f"{'mode':>20} | {'req/s':>8} | {'µs/trace':>8} | {'µs/service':>10} | {'logs (Ko)':>9}")
+    print("-" * 69)
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, variables in MODES.items():
+            log_path = Path(directory) / f"{mode}.log"
+            env = {key: value for key, value in os.environ.items() if not key.startswith("TASKS_LOG_")}
+            env.update(variables)
+            with open(log_path, "wb") as log_file:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", "--cycles", str(args.cycles)],
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=log_file,
+                    check=True,
+                ).stdout
+            rps, trace, service = map(float, output.decode().split())
+            print(
+                f"{mode:>20} | {rps:>8.0f} | {trace:>8.2f} | {service:>10.2f} | "
+                f"{log_path.stat().st_size / 1024:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark du surcoût par requête du middleware de métriques.
+
+Appelle directement, dans une boucle d'événements, une application ASGI
+minimale (réponse vide, route fixée dans le scope comme le fait le
+routeur FastAPI) avec et sans MetricsMiddleware, puis mesure l'API
+complète (client de test, GET /tasks/{task_id}) avec et sans le
+middleware. Affiche le coût en microsecondes par requête.
+
+Usage:
+    python benchmarks/bench_metrics.py
+    python benchmarks/bench_metrics.py --requests 200000
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from metrics import MetricsMiddleware, MetricsRegistry
+
+ROUTE = SimpleNamespace(path="/tasks/{task_id}")
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b""}
+
+
+async def bare_app(scope, receive, send) -> None:
+    """Application ASGI minimale: renseigne la route et répond."""
+    scope["route"] = ROUTE
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message) -> None:
+    pass
+
+
+async def drive(app, requests: int) -> float:
+    """Renvoie le temps moyen (µs) d'un appel de `app`."""
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {"type": "http", "method": "GET", "path": f"/tasks/{i}"}
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def through_api(requests: int, instrumented: bool) -> float:
+    """Temps moyen (µs) d'un GET /tasks/{task_id} via le client de test."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    if not instrumented:
+        main.app.user_middleware = [
+            middleware for middleware in main.app.user_middleware
+            if middleware.cls is not MetricsMiddleware
+        ]
+        main.app.middleware_stack = main.app.build_middleware_stack()
+    with TestClient(main.app) as client:
+        task_id = client.post("/tasks", json={"title": "Mesurer"}).json()["id"]
+        for _ in range(200):
+            client.get(f"/tasks/{task_id}")
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(f"/tasks/{task_id}")
+        return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--api-requests", type=int, default=3_000)
+    parser.add_argument("--api-only", choices=["avec", "sans"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.api_only:
+        print(through_api(args.api_requests, args.api_only == "avec"))
+        return
+
+    bare = asyncio.run(drive(bare_app, args.requests))
+    measured = asyncio.run(drive(MetricsMiddleware(bare_app, MetricsRegistry()), args.requests))
+    print(f"{'scénario':>22} | {'µs/requête':>10}")
+    print("-" * 36)
+    print(f"{'ASGI nu':>22} | {bare:>10.2f}")
+    print(f"{'ASGI + métriques':>22} | {measured:>10.2f}")
+    print(f"{'surcoût':>22} | {measured - bare:>10.2f}")
+
+    # Chaque variante dans son propre processus (application neuve)
+    for variant in ("sans", "avec"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--api-only", variant, "--api-requests", str(args.api_requests)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+        print(f"{'API ' + variant + ' métriques':>22} | {float(output):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
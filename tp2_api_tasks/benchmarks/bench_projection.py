@@ -0,0 +1,100 @@
+"""
+Benchmark de la projection des lectures (?fields=): taille et CPU.
+
+Remplit le service de tâches aux descriptions longues (2 Ko par défaut,
+texte français) et compare, pour GET /tasks:
+- la liste complète, JSON servi depuis le cache du service (chaud) ou
+  encodé à chaque appel (TASKS_JSON_CACHE=0);
+- les projections `fields=id,done` et `fields=id,title`.
+Affiche la taille du corps, le temps CPU du service (get_all_json) et
+la latence de GET /tasks via le client de test (sans compression).
+
+Usage:
+    python benchmarks/bench_projection.py
+    python benchmarks/bench_projection.py --sizes 1000 10000 --description 4096 --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Corps mesurés tels quels, sans le middleware de compression
+os.environ["TASKS_COMPRESSION"] = "0"
+
+from fastapi.testclient import TestClient
+
+import main as api
+from models import TaskCreate
+from serialization import parse_fields
+
+
+SENTENCE = "Vérifier le devis du plombier, relancer l'agence et noter les réserves. "
+
+# (nom, cache JSON du service, paramètre fields)
+VARIANTS: List[Tuple[str, bool, Optional[str]]] = [
+    ("complet (cache)", True, None),
+    ("complet (sans cache)", False, None),
+    ("fields=id,done", True, "id,done"),
+    ("fields=id,title", True, "id,title"),
+]
+
+
+def long_tasks(size: int, description: int) -> List[TaskCreate]:
+    """Tâches aux descriptions de `description` caractères environ."""
+    text = (SENTENCE * (description // len(SENTENCE) + 1))[:description]
+    return [TaskCreate(title=f"Rénover la salle de bain n°{i}", description=text) for i in range(size)]
+
+
+def median_ms(call: Callable[[], object], repeat: int, clock: Callable[[], float]) -> float:
+    """Durée médiane d'un appel selon `clock`, en millisecondes."""
+    timings = []
+    for _ in range(repeat):
+        start = clock()
+        call()
+        timings.append((clock() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure(size: int, description: int, repeat: int) -> List[Tuple[str, int, float, float]]:
+    """Mesure chaque variante: (nom, octets, CPU service en ms, GET /tasks en ms)."""
+    tasks = long_tasks(size, description)
+    results = []
+    for name, json_cache, fields in VARIANTS:
+        service = api.TaskService(json_cache=json_cache)
+        service.create_many(tasks)
+        api.task_service = service
+        projection = parse_fields(fields) if fields is not None else None
+        body, _, _ = service.get_all_json(None, projection)
+        cpu_ms = median_ms(lambda: service.get_all_json(None, projection), repeat, time.process_time)
+        params = {"fields": fields} if fields is not None else {}
+        with TestClient(api.app) as client:
+            client.get("/tasks", params=params)
+            http_ms = median_ms(lambda: client.get("/tasks", params=params), repeat, time.perf_counter)
+        results.append((name, len(body), cpu_ms, http_ms))
+    return results
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--description", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"descriptions de {args.description} caractères")
+    print(f"{'tâches':>7} | {'variante':>20} | {'octets':>11} | {'CPU service':>11} | {'GET /tasks':>10}")
+    print("-" * 72)
+    for size in args.sizes:
+        for name, length, cpu_ms, http_ms in measure(size, args.description, args.repeat):
+            print(f"{size:>7} | {name:>20} | {length:>11} | {cpu_ms:>9.2f}ms | {http_ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
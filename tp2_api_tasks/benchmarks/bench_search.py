@@ -0,0 +1,56 @@
+"""
+Benchmark de la recherche plein texte.
+
+Indexe N tâches aux titres français générés aléatoirement puis mesure la
+latence de requêtes d'auto-complétion (préfixes courts et mots complets).
+
+Usage:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --size 100000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskCreate, TaskService  # noqa: E402
+
+
+VERBES = ["Préparer", "Réviser", "Écrire", "Envoyer", "Relire", "Planifier", "Vérifier", "Commander"]
+OBJETS = ["réunion", "facture", "rapport", "présentation", "dossier", "livraison", "budget", "contrat"]
+COMPLEMENTS = ["client", "équipe", "trimestre", "fournisseur", "été", "comité", "projet", "siège"]
+QUERIES = ["pre", "reun", "facture client", "ecrire rapp", "ete", "livraison fournisseur"]
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(42)
+    service = TaskService()
+    start = time.perf_counter()
+    service.create_many([
+        TaskCreate(title=f"{rng.choice(VERBES)} {rng.choice(OBJETS)} {rng.choice(COMPLEMENTS)} {i}")
+        for i in range(args.size)
+    ])
+    print(f"Indexation de {args.size} tâches: {time.perf_counter() - start:.2f} s")
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = service.search(query, limit=20)
+        elapsed_ms = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"  q={query!r:<26} {elapsed_ms:8.2f} ms  ({len(results)} résultats)")
+
+
+if __name__ == "__main__":
+    main()
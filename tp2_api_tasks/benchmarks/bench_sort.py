@@ -0,0 +1,99 @@
+"""
+Benchmark du tri côté serveur: index de tri maintenus vs tri à la requête.
+
+Remplit le service de N tâches aux titres aléatoires, puis mesure:
+- la construction de l'index de tri par titre (premier tri demandé; avec
+  `--store sqlite`, la première page, triée par SQLite sans index à
+  construire);
+- la première page triée (50 tâches, `sort=title`, croissant et
+  décroissant, avec et sans filtre done) lue dans l'index;
+- la même page obtenue en triant toute la table à chaque requête
+  (sorted() sur get_all(), ce qu'il faudrait sans index);
+- le surcoût d'une mutation (bascule) quand l'index est construit.
+
+Usage:
+    python benchmarks/bench_sort.py
+    python benchmarks/bench_sort.py --sizes 10000 100000 --repeat 50
+    python benchmarks/bench_sort.py --store sqlite --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskService
+from models import TaskCreate
+from ordering import SORT_KEYS, SORT_TITLE
+from storage import MEMORY_BACKEND, SQLITE_BACKEND, SQLiteTaskStore
+
+
+PAGE = 50
+WORDS = ["appeler", "Acheter", "préparer", "Réviser", "envoyer", "Réserver", "ranger", "Payer", "relire", "Planifier"]
+
+
+def random_tasks(size: int) -> List[TaskCreate]:
+    """Tâches aux titres aléatoires (tirage reproductible)."""
+    rng = random.Random(42)
+    return [TaskCreate(title=f"{rng.choice(WORDS)} {rng.randrange(size * 10)}") for _ in range(size)]
+
+
+def median_ms(call: Callable[[], object], repeat: int) -> float:
+    """Latence médiane d'un appel, en millisecondes."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--store", choices=[MEMORY_BACKEND, SQLITE_BACKEND], default=MEMORY_BACKEND)
+    args = parser.parse_args()
+    directory = tempfile.TemporaryDirectory()
+
+    print(
+        f"{'tâches':>9} | {'construction':>12} | {'page asc':>9} | {'page desc':>9} | "
+        f"{'page done':>9} | {'tri complet':>11} | {'bascule':>9} | {'+ index':>9}"
+    )
+    print("-" * 98)
+    for size in args.sizes:
+        if args.store == SQLITE_BACKEND:
+            service = TaskService(SQLiteTaskStore(f"{directory.name}/tasks-{size}.db"))
+        else:
+            service = TaskService()
+        service.create_many(random_tasks(size))
+        rng = random.Random(7)
+        toggle_ms = median_ms(lambda: service.toggle(rng.randint(1, size)), args.repeat)
+
+        start = time.perf_counter()
+        service.list_sorted_json(SORT_TITLE, limit=PAGE)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        asc_ms = median_ms(lambda: service.list_sorted_json(SORT_TITLE, limit=PAGE), args.repeat)
+        desc_ms = median_ms(lambda: service.list_sorted_json(SORT_TITLE, True, limit=PAGE), args.repeat)
+        done_ms = median_ms(lambda: service.list_sorted_json(SORT_TITLE, done=False, limit=PAGE), args.repeat)
+        full_sort_ms = median_ms(
+            lambda: sorted(service.get_all(), key=SORT_KEYS[SORT_TITLE])[:PAGE],
+            max(3, args.repeat // 5)
+        )
+        indexed_toggle_ms = median_ms(lambda: service.toggle(rng.randint(1, size)), args.repeat)
+        print(
+            f"{size:>9} | {build_ms:>10.1f}ms | {asc_ms:>7.3f}ms | {desc_ms:>7.3f}ms | {done_ms:>7.3f}ms | "
+            f"{full_sort_ms:>9.1f}ms | {toggle_ms * 1000:>7.1f}µs | {indexed_toggle_ms * 1000:>7.1f}µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
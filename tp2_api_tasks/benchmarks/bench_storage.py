@@ -0,0 +1,82 @@
+"""
+Benchmark comparatif des backends de stockage (mémoire vs SQLite).
+
+Mesure, au niveau du TaskService, la latence moyenne de création
+unitaire, création en masse, lecture par ID, page de 50 tâches (avec et
+sans filtre) et statistiques.
+
+Usage:
+    python benchmarks/bench_storage.py
+    python benchmarks/bench_storage.py --size 100000 --operations 5000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskCreate, TaskService  # noqa: E402
+from storage import MemoryTaskStore, SQLiteTaskStore, TaskStore  # noqa: E402
+
+
+def timed(operations: int, operation: Callable[[int], object]) -> float:
+    """Renvoie la latence moyenne de `operation` en µs."""
+    start = time.perf_counter()
+    for i in range(operations):
+        operation(i)
+    return (time.perf_counter() - start) / operations * 1_000_000
+
+
+def bench(store: TaskStore, size: int, operations: int) -> Dict[str, float]:
+    """Mesure chaque opération sur un service adossé à `store`."""
+    service = TaskService(store)
+    payload = [TaskCreate(title=f"Tâche {i}", description="Description") for i in range(size)]
+
+    start = time.perf_counter()
+    service.create_many(payload)
+    results = {"bulk µs/tâche": (time.perf_counter() - start) / size * 1_000_000}
+    service.toggle_many(ids=list(range(1, size + 1, 3)))
+
+    rng = random.Random(0)
+    ids = [rng.randint(1, size) for _ in range(operations)]
+    results["create"] = timed(operations, lambda i: service.create(payload[i % size]))
+    results["get"] = timed(operations, lambda i: service.get_by_id(ids[i]))
+    results["page"] = timed(operations, lambda i: service.list_page(after_id=ids[i], limit=50))
+    results["page done"] = timed(operations, lambda i: service.list_page(True, ids[i], 50))
+    results["stats"] = timed(operations, lambda i: (service.count(), service.count(done=True)))
+    return results
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--operations", type=int, default=2_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": MemoryTaskStore(),
+            "sqlite": SQLiteTaskStore(str(Path(directory) / "bench.db")),
+        }
+        rows = {name: bench(store, args.size, args.operations) for name, store in backends.items()}
+        for store in backends.values():
+            store.close()
+
+    columns = list(rows["memory"])
+    print(f"{'backend':>8} | " + " | ".join(f"{column:>13}" for column in columns))
+    print("-" * (11 + 16 * len(columns)))
+    for name, results in rows.items():
+        print(f"{name:>8} | " + " | ".join(f"{results[column]:>13.2f}" for column in columns))
+    print("(latences moyennes en µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de montée en charge du TaskService.
+
+Mesure la latence par opération (lecture, mise à jour, bascule,
+suppression) sur un service pré-rempli de 1k à 1M tâches. Avec l'index
+par ID, la latence doit rester stable quelle que soit la taille.
+
+Usage:
+    python benchmarks/bench_task_service.py
+    python benchmarks/bench_task_service.py --sizes 1000 10000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskCreate, TaskService, TaskUpdate  # noqa: E402
+
+
+DEFAULT_SIZES: List[int] = [1_000, 10_000, 100_000, 1_000_000]
+OPERATIONS: int = 10_000
+
+
+def build_service(size: int) -> TaskService:
+    """Crée un service contenant `size` tâches."""
+    service = TaskService()
+    payload = TaskCreate(title="Tâche de benchmark", description="Description")
+    for _ in range(size):
+        service.create(payload)
+    return service
+
+
+def measure(label: str, ids: List[int], operation: Callable[[int], object]) -> float:
+    """Exécute `operation` sur chaque ID et renvoie la latence moyenne en µs."""
+    start = time.perf_counter()
+    for task_id in ids:
+        operation(task_id)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(ids) * 1_000_000
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    # Les logs INFO par opération fausseraient la mesure
+    logging.disable(logging.INFO)
+
+    update = TaskUpdate(title="Titre modifié")
+    print(f"{'tâches':>10} | {'get µs':>8} | {'update µs':>9} | {'toggle µs':>9} | {'delete µs':>9}")
+    print("-" * 58)
+    for size in args.sizes:
+        service = build_service(size)
+        ids = random.sample(range(1, size + 1), min(OPERATIONS, size))
+        get_us = measure("get", ids, service.get_by_id)
+        update_us = measure("update", ids, lambda i: service.update(i, update))
+        toggle_us = measure("toggle", ids, service.toggle)
+        delete_us = measure("delete", ids, service.delete)
+        print(f"{size:>10} | {get_us:>8.2f} | {update_us:>9.2f} | {toggle_us:>9.2f} | {delete_us:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark de débit HTTP selon le nombre de workers uvicorn.
+
+Démarre l'API avec 1 à N processus partageant une base SQLite
+(TASKS_STORAGE=sqlite), la pré-remplit, puis la charge depuis plusieurs
+processus clients (connexions HTTP persistantes) avec un mélange de
+lectures par ID (80%), de pages de 20 tâches (10%) et de bascules (10%).
+Affiche les requêtes par seconde pour chaque nombre de workers; le gain
+est borné par le nombre de cœurs disponibles (affiché en tête).
+
+Usage:
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --clients 16 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+SRC = Path(__file__).parent.parent / "src"
+HOST = "127.0.0.1"
+TASKS = 10_000
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    """Attend que l'API réponde sur `port`."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=1)
+            connection.request("GET", "/stats")
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"L'API ne répond pas sur le port {port}")
+
+
+def prefill(port: int) -> None:
+    """Crée TASKS tâches via POST /tasks/bulk."""
+    connection = http.client.HTTPConnection(HOST, port)
+    for start in range(0, TASKS, 1000):
+        body = json.dumps([{"title": f"Tâche {start + i}"} for i in range(1000)])
+        connection.request("POST", "/tasks/bulk", body, {"Content-Type": "application/json"})
+        connection.getresponse().read()
+    connection.close()
+
+
+def client(port: int, duration: float, seed: int, results: "multiprocessing.Queue[int]") -> None:
+    """Envoie des requêtes pendant `duration` secondes et publie leur nombre."""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(HOST, port)
+    requests = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        task_id = rng.randint(1, TASKS)
+        roll = rng.random()
+        if roll < 0.8:
+            connection.request("GET", f"/tasks/{task_id}")
+        elif roll < 0.9:
+            connection.request("GET", f"/tasks?limit=20&after_id={task_id}")
+        else:
+            connection.request("PATCH", f"/tasks/{task_id}/toggle")
+        connection.getresponse().read()
+        requests += 1
+    connection.close()
+    results.put(requests)
+
+
+def run(workers: int, clients: int, duration: float, port: int, directory: str) -> float:
+    """Renvoie le débit (requêtes/s) de l'API lancée avec `workers` processus."""
+    env = dict(
+        os.environ,
+        TASKS_STORAGE="sqlite",
+        TASKS_DB_PATH=str(Path(directory) / f"bench-{workers}.db"),
+    )
+    api = subprocess.Popen(
+        [
+            sys.executable, "-c",
+            f"import server; server.run({workers}, {HOST!r}, {port}, log_level='warning')",
+        ],
+        cwd=SRC,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        prefill(port)
+        results: "multiprocessing.Queue[int]" = multiprocessing.Queue()
+        pool: List[multiprocessing.Process] = [
+            multiprocessing.Process(target=client, args=(port, duration, seed, results))
+            for seed in range(clients)
+        ]
+        for process in pool:
+            process.start()
+        total = sum(results.get() for _ in pool)
+        for process in pool:
+            process.join()
+        return total / duration
+    finally:
+        api.terminate()
+        api.wait()
+
+
+def main() -> None:
+    """Point d'entrée du benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"cœurs disponibles: {os.cpu_count()}")
+    print(f"{'workers':>8} | {'req/s':>10} | {'gain':>6}")
+    print("-" * 30)
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in args.workers:
+            rps = run(workers, args.clients, args.duration, args.port, directory)
+            baseline = baseline or rps
+            print(f"{workers:>8} | {rps:>10.0f} | {rps / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Interface asynchrone du service de tâches, pour les routes `async def`.
+
+Une route `def` occupe un thread du pool de Starlette pour toute sa
+durée: la concurrence est bornée par la taille du pool (40 threads),
+pas par la boucle d'événements. AsyncTaskService expose les opérations
+du TaskService en coroutines, selon le backend:
+- stockage non bloquant (MemoryTaskStore, CompactTaskStore, journal en
+  mode "async"): l'appel est fait directement dans la boucle, sans
+  passage par un thread, si le verrou du service est libre;
+- stockage bloquant (`TaskStore.blocking`: SQLite, journal en mode
+  "group" qui attend le fsync): l'appel est exécuté dans un pool de
+  threads dédié et borné, indépendant de celui de Starlette.
+Les opérations en O(n) (liste complète, opérations en masse, recherche
+par préfixe) passent toujours par le pool, quel que soit le backend:
+elles bloqueraient
+sinon la boucle, et donc toutes les autres requêtes, le temps de leur
+exécution.
+
+La boucle n'attend jamais le verrou lecteurs/rédacteur du service: un
+appel direct prend d'abord le verrou en écriture sans attendre
+(ReadWriteLock.try_acquire_write; le service le reprend ensuite, car il
+est réentrant pour son détenteur). S'il est détenu ou attendu, par
+exemple pendant une opération en masse dans le pool, l'appel passe par
+le pool. Le verrou exclusif ne coûte rien dans la boucle, où les appels
+directs s'exécutent de toute façon un par un.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from models import Task, TaskCreate, TaskUpdate
+from ordering import SortKey
+from profiling import SERVICE, current_profile, profiled_call, profiled_thread_call
+
+if TYPE_CHECKING:  # pragma: no cover - import circulaire avec main
+    from main import TaskService
+
+
+T = TypeVar("T")
+
+
+class AsyncTaskService:
+    """
+    Coroutines au-dessus d'un TaskService (voir l'en-tête du module).
+
+    Exemple:
+        >>> executor = ThreadPoolExecutor(max_workers=8)
+        >>> tasks = AsyncTaskService(TaskService(), executor)
+        >>> task = await tasks.create(TaskCreate(title="Acheter du lait"))
+    """
+
+    def __init__(self, service: "TaskService", executor: ThreadPoolExecutor) -> None:
+        """
+        Initialise la couche asynchrone.
+
+        Args:
+            service (TaskService): Service synchrone encapsulé.
+            executor (ThreadPoolExecutor): Pool borné des appels bloquants.
+        """
+        self.service: "TaskService" = service
+        self._executor: ThreadPoolExecutor = executor
+        self._blocking: bool = service.store.blocking
+
+    @property
+    def blocking(self) -> bool:
+        """True si les appels passent par le pool de threads."""
+        return self._blocking
+
+    async def _call(self, function: Callable[..., T], *args: Any) -> T:
+        """Appel direct si le stockage ne bloque pas et le verrou est libre, sinon dans le pool."""
+        lock = self.service.lock
+        if self._blocking or not lock.try_acquire_write():
+            return await self._offload(function, *args)
+        try:
+            profile = current_profile()
+            if profile is None:
+                return function(*args)
+            return profiled_call(profile, function, *args)
+        finally:
+            lock.release_write()
+
+    async def _offload(self, function: Callable[..., T], *args: Any) -> T:
+        """Appel dans le pool, quel que soit le stockage."""
+        loop = asyncio.get_running_loop()
+        profile = current_profile()
+        if profile is None:
+            return await loop.run_in_executor(self._executor, partial(function, *args))
+        # Requête mesurée (profiling.py): la phase service compte aussi
+        # l'attente d'un thread libre du pool
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(
+                self._executor, partial(profiled_thread_call, profile, function, *args)
+            )
+        finally:
+            profile.timings[SERVICE] += time.perf_counter() - start
+
+    # -------------------------------------------------------------- Lecture
+
+    async def version(self) -> int:
+        """Voir TaskService.version."""
+        return await self._call(getattr, self.service, "version")
+
+    async def task_version(self, task_id: int) -> int:
+        """Voir TaskService.task_version()."""
+        return await self._call(self.service.task_version, task_id)
+
+    async def count(self, done: Optional[bool] = None) -> int:
+        """Voir TaskService.count()."""
+        return await self._call(self.service.count, done)
+
+    async def counters(self) -> Tuple[int, int, int]:
+        """Voir TaskService.counters()."""
+        return await self._call(self.service.counters)
+
+    async def get_json(self, task_id: int, fields: Optional[Tuple[str, ...]] = None) -> Tuple[bytes, int]:
+        """Voir TaskService.get_json()."""
+        return await self._call(self.service.get_json, task_id, fields)
+
+    async def list_page_json(
+        self,
+        done: Optional[bool],
+        after_id: Optional[int],
+        limit: int,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[bytes, int, Optional[int], int]:
+        """Voir TaskService.list_page_json() (page bornée: appel direct)."""
+        return await self._call(self.service.list_page_json, done, after_id, limit, fields)
+
+    async def get_all_json(
+        self,
+        done: Optional[bool] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[bytes, int, int]:
+        """Voir TaskService.get_all_json() (liste complète: dans le pool)."""
+        return await self._offload(self.service.get_all_json, done, fields)
+
+    async def list_sorted_json(
+        self,
+        sort: str,
+        descending: bool = False,
+        done: Optional[bool] = None,
+        after: Optional[SortKey] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[bytes, int, Optional[SortKey], int]:
+        """
+        Voir TaskService.list_sorted_json() (page: appel direct; liste
+        complète ou index de tri à construire: dans le pool).
+        """
+        if limit is None or not self.service.order_ready(sort):
+            return await self._offload(self.service.list_sorted_json, sort, descending, done, after, limit, fields)
+        return await self._call(self.service.list_sorted_json, sort, descending, done, after, limit, fields)
+
+    async def search(self, query: str, done: Optional[bool], limit: int) -> List[Task]:
+        """Voir TaskService.search() (un préfixe court peut couvrir toute la table: dans le pool)."""
+        return await self._offload(self.service.search, query, done, limit)
+
+    async def changes_since(self, version: int) -> Tuple[int, Optional[Tuple[List[Task], List[int]]]]:
+        """Voir TaskService.changes_since()."""
+        return await self._call(self.service.changes_since, version)
+
+    # ------------------------------------------------------------- Écriture
+
+    async def create(self, task_create: TaskCreate) -> Task:
+        """Voir TaskService.create()."""
+        return await self._call(self.service.create, task_create)
+
+    async def update(self, task_id: int, task_update: TaskUpdate) -> Task:
+        """Voir TaskService.update()."""
+        return await self._call(self.service.update, task_id, task_update)
+
+    async def toggle(self, task_id: int) -> Task:
+        """Voir TaskService.toggle()."""
+        return await self._call(self.service.toggle, task_id)
+
+    async def delete(self, task_id: int) -> None:
+        """Voir TaskService.delete()."""
+        await self._call(self.service.delete, task_id)
+
+    async def create_many(self, task_creates: List[TaskCreate]) -> List[Task]:
+        """Voir TaskService.create_many() (dans le pool)."""
+        return await self._offload(self.service.create_many, task_creates)
+
+    async def update_many(
+        self,
+        task_update: TaskUpdate,
+        ids: Optional[List[int]] = None,
+        done: Optional[bool] = None
+    ) -> Dict[int, str]:
+        """Voir TaskService.update_many() (dans le pool)."""
+        return await self._offload(self.service.update_many, task_update, ids, done)
+
+    async def toggle_many(self, ids: Optional[List[int]] = None, done: Optional[bool] = None) -> Dict[int, str]:
+        """Voir TaskService.toggle_many() (dans le pool)."""
+        return await self._offload(self.service.toggle_many, ids, done)
+
+    async def delete_many(self, ids: Optional[List[int]] = None, done: Optional[bool] = None) -> Dict[int, str]:
+        """Voir TaskService.delete_many() (dans le pool)."""
+        return await self._offload(self.service.delete_many, ids, done)
@@ -0,0 +1,128 @@
+"""
+Journal borné des changements de tâches (synchronisation différentielle).
+
+Le ChangeLog garde, pour chaque tâche modifiée récemment, la version de
+la mutation qui l'a changée en dernier, et une pierre tombale pour les
+tâches supprimées. GET /tasks/changes?since=v en tire les tâches créées,
+modifiées ou supprimées depuis la version v, sans renvoyer toute la
+liste.
+
+Le journal est compacté par tâche (une entrée par ID, déplacée en fin
+à chaque changement) et borné en nombre d'entrées: l'entrée la plus
+ancienne est évincée et le plancher (`floor`) remonte à sa version. Une
+version antérieure au plancher ne peut plus être servie: le client doit
+refaire une synchronisation complète (resync). Il en va de même si des
+écritures ont échappé au journal (autre processus sur une base SQLite
+partagée): le plancher remonte à la version observée avant la mutation.
+"""
+
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+
+# Nombre d'entrées par défaut (une par tâche changée)
+DEFAULT_MAX_ENTRIES: int = 50_000
+
+
+class ChangeLog:
+    """
+    Dernière version de changement par tâche, avec pierres tombales.
+
+    Les écritures (record) se font sous le verrou d'écriture du service,
+    les lectures (since) sous son verrou en lecture.
+
+    Exemple:
+        >>> log = ChangeLog(version=0)
+        >>> log.record(0, 1, [1, 2])
+        >>> log.record(1, 2, [2], deleted=True)
+        >>> log.since(1, current=2)
+        ([], [2])
+    """
+
+    def __init__(self, version: int = 0, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """
+        Initialise le journal.
+
+        Args:
+            version (int): Version du stockage au démarrage (plancher initial).
+            max_entries (int): Nombre maximal de tâches suivies.
+        """
+        self._entries: "OrderedDict[int, int]" = OrderedDict()
+        self._tombstones: Set[int] = set()
+        self._max_entries: int = max_entries
+        self._floor: int = version
+        self._version: int = version
+
+    @property
+    def version(self) -> int:
+        """Version de la dernière mutation enregistrée."""
+        return self._version
+
+    @property
+    def floor(self) -> int:
+        """Plus ancienne version depuis laquelle les changements sont complets."""
+        return self._floor
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(
+        self,
+        before: int,
+        version: int,
+        task_ids: Iterable[int],
+        deleted: bool = False
+    ) -> None:
+        """
+        Enregistre une mutation.
+
+        Args:
+            before (int): Version du stockage avant la mutation.
+            version (int): Version atteinte par la mutation.
+            task_ids (Iterable[int]): Tâches changées.
+            deleted (bool): True si les tâches ont été supprimées.
+        """
+        if before != self._version:
+            # Des mutations entre _version et before n'ont pas été vues
+            self._floor = max(self._floor, before)
+        entries = self._entries
+        for task_id in task_ids:
+            if task_id in entries:
+                entries.move_to_end(task_id)
+            entries[task_id] = version
+            if deleted:
+                self._tombstones.add(task_id)
+        while len(entries) > self._max_entries:
+            task_id, evicted = entries.popitem(last=False)
+            self._tombstones.discard(task_id)
+            self._floor = max(self._floor, evicted)
+        self._version = version
+
+    def since(self, version: int, current: int) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Liste les tâches changées après `version`.
+
+        Args:
+            version (int): Version connue du client.
+            current (int): Version actuelle du stockage.
+
+        Returns:
+            Optional[Tuple[List[int], List[int]]]: IDs des tâches créées ou
+            modifiées et IDs des tâches supprimées, du plus ancien au plus
+            récent changement; None si le journal ne couvre pas la période
+            (resync).
+        """
+        if current != self._version:
+            # Écritures d'un autre processus, absentes du journal
+            return ([], []) if version == current else None
+        if version < self._floor or version > self._version:
+            return None
+        changed: List[int] = []
+        deleted: List[int] = []
+        for task_id, changed_at in reversed(self._entries.items()):
+            if changed_at <= version:
+                break
+            (deleted if task_id in self._tombstones else changed).append(task_id)
+        changed.reverse()
+        deleted.reverse()
+        return changed, deleted
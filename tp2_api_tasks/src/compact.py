@@ -0,0 +1,361 @@
+"""
+Stockage en mémoire compact, en colonnes.
+
+CompactTaskStore ne garde aucun objet Task: les tâches sont rangées en
+colonnes indexées directement par leur ID (les IDs sont attribués de
+façon dense et jamais réutilisés):
+
+- statut: un octet par ID dans un bytearray (absente, en cours,
+  terminée). Le filtre `done` et le parcours des IDs lisent cette
+  colonne par tranches, en C (bytes.translate() et itertools.compress());
+- version: un entier 64 bits par ID (array);
+- texte: titre et description encodés en UTF-8 dans un unique tampon,
+  précédés d'un en-tête de 6 octets (longueurs; -1 pour une description
+  absente), et un décalage 64 bits par ID vers cet enregistrement.
+
+Une modification de texte ajoute un nouvel enregistrement et publie son
+décalage par une seule écriture dans la colonne: un lecteur sans verrou
+lit l'ancien ou le nouvel enregistrement, jamais un mélange. L'espace
+des enregistrements remplacés est récupéré par compactage quand il
+dépasse la moitié du tampon.
+
+Les objets Task ne sont construits qu'aux lectures (frontière de
+l'API). Les compteurs par statut sont tenus à jour à chaque écriture;
+check_consistency() les recompte sur la colonne. L'index plein texte
+n'est construit qu'à la première recherche.
+"""
+
+import struct
+from array import array
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from concurrency import IdAllocator
+from models import Task, TaskConsistencyError
+from search import InvertedIndex
+from storage import TaskStore
+
+
+# Valeurs de la colonne de statut
+_ABSENT: int = 0
+_PENDING: int = 1
+_DONE: int = 2
+
+# Tables de bytes.translate(): statut -> 1 si l'ID est retenu par le filtre
+# `done` (None: toute tâche présente), 0 sinon
+_SELECTORS: Dict[Optional[bool], bytes] = {
+    None: bytes.maketrans(b"\x02", b"\x01"),
+    False: bytes.maketrans(b"\x02", b"\x00"),
+    True: bytes.maketrans(b"\x01\x02", b"\x00\x01"),
+}
+
+# Taille minimale d'une tranche de la colonne de statut lue par _scan()
+_SCAN_CHUNK: int = 4096
+
+# En-tête d'un enregistrement de texte: longueurs du titre et de la
+# description en octets (-1 pour une description absente)
+_HEADER: struct.Struct = struct.Struct("<Hi")
+
+# Taille minimale des enregistrements remplacés avant compactage
+_COMPACT_MIN_BYTES: int = 1 << 20
+
+
+def _record(title: str, description: Optional[str]) -> bytes:
+    """Encode un enregistrement de texte (en-tête, titre, description)."""
+    title_bytes = title.encode("utf-8")
+    if description is None:
+        return _HEADER.pack(len(title_bytes), -1) + title_bytes
+    description_bytes = description.encode("utf-8")
+    return _HEADER.pack(len(title_bytes), len(description_bytes)) + title_bytes + description_bytes
+
+
+def _record_size(text: bytearray, offset: int) -> int:
+    """Taille totale de l'enregistrement qui commence à `offset`."""
+    title_len, description_len = _HEADER.unpack_from(text, offset)
+    return _HEADER.size + title_len + max(description_len, 0)
+
+
+def _read_record(text: bytearray, offset: int) -> Tuple[str, Optional[str]]:
+    """Décode le titre et la description de l'enregistrement à `offset`."""
+    title_len, description_len = _HEADER.unpack_from(text, offset)
+    start = offset + _HEADER.size
+    title = text[start:start + title_len].decode("utf-8")
+    if description_len < 0:
+        return title, None
+    start += title_len
+    return title, text[start:start + description_len].decode("utf-8")
+
+
+class CompactTaskStore(TaskStore):
+    """
+    Stockage en mémoire en colonnes (voir l'en-tête du module).
+
+    Exemple:
+        >>> store = CompactTaskStore()
+        >>> store.insert([Task(id=store.allocate_ids(), title="Acheter du lait")])
+        >>> store.get(1).title
+        'Acheter du lait'
+    """
+
+    def __init__(self) -> None:
+        """Initialise un stockage vide (l'ID 0 n'est jamais attribué)."""
+        self._status: bytearray = bytearray(1)
+        self._versions: "array[int]" = array("q", [0])
+        # Tampon de texte et décalages, remplacés ensemble au compactage
+        self._packed: Tuple[bytearray, "array[int]"] = (bytearray(), array("Q", [0]))
+        self._garbage: int = 0
+        self._counts: List[int] = [0, 0, 0]
+        self._version: int = 0
+        self._search_index: Optional[InvertedIndex] = None
+        self._id_allocator: IdAllocator = IdAllocator()
+
+    # -------------------------------------------------------------- Lecture
+
+    def get(self, task_id: int) -> Optional[Task]:
+        status = self._status
+        if not 0 < task_id < len(status) or status[task_id] == _ABSENT:
+            return None
+        text, offsets = self._packed
+        return self._build(task_id, status[task_id], text, offsets)
+
+    def get_many(self, task_ids: Iterable[int]) -> List[Task]:
+        status = self._status
+        text, offsets = self._packed
+        size = len(status)
+        return [
+            self._build(task_id, status[task_id], text, offsets)
+            for task_id in task_ids
+            if 0 < task_id < size and status[task_id] != _ABSENT
+        ]
+
+    def page(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        return self.get_many(self._scan(done, after_id, limit))
+
+    def page_versions(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[int], List[int]]:
+        task_ids = self._scan(done, after_id, limit)
+        return task_ids, list(map(self._versions.__getitem__, task_ids))
+
+    def ids(self, done: Optional[bool] = None) -> List[int]:
+        return self._scan(done, None, None)
+
+    def count(self, done: Optional[bool] = None) -> int:
+        if done is None:
+            return self._counts[_PENDING] + self._counts[_DONE]
+        return self._counts[_DONE if done else _PENDING]
+
+    def search(self, query: str, done: Optional[bool], limit: int) -> List[Task]:
+        status, wanted = self._status, _DONE if done else _PENDING
+
+        def accept(task_id: int) -> bool:
+            return status[task_id] == wanted
+
+        results = self._searchable().search(query, limit, accept if done is not None else None)
+        return self.get_many(task_id for task_id, _ in results)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def task_version(self, task_id: int) -> Optional[int]:
+        status = self._status
+        if not 0 < task_id < len(status) or status[task_id] == _ABSENT:
+            return None
+        return self._versions[task_id]
+
+    # ------------------------------------------------------------- Écriture
+
+    def allocate_ids(self, count: int = 1) -> int:
+        return self._id_allocator.allocate(count)
+
+    def insert(self, tasks: List[Task]) -> None:
+        if not tasks:
+            return
+        self._ensure_capacity(max(task.id for task in tasks))
+        text, offsets = self._packed
+        status, versions, counts = self._status, self._versions, self._counts
+        for task in tasks:
+            offsets[task.id] = len(text)
+            text += _record(task.title, task.description)
+            self._version += 1
+            versions[task.id] = self._version
+            code = _DONE if task.done else _PENDING
+            counts[code] += 1
+            # Publiée en dernier: un lecteur ne voit la tâche qu'une fois complète
+            status[task.id] = code
+            if self._search_index is not None:
+                self._search_index.index(task.id, task.title, task.description)
+
+    def update(self, task_ids: List[int], changes: Dict[str, Any]) -> List[Task]:
+        title = changes.get("title")
+        description = changes.get("description")
+        done = changes.get("done")
+        updated: List[int] = []
+        for task in self.get_many(task_ids):
+            new_title = title if title is not None else task.title
+            new_description = description if description is not None else task.description
+            if new_title != task.title or new_description != task.description:
+                self._write_text(task.id, new_title, new_description)
+                if self._search_index is not None:
+                    self._search_index.index(task.id, new_title, new_description)
+                self._touch(task.id)
+            if done is not None:
+                self._set_done(task.id, done)
+            updated.append(task.id)
+        self._maybe_compact()
+        return self.get_many(updated)
+
+    def toggle(self, task_ids: List[int]) -> List[Task]:
+        status = self._status
+        toggled = [
+            task_id for task_id in task_ids
+            if 0 < task_id < len(status) and status[task_id] != _ABSENT
+        ]
+        for task_id in toggled:
+            self._set_done(task_id, status[task_id] == _PENDING)
+        return self.get_many(toggled)
+
+    def delete(self, task_ids: List[int]) -> List[Task]:
+        deleted = self.get_many(task_ids)
+        text, offsets = self._packed
+        for task in deleted:
+            code = self._status[task.id]
+            self._status[task.id] = _ABSENT
+            self._counts[code] -= 1
+            self._garbage += _record_size(text, offsets[task.id])
+            if self._search_index is not None:
+                self._search_index.remove(task.id)
+            self._version += 1
+        self._maybe_compact()
+        return deleted
+
+    # ---------------------------------------------------------- Maintenance
+
+    def check_consistency(self) -> None:
+        for code in (_PENDING, _DONE):
+            counted = self._status.count(bytes([code]))
+            if counted != self._counts[code]:
+                raise TaskConsistencyError(
+                    f"Compteur de statut {code} incohérent: {self._counts[code]} maintenu, {counted} recalculé"
+                )
+        task_ids = self.ids()
+        text, offsets = self._packed
+        live = 0
+        for task_id in task_ids:
+            if offsets[task_id] >= len(text):
+                raise TaskConsistencyError(f"Décalage hors du tampon de texte: ID={task_id}")
+            live += _record_size(text, offsets[task_id])
+            if not 0 < self._versions[task_id] <= self._version:
+                raise TaskConsistencyError(f"Version de tâche incohérente: ID={task_id}")
+        if live + self._garbage != len(text):
+            raise TaskConsistencyError("Taille du tampon de texte incohérente avec les enregistrements")
+        if set(self._searchable()) != set(task_ids):
+            raise TaskConsistencyError("Index plein texte incohérent avec les tâches stockées")
+
+    def memory_usage(self) -> int:
+        """Octets occupés par les colonnes (hors index plein texte)."""
+        text, offsets = self._packed
+        return (
+            len(self._status)
+            + len(text)
+            + self._versions.itemsize * len(self._versions)
+            + offsets.itemsize * len(offsets)
+        )
+
+    # ------------------------------------------------------------- Interne
+
+    @staticmethod
+    def _build(task_id: int, code: int, text: bytearray, offsets: "array[int]") -> Task:
+        """Construit la Task d'un ID présent (frontière de l'API)."""
+        title, description = _read_record(text, offsets[task_id])
+        return Task(id=task_id, title=title, description=description, done=code == _DONE)
+
+    def _scan(self, done: Optional[bool], after_id: Optional[int], limit: Optional[int]) -> List[int]:
+        """
+        IDs (triés) d'ID > `after_id` dont le statut correspond, au plus `limit`.
+
+        La colonne de statut est lue par tranches (de taille croissante
+        si `limit` est fixé): bytes.translate() en fait des sélecteurs 0/1
+        et itertools.compress() en extrait les IDs, le tout en C.
+        """
+        status = self._status
+        size = len(status)
+        table = _SELECTORS[done]
+        task_ids: List[int] = []
+        position = 1 if after_id is None else max(after_id + 1, 1)
+        chunk = size if limit is None else max(_SCAN_CHUNK, 2 * limit)
+        while position < size:
+            end = min(size, position + chunk)
+            task_ids.extend(compress(range(position, end), status[position:end].translate(table)))
+            if limit is not None and len(task_ids) >= limit:
+                del task_ids[limit:]
+                break
+            position = end
+            chunk *= 2
+        return task_ids
+
+    def _ensure_capacity(self, task_id: int) -> None:
+        """Agrandit les colonnes pour qu'elles couvrent `task_id`."""
+        missing = task_id + 1 - len(self._status)
+        if missing > 0:
+            self._versions.frombytes(bytes(self._versions.itemsize * missing))
+            offsets = self._packed[1]
+            offsets.frombytes(bytes(offsets.itemsize * missing))
+            self._status.extend(bytes(missing))
+
+    def _write_text(self, task_id: int, title: str, description: Optional[str]) -> None:
+        """Ajoute un nouvel enregistrement de texte et publie son décalage."""
+        text, offsets = self._packed
+        self._garbage += _record_size(text, offsets[task_id])
+        offset = len(text)
+        text += _record(title, description)
+        offsets[task_id] = offset
+
+    def _set_done(self, task_id: int, done: bool) -> None:
+        """Change le statut d'une tâche présente."""
+        code = _DONE if done else _PENDING
+        previous = self._status[task_id]
+        if previous != code:
+            self._counts[previous] -= 1
+            self._counts[code] += 1
+            self._status[task_id] = code
+            self._touch(task_id)
+
+    def _touch(self, task_id: int) -> None:
+        """Incrémente la version globale et l'attribue à la tâche modifiée."""
+        self._version += 1
+        self._versions[task_id] = self._version
+
+    def _maybe_compact(self) -> None:
+        """Réécrit le tampon de texte si les enregistrements remplacés y dominent."""
+        text, offsets = self._packed
+        if self._garbage < max(_COMPACT_MIN_BYTES, len(text) // 2):
+            return
+        compacted = bytearray()
+        new_offsets = array("Q", bytes(offsets.itemsize * len(offsets)))
+        for task_id in self._scan(None, None, None):
+            offset = offsets[task_id]
+            new_offsets[task_id] = len(compacted)
+            compacted += text[offset:offset + _record_size(text, offset)]
+        # Publication atomique du couple (tampon, décalages)
+        self._packed = (compacted, new_offsets)
+        self._garbage = 0
+
+    def _searchable(self) -> InvertedIndex:
+        """Renvoie l'index plein texte, en le construisant s'il est absent."""
+        if self._search_index is None:
+            search_index = InvertedIndex()
+            text, offsets = self._packed
+            for task_id in self._scan(None, None, None):
+                search_index.index(task_id, *_read_record(text, offsets[task_id]))
+            self._search_index = search_index
+        return self._search_index
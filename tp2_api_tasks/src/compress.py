@@ -0,0 +1,247 @@
+"""
+Compression des réponses HTTP (gzip, et brotli ou zstd si disponibles).
+
+CompressionMiddleware est un middleware ASGI pur qui compresse les
+réponses complètes d'un type textuel (JSON, texte) au-delà d'une taille
+minimale, selon l'en-tête Accept-Encoding du client:
+- gzip (bibliothèque standard) toujours, brotli si le paquet `brotli`
+  est installé, zstd avec `compression.zstd` (Python 3.14+); à qualité
+  égale dans Accept-Encoding, brotli puis zstd sont préférés à gzip;
+- les petites réponses (GET /stats, une tâche) et les réponses en flux
+  (export NDJSON, GET /tasks/events) passent telles quelles;
+- les réponses qui portent un ETag (GET /tasks, GET /tasks/{id}) sont
+  gardées compressées dans un cache LRU borné en octets, indexé par
+  chemin, paramètres, ETag et encodage: un sondage répété de la même
+  liste ne recompresse rien. L'ETag d'une réponse compressée devient
+  faible (W/), If-None-Match l'accepte tel quel;
+- les gros corps sont compressés dans un thread pour ne pas bloquer la
+  boucle d'événements.
+"""
+
+import gzip
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    brotli = None
+
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover - Python < 3.14
+    zstd = None
+
+
+GZIP: str = "gzip"
+BROTLI: str = "br"
+ZSTD: str = "zstd"
+
+# Taille minimale d'un corps compressé (octets)
+DEFAULT_MINIMUM_SIZE: int = 1024
+
+# Niveaux adaptés à une compression à la volée (voir bench_compression.py)
+GZIP_LEVEL: int = 6
+BROTLI_QUALITY: int = 5
+ZSTD_LEVEL: int = 3
+
+# Au-delà, la compression se fait dans un thread du pool
+_THREAD_THRESHOLD: int = 64 * 1024
+
+_COMPRESSIBLE_TYPES: Tuple[str, ...] = ("application/json", "text/plain", "text/html", "text/csv")
+
+_CacheKey = Tuple[str, bytes, str, str]
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0: même entrée, mêmes octets
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def _zstd(data: bytes) -> bytes:
+    return zstd.compress(data, level=ZSTD_LEVEL)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Encodeurs disponibles, par ordre de préférence."""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encoders[BROTLI] = _brotli
+    if zstd is not None:
+        encoders[ZSTD] = _zstd
+    encoders[GZIP] = _gzip
+    return encoders
+
+
+def choose_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Choisit l'encodage selon l'en-tête Accept-Encoding.
+
+    Args:
+        accept_encoding (str): Valeur de l'en-tête (ex: "gzip, br;q=0.8").
+        encodings (List[str]): Encodages disponibles, par ordre de préférence.
+
+    Returns:
+        Optional[str]: L'encodage de plus haute qualité accepté (à qualité
+        égale, le premier de `encodings`), ou None.
+    """
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    default = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressedBodyCache:
+    """
+    Corps compressés des réponses à ETag, en LRU borné en octets.
+
+    Utilisé depuis la boucle d'événements uniquement (pas de verrou).
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._entries: "OrderedDict[_CacheKey, bytes]" = OrderedDict()
+        self._max_bytes: int = max_bytes
+        self._bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: _CacheKey) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: _CacheKey, body: bytes) -> None:
+        if len(body) > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = body
+        self._bytes += len(body)
+        while self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compression des réponses (voir l'en-tête du module).
+
+    Exemple:
+        >>> app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        cache_bytes: int = 16 * 1024 * 1024
+    ) -> None:
+        """
+        Initialise le middleware.
+
+        Args:
+            app (ASGIApp): Application encapsulée.
+            minimum_size (int): Taille en dessous de laquelle un corps
+                                n'est pas compressé.
+            cache_bytes (int): Taille maximale du cache des corps
+                               compressés (0 pour le désactiver).
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders()
+        self.cache = CompressedBodyCache(cache_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, streaming
+            if message["type"] == "http.response.start":
+                # Retenu jusqu'au corps: les en-têtes dépendent de sa taille
+                start = message
+                return
+            if streaming or message["type"] != "http.response.body":
+                await send(message)
+                return
+            if message.get("more_body", False):
+                # Réponse en flux: transmise sans compression
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+            body = await self._compress(scope, start, message.get("body", b""), encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _compress(self, scope: Scope, start: Message, body: bytes, encoding: str) -> bytes:
+        """Compresse `body` si la réponse s'y prête et met à jour les en-têtes de `start`."""
+        headers = MutableHeaders(scope=start)
+        content_type = headers.get("content-type", "")
+        if (
+            len(body) < self.minimum_size
+            or "content-encoding" in headers
+            or not content_type.startswith(_COMPRESSIBLE_TYPES)
+        ):
+            return body
+        headers.add_vary_header("Accept-Encoding")
+
+        etag = headers.get("etag")
+        key = (scope["path"], scope.get("query_string", b""), etag, encoding) if etag else None
+        compressed = self.cache.get(key) if key is not None else None
+        if compressed is None:
+            encoder = self.encoders[encoding]
+            if len(body) >= _THREAD_THRESHOLD:
+                compressed = await anyio.to_thread.run_sync(encoder, body)
+            else:
+                compressed = encoder(body)
+            if key is not None:
+                self.cache.put(key, compressed)
+        if len(compressed) >= len(body):
+            return body
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        return compressed
@@ -0,0 +1,188 @@
+"""
+Primitives de synchronisation du service de tâches.
+
+Les endpoints synchrones de FastAPI s'exécutent en parallèle dans le pool
+de threads de Starlette: le service doit donc protéger ses structures
+sans pour autant sérialiser toutes les lectures.
+"""
+
+import threading
+from typing import Optional
+
+
+class ReadWriteLock:
+    """
+    Verrou lecteurs/rédacteur, avec priorité aux rédacteurs.
+
+    Plusieurs lecteurs peuvent détenir le verrou simultanément; un
+    rédacteur l'obtient seul. Un rédacteur en attente bloque les nouveaux
+    lecteurs pour ne pas être affamé. Le thread rédacteur peut reprendre le
+    verrou (en lecture ou en écriture) sans se bloquer lui-même.
+
+    Exemple:
+        >>> lock = ReadWriteLock()
+        >>> with lock.read:
+        ...     pass
+        >>> with lock.write:
+        ...     pass
+    """
+
+    def __init__(self) -> None:
+        """Initialise un verrou libre."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers: int = 0
+        self._writers_waiting: int = 0
+        self._writer: Optional[int] = None
+        self._write_depth: int = 0
+        self.read = _ReadSide(self)
+        self.write = _WriteSide(self)
+
+    def acquire_read(self) -> None:
+        """Acquiert le verrou en lecture."""
+        if self._writer == threading.get_ident():
+            self._write_depth += 1
+            return
+        with self._condition:
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        """Libère le verrou en lecture."""
+        if self._writer == threading.get_ident():
+            self._write_depth -= 1
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Acquiert le verrou en écriture (exclusif)."""
+        ident = threading.get_ident()
+        if self._writer == ident:
+            self._write_depth += 1
+            return
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = ident
+
+    def try_acquire_write(self) -> bool:
+        """
+        Acquiert le verrou en écriture sans attendre.
+
+        Returns:
+            bool: True si le verrou est acquis (à libérer par
+            release_write()), False s'il est détenu ou attendu par un autre
+            thread.
+        """
+        ident = threading.get_ident()
+        if self._writer == ident:
+            self._write_depth += 1
+            return True
+        with self._condition:
+            if self._writer is not None or self._readers or self._writers_waiting:
+                return False
+            self._writer = ident
+            return True
+
+    def release_write(self) -> None:
+        """Libère le verrou en écriture."""
+        if self._write_depth:
+            self._write_depth -= 1
+            return
+        with self._condition:
+            self._writer = None
+            self._condition.notify_all()
+
+
+class _ReadSide:
+    """Gestionnaire de contexte pour la lecture (`with lock.read:`)."""
+
+    __slots__ = ("_lock",)
+
+    def __init__(self, lock: ReadWriteLock) -> None:
+        self._lock = lock
+
+    def __enter__(self) -> None:
+        self._lock.acquire_read()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._lock.release_read()
+
+
+class _WriteSide:
+    """Gestionnaire de contexte pour l'écriture (`with lock.write:`)."""
+
+    __slots__ = ("_lock",)
+
+    def __init__(self, lock: ReadWriteLock) -> None:
+        self._lock = lock
+
+    def __enter__(self) -> None:
+        self._lock.acquire_write()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._lock.release_write()
+
+
+class IdAllocator:
+    """
+    Générateur d'IDs atomique et monotone.
+
+    Permet de réserver un ID (ou une plage d'IDs) avant de prendre le
+    verrou d'écriture du service, et garantit qu'aucun ID n'est attribué
+    deux fois, même sous accès concurrent.
+
+    Exemple:
+        >>> ids = IdAllocator()
+        >>> ids.allocate()
+        1
+        >>> ids.allocate(10)
+        2
+        >>> ids.allocate()
+        12
+    """
+
+    def __init__(self, start: int = 1) -> None:
+        """
+        Initialise le générateur.
+
+        Args:
+            start (int): Premier ID attribué.
+        """
+        self._lock = threading.Lock()
+        self._next: int = start
+
+    @property
+    def next_id(self) -> int:
+        """Prochain ID qui sera attribué."""
+        return self._next
+
+    def allocate(self, count: int = 1) -> int:
+        """
+        Réserve `count` IDs consécutifs.
+
+        Args:
+            count (int): Taille de la plage à réserver.
+
+        Returns:
+            int: Premier ID de la plage.
+        """
+        with self._lock:
+            first = self._next
+            self._next += count
+        return first
+
+    def advance(self, next_id: int) -> None:
+        """
+        Garantit que les prochains IDs attribués seront >= `next_id`.
+
+        Args:
+            next_id (int): Borne inférieure du prochain ID.
+        """
+        with self._lock:
+            self._next = max(self._next, next_id)
@@ -0,0 +1,303 @@
+"""
+Flux des changements de tâches (Server-Sent Events).
+
+Chaque mutation du TaskService publie un événement dans un
+EventBroadcaster, sous son verrou d'écriture: les événements sortent
+dans l'ordre des versions du stockage. Un événement porte la version
+globale atteinte après la mutation, qui sert d'identifiant SSE:
+
+    id: 57
+    event: updated
+    data: {"version":57,"tasks":[{"id":3,"title":"...","done":true,...}]}
+
+Types: created, updated, toggled (tâches dans leur nouvel état),
+deleted (`ids`) et resync. Le message SSE est formaté une seule fois, à
+la publication, puis partagé par tous les abonnés.
+
+- reprise: un historique borné (nombre d'événements et octets) rejoue
+  les événements postérieurs au `Last-Event-ID` d'un client qui se
+  reconnecte. S'ils ne sont plus tous dans l'historique (ou si l'ID
+  vient d'un autre état du stockage), le client reçoit `resync` et doit
+  relire GET /tasks.
+- contre-pression: chaque abonné a un tampon borné (événements et
+  octets). Un abonné trop lent pour suivre est déconnecté une fois son
+  tampon vidé; il reprend ensuite depuis son dernier ID.
+- boucles d'événements: la publication vient des threads du pool; elle
+  ne fait qu'un call_soon_threadsafe() par boucle, qui répartit ensuite
+  l'événement entre ses abonnés.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, Iterable, List, NamedTuple, Optional, Set
+
+from models import Task
+from serialization import encode_task
+
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM_MEDIA_TYPE: str = "text/event-stream"
+
+# Types d'événements
+CREATED: str = "created"
+UPDATED: str = "updated"
+TOGGLED: str = "toggled"
+DELETED: str = "deleted"
+RESYNC: str = "resync"
+
+# Délai de reconnexion conseillé au client (millisecondes) et intervalle
+# des commentaires de maintien de connexion (secondes)
+RETRY_MS: int = 3000
+HEARTBEAT_SECONDS: float = 15.0
+
+_PING: bytes = b": ping\n\n"
+
+
+class TaskEvent(NamedTuple):
+    """Événement publié: version atteinte et message SSE formaté."""
+    version: int
+    message: bytes
+
+
+def _format(version: int, kind: str, data: bytes) -> TaskEvent:
+    """Formate un message SSE (data tient sur une ligne: JSON compact)."""
+    return TaskEvent(version, b"id: %d\nevent: %s\ndata: %s\n\n" % (version, kind.encode(), data))
+
+
+def tasks_event(version: int, kind: str, tasks: Iterable[Task]) -> TaskEvent:
+    """Événement created, updated ou toggled: tâches dans leur nouvel état."""
+    fragments = b",".join(map(encode_task, tasks))
+    return _format(version, kind, b'{"version":%d,"tasks":[%s]}' % (version, fragments))
+
+
+def deleted_event(version: int, task_ids: Iterable[int]) -> TaskEvent:
+    """Événement deleted: IDs des tâches supprimées."""
+    ids = ",".join(map(str, task_ids)).encode()
+    return _format(version, DELETED, b'{"version":%d,"ids":[%s]}' % (version, ids))
+
+
+class Subscription:
+    """
+    Abonnement d'un client au flux, rattaché à sa boucle d'événements.
+
+    Le tampon n'est manipulé que depuis cette boucle (pas de verrou).
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_events: int,
+        max_bytes: int
+    ) -> None:
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.replay: List[TaskEvent] = []
+        # Version déjà connue du client à l'abonnement
+        self.version: int = 0
+        self.resync: Optional[int] = None
+        self.overflowed: bool = False
+        self._max_events: int = max_events
+        self._max_bytes: int = max_bytes
+        self._buffer: Deque[TaskEvent] = deque()
+        self._buffered_bytes: int = 0
+        self._wakeup: asyncio.Event = asyncio.Event()
+
+    def push(self, event: TaskEvent) -> None:
+        """Ajoute un événement, ou marque l'abonné en débordement si son tampon est plein."""
+        if self.overflowed:
+            return
+        size = len(event.message)
+        if self._buffer and (
+            len(self._buffer) >= self._max_events or self._buffered_bytes + size > self._max_bytes
+        ):
+            self.overflowed = True
+        else:
+            self._buffer.append(event)
+            self._buffered_bytes += size
+        self._wakeup.set()
+
+    async def next_event(self, timeout: float) -> Optional[TaskEvent]:
+        """
+        Attend le prochain événement du tampon.
+
+        Returns:
+            Optional[TaskEvent]: L'événement, ou None si rien n'est arrivé
+            avant `timeout` ou si l'abonné a débordé et que son tampon est vide.
+        """
+        if not self._buffer and not self.overflowed:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self._buffer:
+            return None
+        event = self._buffer.popleft()
+        self._buffered_bytes -= len(event.message)
+        return event
+
+
+class EventBroadcaster:
+    """
+    Diffuseur en mémoire des événements de tâches (voir l'en-tête du module).
+
+    Exemple:
+        >>> broadcaster = EventBroadcaster(version=0)
+        >>> broadcaster.publish(deleted_event(1, [7]))
+        >>> broadcaster.version
+        1
+    """
+
+    def __init__(
+        self,
+        version: int = 0,
+        history_events: int = 1024,
+        history_bytes: int = 8 * 1024 * 1024,
+        subscriber_events: int = 256,
+        subscriber_bytes: int = 1024 * 1024
+    ) -> None:
+        """
+        Initialise le diffuseur.
+
+        Args:
+            version (int): Version du stockage au démarrage: les clients
+                           dont le dernier ID est antérieur reçoivent resync.
+            history_events (int): Nombre maximal d'événements rejouables.
+            history_bytes (int): Taille maximale de l'historique.
+            subscriber_events (int): Événements en attente par abonné.
+            subscriber_bytes (int): Octets en attente par abonné.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._history: Deque[TaskEvent] = deque()
+        self._history_bytes: int = 0
+        self._max_history_events: int = history_events
+        self._max_history_bytes: int = history_bytes
+        # Tous les événements de version > _floor sont dans l'historique
+        self._floor: int = version
+        self._version: int = version
+        self._subscriber_events: int = subscriber_events
+        self._subscriber_bytes: int = subscriber_bytes
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def version(self) -> int:
+        """Version du dernier événement publié (ou version initiale)."""
+        return self._version
+
+    @property
+    def subscribers(self) -> int:
+        """Nombre d'abonnés connectés."""
+        return len(self._subscribers)
+
+    def publish(self, event: TaskEvent) -> None:
+        """
+        Publie un événement (appelé sous le verrou d'écriture du service).
+
+        Args:
+            event (TaskEvent): Événement de version supérieure au précédent.
+        """
+        with self._lock:
+            self._version = event.version
+            self._history.append(event)
+            self._history_bytes += len(event.message)
+            while len(self._history) > 1 and (
+                len(self._history) > self._max_history_events
+                or self._history_bytes > self._max_history_bytes
+            ):
+                evicted = self._history.popleft()
+                self._history_bytes -= len(evicted.message)
+                self._floor = evicted.version
+            loops = {subscription.loop for subscription in self._subscribers}
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, loop, event)
+            except RuntimeError:
+                # Boucle fermée: ses abonnés ne liront plus rien
+                self._drop_loop(loop)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Abonne un client depuis la boucle d'événements courante.
+
+        Args:
+            last_event_id (Optional[int]): Dernière version reçue par le
+                                           client (None: flux en direct seul).
+
+        Returns:
+            Subscription: L'abonnement, avec la version de départ et les
+            événements à rejouer ou la version à annoncer dans un resync.
+        """
+        subscription = Subscription(
+            asyncio.get_running_loop(), self._subscriber_events, self._subscriber_bytes
+        )
+        with self._lock:
+            subscription.version = self._version if last_event_id is None else last_event_id
+            if last_event_id is not None:
+                if self._floor <= last_event_id <= self._version:
+                    subscription.replay = [
+                        event for event in self._history if event.version > last_event_id
+                    ]
+                else:
+                    subscription.resync = self._version
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Retire un abonné (fin du flux ou déconnexion)."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, event: TaskEvent) -> None:
+        """Répartit un événement entre les abonnés de `loop` (exécuté dans `loop`)."""
+        with self._lock:
+            subscriptions = [s for s in self._subscribers if s.loop is loop]
+        for subscription in subscriptions:
+            subscription.push(event)
+
+    def _drop_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Retire les abonnés d'une boucle fermée."""
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s.loop is not loop}
+
+
+async def event_stream(
+    broadcaster: EventBroadcaster,
+    last_event_id: Optional[int] = None,
+    heartbeat: float = HEARTBEAT_SECONDS
+) -> AsyncIterator[bytes]:
+    """
+    Produit le flux SSE d'un client jusqu'à sa déconnexion.
+
+    Args:
+        broadcaster (EventBroadcaster): Source des événements.
+        last_event_id (Optional[int]): En-tête Last-Event-ID du client.
+        heartbeat (float): Intervalle des commentaires de maintien (s).
+
+    Yields:
+        bytes: Messages SSE.
+    """
+    subscription = broadcaster.subscribe(last_event_id)
+    try:
+        yield b"retry: %d\n\n" % RETRY_MS
+        last = subscription.version
+        if subscription.resync is not None:
+            last = subscription.resync
+            yield _format(last, RESYNC, b'{"version":%d}' % last).message
+        for event in subscription.replay:
+            last = event.version
+            yield event.message
+        while True:
+            event = await subscription.next_event(heartbeat)
+            if event is None:
+                if subscription.overflowed:
+                    logger.warning("Abonné trop lent déconnecté (dernier ID envoyé: %s)", last)
+                    return
+                yield _PING
+            elif event.version > last:
+                # Un événement déjà rejoué peut aussi arriver par le tampon
+                last = event.version
+                yield event.message
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,155 @@
+"""
+Clés d'idempotence des créations (en-tête Idempotency-Key de POST /tasks).
+
+Un client qui renvoie POST /tasks après un délai d'attente dépassé ne
+sait pas si la première requête a abouti. Avec la même clé
+Idempotency-Key, la seconde requête reçoit la réponse 201 de la
+première, sans nouvelle création:
+- la réponse (corps JSON de la tâche) est gardée dans un cache LRU
+  borné en nombre d'entrées et en âge (TTL);
+- deux requêtes simultanées avec la même clé: la seconde attend le
+  résultat de la première (un concurrent.futures.Future, utilisable
+  depuis n'importe quel thread ou boucle d'événements);
+- une clé réutilisée avec un autre contenu est refusée
+  (IdempotencyConflict, 422);
+- une création en échec n'est pas gardée: les requêtes en attente
+  reçoivent la même erreur et le client peut réessayer avec la même clé;
+- une requête en cours n'est jamais évincée (LRU ou TTL): sinon un
+  renvoi deviendrait propriétaire de la clé (doublon) et les requêtes en
+  attente ne seraient jamais réveillées. complete() et fail() agissent
+  sur l'entrée renvoyée par begin(), pas sur la clé.
+
+Le cache est propre à chaque processus (un par worker uvicorn).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+
+# Valeurs par défaut: 10 000 clés, gardées 24 heures
+DEFAULT_MAX_ENTRIES: int = 10_000
+DEFAULT_TTL_SECONDS: float = 24 * 3600.0
+
+
+class IdempotencyConflict(Exception):
+    """Clé déjà utilisée pour une requête de contenu différent."""
+
+
+class _Entry:
+    """Requête associée à une clé: empreinte du contenu, date, résultat."""
+
+    __slots__ = ("key", "fingerprint", "created", "result")
+
+    def __init__(self, key: str, fingerprint: str, created: float) -> None:
+        self.key: str = key
+        self.fingerprint: str = fingerprint
+        self.created: float = created
+        self.result: "Future[bytes]" = Future()
+
+
+class IdempotencyCache:
+    """
+    Réponses des requêtes idempotentes, par clé (voir l'en-tête du module).
+
+    Exemple:
+        >>> cache = IdempotencyCache()
+        >>> owner, entry = cache.begin("cle-1", '{"title":"Lait"}')
+        >>> owner
+        True
+        >>> cache.complete(entry, b'{"id":1}')
+        >>> cache.begin("cle-1", '{"title":"Lait"}')[1].result.result()
+        b'{"id":1}'
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries (int): Nombre maximal de clés (éviction LRU).
+            ttl (float): Durée de validité d'une clé, en secondes.
+            clock (Callable[[], float]): Horloge monotone (remplaçable en test).
+        """
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._max_entries: int = max_entries
+        self._ttl: float = ttl
+        self._clock: Callable[[], float] = clock
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[bool, _Entry]:
+        """
+        Enregistre une requête, ou retrouve celle qui a déjà utilisé la clé.
+
+        Args:
+            key (str): Valeur de l'en-tête Idempotency-Key.
+            fingerprint (str): Empreinte du contenu de la requête.
+
+        Returns:
+            Tuple[bool, _Entry]: (True, entrée à passer à complete() ou
+            fail()) si l'appelant doit exécuter la requête; sinon (False,
+            entrée de la requête d'origine, dont le résultat `result` est
+            déjà disponible ou à attendre).
+
+        Raises:
+            IdempotencyConflict: Si la clé a servi pour un autre contenu.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.result.done() and now - entry.created >= self._ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    raise IdempotencyConflict(
+                        f"La clé d'idempotence {key!r} a déjà servi pour une autre requête"
+                    )
+                self._entries.move_to_end(key)
+                return False, entry
+
+            entry = _Entry(key, fingerprint, now)
+            self._entries[key] = entry
+            self._evict(now)
+            return True, entry
+
+    def complete(self, entry: _Entry, body: bytes) -> None:
+        """Fournit la réponse de la requête d'origine (réveille les requêtes en attente)."""
+        if not entry.result.done():
+            entry.result.set_result(body)
+
+    def fail(self, entry: _Entry, error: BaseException) -> None:
+        """Oublie une requête en échec et transmet l'erreur aux requêtes en attente."""
+        with self._lock:
+            # La clé peut déjà désigner une autre requête (entrée expirée puis réutilisée)
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+        if not entry.result.done():
+            entry.result.set_exception(error)
+
+    def _evict(self, now: float) -> None:
+        """
+        Retire les entrées expirées en tête, puis les moins récentes au-delà
+        de la limite. Les requêtes en cours sont sautées: le cache peut
+        alors dépasser la limite d'autant de requêtes simultanées.
+        """
+        excess = len(self._entries) - self._max_entries
+        evicted: List[str] = []
+        for key, entry in self._entries.items():
+            if excess <= 0 and now - entry.created < self._ttl:
+                break
+            if entry.result.done():
+                evicted.append(key)
+                excess -= 1
+        for key in evicted:
+            del self._entries[key]
@@ -0,0 +1,189 @@
+"""
+Index ordonnés pour le service de tâches.
+
+Fournit une liste triée découpée en blocs (à la manière de
+`sortedcontainers.SortedList`) permettant l'insertion, la suppression et
+le positionnement sur une clé en temps quasi logarithmique, sans jamais
+trier ni copier l'ensemble des clés.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterable, Iterator, List
+
+
+class SortedIndex:
+    """
+    Ensemble de clés triées, stockées par blocs de taille bornée.
+
+    Chaque bloc est une liste triée; `_maxes` contient la plus grande clé
+    de chaque bloc et sert à localiser le bon bloc par dichotomie. Un bloc
+    qui dépasse 2 * `load` éléments est coupé en deux, ce qui borne le coût
+    des insertions et suppressions au sein d'un bloc.
+
+    Exemple:
+        >>> index = SortedIndex()
+        >>> for key in (3, 1, 2):
+        ...     index.add(key)
+        >>> list(index.iter_after(1))
+        [2, 3]
+    """
+
+    def __init__(self, load: int = 512) -> None:
+        """
+        Initialise un index vide.
+
+        Args:
+            load (int): Taille cible d'un bloc.
+        """
+        self._load: int = load
+        self._lists: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._len: int = 0
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable[Any], load: int = 512) -> "SortedIndex":
+        """
+        Construit un index à partir de clés déjà triées et sans doublons.
+
+        Les blocs sont remplis directement, en O(n), sans passer par add().
+
+        Args:
+            keys: Clés triées par ordre croissant.
+            load (int): Taille cible d'un bloc.
+
+        Returns:
+            SortedIndex: L'index construit.
+        """
+        index = cls(load)
+        keys = list(keys)
+        index._lists = [keys[start:start + load] for start in range(0, len(keys), load)]
+        index._maxes = [block[-1] for block in index._lists]
+        index._len = len(keys)
+        return index
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key: Any) -> bool:
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return False
+        block = self._lists[pos]
+        idx = bisect_left(block, key)
+        return idx < len(block) and block[idx] == key
+
+    def __iter__(self) -> Iterator[Any]:
+        for block in self._lists:
+            yield from block
+
+    def __reversed__(self) -> Iterator[Any]:
+        for block in reversed(self._lists):
+            yield from reversed(block)
+
+    def add(self, key: Any) -> None:
+        """
+        Ajoute une clé à l'index.
+
+        L'ajout d'une clé supérieure à toutes les autres (cas des IDs
+        croissants) se fait par simple append sur le dernier bloc.
+
+        Args:
+            key: Clé comparable à ajouter.
+        """
+        if not self._maxes:
+            self._lists.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        pos = bisect_right(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._lists[pos].append(key)
+            self._maxes[pos] = key
+        else:
+            insort(self._lists[pos], key)
+        self._len += 1
+        self._split(pos)
+
+    def discard(self, key: Any) -> bool:
+        """
+        Retire une clé de l'index si elle est présente.
+
+        Args:
+            key: Clé à retirer.
+
+        Returns:
+            bool: True si la clé était présente.
+        """
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return False
+        block = self._lists[pos]
+        idx = bisect_left(block, key)
+        if idx == len(block) or block[idx] != key:
+            return False
+
+        del block[idx]
+        self._len -= 1
+        if not block:
+            del self._lists[pos]
+            del self._maxes[pos]
+        elif idx == len(block):
+            self._maxes[pos] = block[-1]
+        return True
+
+    def iter_after(self, key: Any = None) -> Iterator[Any]:
+        """
+        Itère dans l'ordre croissant sur les clés strictement supérieures à `key`.
+
+        Args:
+            key: Borne exclusive; None pour partir du début.
+
+        Yields:
+            Les clés triées, en partant de la position de `key`.
+        """
+        if key is None:
+            yield from self
+            return
+        pos = bisect_right(self._maxes, key)
+        if pos == len(self._maxes):
+            return
+        block = self._lists[pos]
+        yield from block[bisect_right(block, key):]
+        for block in self._lists[pos + 1:]:
+            yield from block
+
+    def iter_before(self, key: Any = None) -> Iterator[Any]:
+        """
+        Itère dans l'ordre décroissant sur les clés strictement inférieures à `key`.
+
+        Args:
+            key: Borne exclusive; None pour partir de la fin.
+
+        Yields:
+            Les clés triées en ordre inverse, en partant de la position de `key`.
+        """
+        if key is None:
+            yield from reversed(self)
+            return
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+            if pos < 0:
+                return
+        block = self._lists[pos]
+        yield from reversed(block[:bisect_left(block, key)])
+        for block in reversed(self._lists[:pos]):
+            yield from reversed(block)
+
+    def _split(self, pos: int) -> None:
+        """Coupe le bloc `pos` en deux s'il dépasse la taille maximale."""
+        block = self._lists[pos]
+        if len(block) <= 2 * self._load:
+            return
+        half = block[self._load:]
+        del block[self._load:]
+        self._maxes[pos] = block[-1]
+        self._lists.insert(pos + 1, half)
+        self._maxes.insert(pos + 1, half[-1])
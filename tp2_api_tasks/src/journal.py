@@ -0,0 +1,568 @@
+"""
+Journal d'écriture (write-ahead log) pour le stockage en mémoire.
+
+JournaledTaskStore garde les tâches dans un MemoryTaskStore et rend
+chaque création, mise à jour, bascule ou suppression durable par un
+enregistrement compact (une ligne JSON) ajouté à un journal:
+
+    [lsn, "i", [[id, title, description, done], ...]]   création
+    [lsn, "u", [id, ...], {"title": ..., ...}]          mise à jour
+    [lsn, "t", [id, ...]]                               bascule
+    [lsn, "d", [id, ...]]                               suppression
+
+Le LSN (numéro de séquence) croît d'une unité par enregistrement.
+
+- fsync groupé: un thread dédié écrit les enregistrements en attente et
+  les synchronise sur disque par lots. Un appel au service n'attend que
+  le fsync du lot qui contient son enregistrement (TaskStore.sync()),
+  une fois le verrou d'écriture relâché: les écritures concurrentes
+  partagent ainsi le même fsync.
+- instantanés: tous les `snapshot_every` enregistrements, l'état complet
+  est capturé, le journal bascule sur un nouveau segment, puis
+  l'instantané est écrit en arrière-plan (fichier temporaire, fsync,
+  renommage atomique) et les segments qu'il couvre sont supprimés.
+- démarrage: chargement du dernier instantané puis rejeu des segments
+  qui le suivent. Un dernier enregistrement tronqué (arrêt brutal en
+  cours d'écriture) est ignoré et retiré du journal.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from models import Task, TaskConsistencyError
+from storage import MemoryTaskStore, TaskStore
+
+
+logger = logging.getLogger(__name__)
+
+# Modes de synchronisation du journal
+SYNC_GROUP: str = "group"   # chaque écriture attend le fsync de son lot
+SYNC_ASYNC: str = "async"   # fsync par lots en arrière-plan, sans attente
+
+# Nombre d'enregistrements entre deux instantanés
+DEFAULT_SNAPSHOT_EVERY: int = 100_000
+
+_SEGMENT_PREFIX: str = "journal-"
+_SEGMENT_SUFFIX: str = ".log"
+_SNAPSHOT_PREFIX: str = "snapshot-"
+_SNAPSHOT_SUFFIX: str = ".json"
+
+_OP_INSERT: str = "i"
+_OP_UPDATE: str = "u"
+_OP_TOGGLE: str = "t"
+_OP_DELETE: str = "d"
+
+
+def _segment_name(first_lsn: int) -> str:
+    """Nom du segment de journal commençant au LSN `first_lsn`."""
+    return f"{_SEGMENT_PREFIX}{first_lsn:020d}{_SEGMENT_SUFFIX}"
+
+
+def _snapshot_name(lsn: int) -> str:
+    """Nom de l'instantané couvrant le journal jusqu'au LSN `lsn`."""
+    return f"{_SNAPSHOT_PREFIX}{lsn:020d}{_SNAPSHOT_SUFFIX}"
+
+
+def _parse_lsn(name: str, prefix: str, suffix: str) -> Optional[int]:
+    """Extrait le LSN d'un nom de segment ou d'instantané (None si autre fichier)."""
+    if not (name.startswith(prefix) and name.endswith(suffix)):
+        return None
+    digits = name[len(prefix):len(name) - len(suffix)]
+    return int(digits) if digits.isdigit() else None
+
+
+def _fsync_directory(directory: str) -> None:
+    """Rend durables les créations, renommages et suppressions du répertoire."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Rotation:
+    """Marqueur de la file du journal: les enregistrements suivants vont dans `path`."""
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+
+class _JournalWriter:
+    """
+    Écrivain du journal avec fsync groupé.
+
+    append() attribue un LSN et met l'enregistrement en file; le thread
+    d'écriture vide la file par lots: une écriture et un fsync par lot,
+    quel que soit le nombre d'enregistrements qu'il contient.
+    """
+
+    def __init__(self, path: str, last_lsn: int, commit_delay: float = 0.0) -> None:
+        """
+        Ouvre le segment `path` en ajout et démarre le thread d'écriture.
+
+        Args:
+            path (str): Segment dans lequel écrire.
+            last_lsn (int): Dernier LSN déjà présent dans le journal.
+            commit_delay (float): Attente (en secondes) avant chaque lot,
+                                  pour laisser d'autres écritures le rejoindre.
+        """
+        self._condition = threading.Condition(threading.Lock())
+        self._pending: List[Union[bytes, _Rotation]] = []
+        self._last_lsn: int = last_lsn
+        self._durable_lsn: int = last_lsn
+        self._commit_delay: float = commit_delay
+        self._error: Optional[BaseException] = None
+        self._closed: bool = False
+        self._file = open(path, "ab")
+        self.bytes_written: int = 0
+        self.records: int = 0
+        self.fsyncs: int = 0
+        self._thread = threading.Thread(target=self._run, name="task-journal", daemon=True)
+        self._thread.start()
+
+    @property
+    def last_lsn(self) -> int:
+        """LSN du dernier enregistrement ajouté."""
+        return self._last_lsn
+
+    def append(self, record: List[Any]) -> int:
+        """
+        Ajoute un enregistrement à la file.
+
+        Args:
+            record (List[Any]): Opération et arguments, sans le LSN.
+
+        Returns:
+            int: LSN attribué à l'enregistrement.
+        """
+        with self._condition:
+            if self._error is not None:
+                raise self._error
+            self._last_lsn += 1
+            line = json.dumps([self._last_lsn, *record], ensure_ascii=False, separators=(",", ":"))
+            self._pending.append(line.encode() + b"\n")
+            self._condition.notify_all()
+            return self._last_lsn
+
+    def rotate(self, path: str) -> None:
+        """Les enregistrements ajoutés ensuite iront dans le segment `path`."""
+        with self._condition:
+            self._pending.append(_Rotation(path))
+            self._condition.notify_all()
+
+    def wait(self, lsn: int) -> None:
+        """
+        Attend que le journal soit durable jusqu'au LSN `lsn` inclus.
+
+        Raises:
+            OSError: Si l'écriture du journal a échoué.
+        """
+        with self._condition:
+            while self._durable_lsn < lsn and self._error is None:
+                self._condition.wait()
+            if self._error is not None:
+                raise self._error
+
+    def close(self) -> None:
+        """Écrit les enregistrements en attente puis arrête le thread d'écriture."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        """Boucle du thread d'écriture: un write et un fsync par lot."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+            if self._commit_delay:
+                time.sleep(self._commit_delay)
+            with self._condition:
+                batch, self._pending = self._pending, []
+                lsn = self._last_lsn
+            try:
+                self._write(batch)
+            except OSError as e:
+                logger.error("Échec d'écriture du journal: %s", e)
+                with self._condition:
+                    self._error = e
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self._durable_lsn = lsn
+                self._condition.notify_all()
+
+    def _write(self, batch: List[Union[bytes, _Rotation]]) -> None:
+        """Écrit un lot, en changeant de segment sur les marqueurs de rotation."""
+        lines: List[bytes] = []
+        for item in batch:
+            if isinstance(item, _Rotation):
+                self._flush(lines)
+                lines = []
+                self._file.close()
+                self._file = open(item.path, "ab")
+                _fsync_directory(os.path.dirname(item.path))
+            else:
+                lines.append(item)
+        self._flush(lines)
+
+    def _flush(self, lines: List[bytes]) -> None:
+        """Écrit des lignes dans le segment courant et les synchronise sur disque."""
+        if not lines:
+            return
+        data = b"".join(lines)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.bytes_written += len(data)
+        self.records += len(lines)
+        self.fsyncs += 1
+
+
+class JournaledTaskStore(TaskStore):
+    """
+    Stockage en mémoire rendu durable par un journal d'écriture.
+
+    Les lectures sont servies par le MemoryTaskStore interne. Chaque
+    écriture est appliquée en mémoire puis journalisée; en mode "group",
+    sync() attend le fsync du lot contenant les écritures du thread.
+    Comme pour les autres backends, les écritures sont sérialisées par le
+    TaskService: l'ordre du journal est celui des modifications.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sync_mode: str = SYNC_GROUP,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        commit_delay: float = 0.0
+    ) -> None:
+        """
+        Ouvre (ou crée) le journal et reconstruit l'état des tâches.
+
+        Args:
+            directory (str): Répertoire des segments et des instantanés.
+            sync_mode (str): "group" (attente du fsync) ou "async".
+            snapshot_every (int): Nombre d'enregistrements entre deux instantanés.
+            commit_delay (float): Attente avant chaque fsync groupé (secondes).
+
+        Raises:
+            ValueError: Si le mode de synchronisation est inconnu.
+            TaskConsistencyError: Si un segment est corrompu ailleurs qu'en fin de journal.
+        """
+        if sync_mode not in (SYNC_GROUP, SYNC_ASYNC):
+            raise ValueError(f"Mode de synchronisation inconnu: {sync_mode!r}")
+        self._directory: str = directory
+        self._sync_mode: str = sync_mode
+        # En mode "group", sync() attend le fsync du lot
+        self.blocking: bool = sync_mode == SYNC_GROUP
+        self._snapshot_every: int = snapshot_every
+        self._local = threading.local()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self.snapshot_bytes: int = 0
+        self.snapshots: int = 0
+
+        os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+        self._inner, last_lsn = self._recover()
+        self._records_since_snapshot: int = 0
+        self._writer = _JournalWriter(
+            os.path.join(directory, _segment_name(last_lsn + 1)), last_lsn, commit_delay
+        )
+        logger.info(
+            "Journal chargé: %s tâches, LSN %s, %.2fs",
+            self._inner.count(), last_lsn, time.perf_counter() - started
+        )
+
+    @property
+    def directory(self) -> str:
+        """Répertoire du journal."""
+        return self._directory
+
+    # -------------------------------------------------------------- Lecture
+
+    def get(self, task_id: int) -> Optional[Task]:
+        return self._inner.get(task_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> List[Task]:
+        return self._inner.get_many(task_ids)
+
+    def page(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        return self._inner.page(done, after_id, limit)
+
+    def page_versions(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[int], List[int]]:
+        return self._inner.page_versions(done, after_id, limit)
+
+    def ids(self, done: Optional[bool] = None) -> List[int]:
+        return self._inner.ids(done)
+
+    def count(self, done: Optional[bool] = None) -> int:
+        return self._inner.count(done)
+
+    def search(self, query: str, done: Optional[bool], limit: int) -> List[Task]:
+        return self._inner.search(query, done, limit)
+
+    @property
+    def version(self) -> int:
+        return self._inner.version
+
+    def task_version(self, task_id: int) -> Optional[int]:
+        return self._inner.task_version(task_id)
+
+    # ------------------------------------------------------------- Écriture
+
+    def allocate_ids(self, count: int = 1) -> int:
+        return self._inner.allocate_ids(count)
+
+    def insert(self, tasks: List[Task]) -> None:
+        if not tasks:
+            return
+        self._inner.insert(tasks)
+        rows = [[task.id, task.title, task.description, task.done] for task in tasks]
+        self._log([_OP_INSERT, rows])
+
+    def update(self, task_ids: List[int], changes: Dict[str, Any]) -> List[Task]:
+        updated = self._inner.update(task_ids, changes)
+        if updated and changes:
+            self._log([_OP_UPDATE, [task.id for task in updated], changes])
+        return updated
+
+    def toggle(self, task_ids: List[int]) -> List[Task]:
+        toggled = self._inner.toggle(task_ids)
+        if toggled:
+            self._log([_OP_TOGGLE, [task.id for task in toggled]])
+        return toggled
+
+    def delete(self, task_ids: List[int]) -> List[Task]:
+        deleted = self._inner.delete(task_ids)
+        if deleted:
+            self._log([_OP_DELETE, [task.id for task in deleted]])
+        return deleted
+
+    def sync(self) -> None:
+        lsn = getattr(self._local, "lsn", 0)
+        if self._sync_mode == SYNC_GROUP and lsn:
+            self._writer.wait(lsn)
+
+    # ---------------------------------------------------------- Maintenance
+
+    def check_consistency(self) -> None:
+        self._inner.check_consistency()
+
+    def snapshot(self, wait: bool = False) -> None:
+        """
+        Déclenche un instantané de l'état courant.
+
+        La capture se fait immédiatement (l'appelant détient le verrou
+        d'écriture du service); la sérialisation et l'écriture sur disque
+        se font dans un thread dédié. Sans effet si un instantané est
+        déjà en cours d'écriture.
+
+        Args:
+            wait (bool): Si True, attend que l'instantané soit écrit.
+        """
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        rows, version, next_id = self._inner.dump()
+        lsn = self._writer.last_lsn
+        self._writer.rotate(os.path.join(self._directory, _segment_name(lsn + 1)))
+        self._records_since_snapshot = 0
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot,
+            args=(rows, version, next_id, lsn),
+            name="task-snapshot",
+            daemon=True
+        )
+        self._snapshot_thread.start()
+        if wait:
+            self._snapshot_thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistiques d'écriture depuis l'ouverture du journal.
+
+        L'amplification d'écriture rapporte les octets écrits sur disque
+        (journal et instantanés) aux octets des enregistrements.
+
+        Returns:
+            Dict[str, float]: Enregistrements, fsyncs, octets et ratios.
+        """
+        writer = self._writer
+        records = writer.records
+        return {
+            "records": records,
+            "fsyncs": writer.fsyncs,
+            "records_per_fsync": records / writer.fsyncs if writer.fsyncs else 0.0,
+            "log_bytes": writer.bytes_written,
+            "snapshots": self.snapshots,
+            "snapshot_bytes": self.snapshot_bytes,
+            "write_amplification": (
+                (writer.bytes_written + self.snapshot_bytes) / writer.bytes_written
+                if writer.bytes_written else 0.0
+            ),
+        }
+
+    def close(self) -> None:
+        """Termine l'instantané en cours et écrit les enregistrements en attente."""
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self._writer.close()
+
+    def _log(self, record: List[Any]) -> None:
+        """Journalise une écriture et déclenche un instantané si besoin."""
+        self._local.lsn = self._writer.append(record)
+        self._records_since_snapshot += 1
+        if self._records_since_snapshot >= self._snapshot_every:
+            self.snapshot()
+
+    def _write_snapshot(
+        self,
+        rows: List[Tuple[int, str, Optional[str], bool, int]],
+        version: int,
+        next_id: int,
+        lsn: int
+    ) -> None:
+        """Écrit un instantané puis supprime les segments et instantanés qu'il remplace."""
+        try:
+            # Les enregistrements couverts doivent être durables avant
+            # que leurs segments ne soient supprimés.
+            self._writer.wait(lsn)
+            data = json.dumps(
+                {"lsn": lsn, "version": version, "next_id": next_id, "tasks": rows},
+                ensure_ascii=False,
+                separators=(",", ":")
+            ).encode()
+            path = os.path.join(self._directory, _snapshot_name(lsn))
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as snapshot_file:
+                snapshot_file.write(data)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temporary, path)
+            _fsync_directory(self._directory)
+        except OSError as e:
+            logger.error("Échec d'écriture de l'instantané au LSN %s: %s", lsn, e)
+            return
+
+        self.snapshot_bytes += len(data)
+        self.snapshots += 1
+        for name in os.listdir(self._directory):
+            snapshot_lsn = _parse_lsn(name, _SNAPSHOT_PREFIX, _SNAPSHOT_SUFFIX)
+            first_lsn = _parse_lsn(name, _SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+            if (snapshot_lsn is not None and snapshot_lsn < lsn) or (
+                first_lsn is not None and first_lsn <= lsn
+            ):
+                os.remove(os.path.join(self._directory, name))
+        logger.info("Instantané écrit: %s tâches, LSN %s, %s octets", len(rows), lsn, len(data))
+
+    # ------------------------------------------------------------ Reprise
+
+    def _recover(self) -> Tuple[MemoryTaskStore, int]:
+        """Charge le dernier instantané et rejoue les segments qui le suivent."""
+        snapshots: List[int] = []
+        segments: List[int] = []
+        for name in os.listdir(self._directory):
+            snapshot_lsn = _parse_lsn(name, _SNAPSHOT_PREFIX, _SNAPSHOT_SUFFIX)
+            if snapshot_lsn is not None:
+                snapshots.append(snapshot_lsn)
+            first_lsn = _parse_lsn(name, _SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+            if first_lsn is not None:
+                segments.append(first_lsn)
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self._directory, name))
+
+        if snapshots:
+            path = os.path.join(self._directory, _snapshot_name(max(snapshots)))
+            with open(path, "rb") as snapshot_file:
+                snapshot = json.loads(snapshot_file.read())
+            store = MemoryTaskStore.restore(snapshot["tasks"], snapshot["version"], snapshot["next_id"])
+            last_lsn = snapshot["lsn"]
+        else:
+            store = MemoryTaskStore.restore([], 0, 1)
+            last_lsn = 0
+
+        segments.sort()
+        next_id = 1
+        for position, first_lsn in enumerate(segments):
+            is_last = position == len(segments) - 1
+            path = os.path.join(self._directory, _segment_name(first_lsn))
+            for record in self._read_segment(path, is_last):
+                lsn = record[0]
+                if lsn <= last_lsn:
+                    continue
+                if lsn != last_lsn + 1:
+                    raise TaskConsistencyError(f"Journal incomplet: LSN {last_lsn + 1} attendu, {lsn} lu")
+                next_id = max(next_id, self._replay(store, record))
+                last_lsn = lsn
+        store.advance_ids(next_id)
+        return store, last_lsn
+
+    @staticmethod
+    def _read_segment(path: str, is_last: bool) -> Iterable[List[Any]]:
+        """
+        Lit les enregistrements d'un segment.
+
+        Un enregistrement incomplet en fin du dernier segment provient
+        d'un arrêt brutal pendant son écriture (il n'a donc jamais été
+        confirmé): il est ignoré et retiré du fichier.
+        """
+        with open(path, "rb") as segment_file:
+            data = segment_file.read()
+        offset = 0
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            try:
+                if end < 0:
+                    raise ValueError("enregistrement sans fin de ligne")
+                record = json.loads(data[offset:end])
+            except ValueError:
+                if not is_last or 0 <= end < len(data) - 1:
+                    raise TaskConsistencyError(f"Segment de journal corrompu: {path}")
+                logger.warning("Enregistrement tronqué ignoré en fin de journal (%s)", path)
+                with open(path, "r+b") as segment_file:
+                    segment_file.truncate(offset)
+                return
+            yield record
+            offset = end + 1
+
+    @staticmethod
+    def _replay(store: MemoryTaskStore, record: List[Any]) -> int:
+        """Applique un enregistrement et renvoie le prochain ID minimal qu'il implique."""
+        op = record[1]
+        if op == _OP_INSERT:
+            store.insert([
+                Task(id=row[0], title=row[1], description=row[2], done=row[3])
+                for row in record[2]
+            ])
+            return max(row[0] for row in record[2]) + 1
+        if op == _OP_UPDATE:
+            store.update(record[2], record[3])
+        elif op == _OP_TOGGLE:
+            store.toggle(record[2])
+        elif op == _OP_DELETE:
+            store.delete(record[2])
+        else:
+            raise TaskConsistencyError(f"Enregistrement de journal inconnu: {op!r}")
+        return 1
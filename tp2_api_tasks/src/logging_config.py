@@ -0,0 +1,154 @@
+"""
+Configuration des logs de l'API.
+
+Deux modes, choisis par TASKS_LOG_MODE:
+
+- "dev" (défaut): écriture synchrone sur stderr (logging.basicConfig);
+- "production": un appel de log ne fait que déposer l'enregistrement
+  dans une file (QueueHandler); formatage des messages (style %, donc
+  différé) et écriture ont lieu dans le thread d'un QueueListener. Les
+  messages sous WARNING des loggers à fort volume sont échantillonnés, et
+  les enregistrements ne collectent plus les informations que le format
+  n'affiche pas (fichier et ligne d'appel, thread, processus).
+
+Les messages doivent être écrits en style % (`logger.info("ID=%s", id)`)
+avec des arguments immuables: en mode production, ils sont formatés plus
+tard, dans un autre thread.
+"""
+
+import atexit
+import itertools
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional
+
+
+LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Modes de logs sélectionnables par configuration
+DEV_MODE: str = "dev"
+PRODUCTION_MODE: str = "production"
+
+# Échantillonnage par défaut en production: 1 message sur N par logger
+DEFAULT_SAMPLING: Dict[str, int] = {"main.requests": 100}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ne laisse passer qu'un message sur N pour certains loggers.
+
+    Les messages WARNING et au-delà passent toujours. Les compteurs sont
+    des itertools.count(), dont l'incrément est atomique: pas de verrou.
+
+    Exemple:
+        >>> sampling = SamplingFilter({"main.requests": 100})
+    """
+
+    def __init__(self, rates: Dict[str, int]) -> None:
+        """
+        Initialise le filtre.
+
+        Args:
+            rates (Dict[str, int]): Nom de logger -> garder 1 message sur N.
+        """
+        super().__init__()
+        self._rates: Dict[str, int] = {name: rate for name, rate in rates.items() if rate > 1}
+        self._counters: Dict[str, Iterator[int]] = {name: itertools.count() for name in self._rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rates.get(record.name)
+        if rate is None:
+            return True
+        return next(self._counters[record.name]) % rate == 0
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler qui laisse le formatage du message au thread du listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _LogListener(QueueListener):
+    """QueueListener dont stop() peut être appelé plusieurs fois (atexit compris)."""
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+def parse_sampling(spec: str) -> Dict[str, int]:
+    """
+    Lit une configuration d'échantillonnage.
+
+    Exemple:
+        >>> parse_sampling("main.requests=100, main=10")
+        {'main.requests': 100, 'main': 10}
+
+    Raises:
+        ValueError: Si une entrée n'est pas de la forme logger=N.
+    """
+    rates: Dict[str, int] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, separator, rate = entry.partition("=")
+        if not separator or not rate.strip().isdigit():
+            raise ValueError(f"Échantillonnage invalide: {entry!r} (attendu: logger=N)")
+        rates[name.strip()] = int(rate)
+    return rates
+
+
+def configure_logging(
+    mode: str = DEV_MODE,
+    level: int = logging.INFO,
+    sampling: Optional[Dict[str, int]] = None
+) -> Optional[QueueListener]:
+    """
+    Configure le logger racine.
+
+    Args:
+        mode (str): "dev" ou "production".
+        level (int): Niveau minimal des messages.
+        sampling (Optional[Dict[str, int]]): Échantillonnage par logger en
+                                             production (DEFAULT_SAMPLING
+                                             par défaut).
+
+    Returns:
+        Optional[QueueListener]: Le listener démarré en production (arrêté
+        à la sortie du processus), None en mode dev.
+
+    Raises:
+        ValueError: Si le mode est inconnu.
+    """
+    if mode == DEV_MODE:
+        logging.basicConfig(level=level, format=LOG_FORMAT)
+        return None
+    if mode != PRODUCTION_MODE:
+        raise ValueError(f"Mode de logs inconnu: {mode!r}")
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(DEFAULT_SAMPLING if sampling is None else sampling))
+
+    # Optimisations documentées du module logging: pas de recherche de
+    # l'appelant (parcours de la pile) ni d'identification du thread ou
+    # du processus à chaque message.
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    for previous in root.handlers[:]:
+        root.removeHandler(previous)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = _LogListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
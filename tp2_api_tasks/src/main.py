@@ -3,12 +3,85 @@ API REST pour gérer les tâches avec FastAPI.
 Fournit des endpoints CRUD pour créer, lire, mettre à jour et supprimer des tâches.
 """
 
+import asyncio
+import hmac
 import logging
-from fastapi import FastAPI, HTTPException, status
+import os
+import reprlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
-from pydantic import BaseModel, Field
-import uvicorn
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel, Field, model_validator
+
+from async_service import AsyncTaskService
+from changes import ChangeLog
+from compress import DEFAULT_MINIMUM_SIZE, CompressionMiddleware
+from concurrency import ReadWriteLock
+from events import (
+    CREATED,
+    DELETED,
+    EVENT_STREAM_MEDIA_TYPE,
+    TOGGLED,
+    UPDATED,
+    EventBroadcaster,
+    deleted_event,
+    event_stream,
+    tasks_event,
+)
+from idempotency import DEFAULT_MAX_ENTRIES as IDEMPOTENCY_MAX_ENTRIES
+from idempotency import DEFAULT_TTL_SECONDS as IDEMPOTENCY_TTL_SECONDS
+from idempotency import IdempotencyCache, IdempotencyConflict
+from logging_config import DEV_MODE, configure_logging, parse_sampling
+from metrics import PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, MetricsRegistry
+from models import (
+    Task,
+    TaskConsistencyError,
+    TaskCreate,
+    TaskNotFoundError,
+    TaskUpdate,
+    TaskValidationError,
+)
+from ordering import (
+    ASCENDING,
+    DESCENDING,
+    SORT_FIELDS,
+    SORT_ID,
+    SORT_KEYS as TASK_SORT_KEYS,
+    SortKey,
+    TaskOrderIndex,
+    decode_cursor,
+    encode_cursor,
+)
+from profiling import (
+    DEFAULT_MAX_PROFILES,
+    DEFAULT_REPORT_LINES,
+    SORT_KEYS,
+    ProfiledRoute,
+    ProfileStore,
+    ProfilingMiddleware,
+)
+from serialization import (
+    JSON_MEDIA_TYPE,
+    TASK_FIELDS,
+    TaskJSONCache,
+    encode_projection,
+    encode_task,
+    encode_task_fields,
+    parse_fields,
+)
+import server
+from storage import (
+    DEFAULT_SQLITE_SYNCHRONOUS,
+    MEMORY_BACKEND,
+    SQLITE_BACKEND,
+    MemoryTaskStore,
+    TaskStore,
+    create_store,
+)
 
 
 # ============================================================================
@@ -17,63 +90,93 @@ import uvicorn
 
 logger = logging.getLogger(__name__)
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Traces par requête des endpoints (volumineuses, échantillonnées en production)
+request_logger = logging.getLogger(f"{__name__}.requests")
+
+# Configuration du logging (variables d'environnement)
+#   TASKS_LOG_MODE=dev (défaut, synchrone) ou production (file + thread dédié)
+#   TASKS_LOG_LEVEL=niveau minimal (défaut: INFO)
+#   TASKS_LOG_SAMPLING=échantillonnage en production, ex: main.requests=100,main=10
+LOG_MODE: str = os.environ.get("TASKS_LOG_MODE", DEV_MODE)
+LOG_LEVEL: str = os.environ.get("TASKS_LOG_LEVEL", "INFO")
+LOG_SAMPLING: Optional[str] = os.environ.get("TASKS_LOG_SAMPLING")
+
+configure_logging(
+    LOG_MODE,
+    logging.getLevelName(LOG_LEVEL.upper()),
+    parse_sampling(LOG_SAMPLING) if LOG_SAMPLING is not None else None
 )
 
 
-# ============================================================================
-# Exceptions Personnalisées
-# ============================================================================
+class _LoggedChanges:
+    """Champs modifiés d'une tâche, formatés seulement si le message est émis."""
+    
+    __slots__ = ("_changes",)
+    
+    def __init__(self, changes: Dict[str, object]) -> None:
+        self._changes = changes
+    
+    def __str__(self) -> str:
+        return ", ".join(f"{field}={_log_repr.repr(value)}" for field, value in self._changes.items())
 
-class TaskNotFoundError(Exception):
-    """Exception levée quand une tâche n'est pas trouvée."""
-    pass
 
+# Les titres et descriptions sont tronqués dans les logs
+_log_repr = reprlib.Repr()
+_log_repr.maxstring = 60
 
-class TaskValidationError(Exception):
-    """Exception levée en cas d'erreur de validation de tâche."""
-    pass
+
+# Résultats par ID des opérations en masse
+BULK_UPDATED: str = "updated"
+BULK_TOGGLED: str = "toggled"
+BULK_DELETED: str = "deleted"
+BULK_NOT_FOUND: str = "not_found"
 
 
 # ============================================================================
 # Modèles Pydantic
 # ============================================================================
 
-class Task(BaseModel):
+class BulkSelection(BaseModel):
     """
-    Modèle représentant une tâche.
-    
-    Attributs:
-        id (int): Identifiant unique de la tâche.
-        title (str): Titre de la tâche.
-        done (bool): Statut de complétion. Par défaut, False.
-        description (Optional[str]): Description détaillée de la tâche.
+    Sélection des tâches visées par une opération en masse.
     
-    Exemple:
-        >>> task = Task(id=1, title="Acheter du lait", done=False)
-        >>> print(task.title)
-        Acheter du lait
+    Exactement un critère doit être fourni: une liste d'IDs, ou un statut
+    de complétion (toutes les tâches ayant ce statut).
     """
-    id: int = Field(..., description="Identifiant unique de la tâche")
-    title: str = Field(..., min_length=1, max_length=255, description="Titre de la tâche")
-    done: bool = Field(default=False, description="Statut de complétion")
-    description: Optional[str] = Field(default=None, description="Description optionnelle")
+    ids: Optional[List[int]] = Field(default=None, description="IDs des tâches visées")
+    done: Optional[bool] = Field(default=None, description="Statut des tâches visées")
+    
+    @model_validator(mode="after")
+    def check_single_criterion(self) -> "BulkSelection":
+        """Vérifie qu'un et un seul critère de sélection est fourni."""
+        if (self.ids is None) == (self.done is None):
+            raise ValueError("Fournir soit 'ids', soit 'done'")
+        return self
+
+
+class BulkUpdateRequest(BulkSelection):
+    """Mise à jour en masse: sélection et modifications à appliquer."""
+    changes: TaskUpdate = Field(..., description="Champs à modifier sur chaque tâche")
+
+
+class BulkOperationResult(BaseModel):
+    """Résultat d'une opération en masse, détaillé par ID."""
+    matched: int = Field(..., description="Nombre de tâches traitées")
+    results: Dict[int, str] = Field(..., description="Résultat par ID")
 
 
-class TaskCreate(BaseModel):
-    """Modèle pour la création d'une tâche (sans ID)."""
-    title: str = Field(..., min_length=1, max_length=255, description="Titre de la tâche")
-    description: Optional[str] = Field(default=None, description="Description optionnelle")
+class TaskChanges(BaseModel):
+    """Changements depuis une version (GET /tasks/changes)."""
+    version: int = Field(..., description="Version actuelle, à passer en `since` au prochain appel")
+    resync: bool = Field(..., description="Si vrai, la version demandée n'est plus couverte: relire GET /tasks")
+    tasks: List[Task] = Field(..., description="Tâches créées ou modifiées, dans leur état actuel")
+    deleted: List[int] = Field(..., description="IDs des tâches supprimées")
 
 
-class TaskUpdate(BaseModel):
-    """Modèle pour la mise à jour d'une tâche."""
-    title: Optional[str] = Field(default=None, min_length=1, max_length=255)
-    description: Optional[str] = Field(default=None)
-    done: Optional[bool] = Field(default=None)
+class BulkCreateResult(BaseModel):
+    """Résultat d'une création en masse."""
+    count: int = Field(..., description="Nombre de tâches créées")
+    ids: List[int] = Field(..., description="IDs des tâches créées, dans l'ordre de la requête")
 
 
 # ============================================================================
@@ -81,13 +184,87 @@ class TaskUpdate(BaseModel):
 # ============================================================================
 
 class TaskService:
-    """Service de gestion des tâches."""
+    """
+    Service de gestion des tâches.
+    
+    Porte la logique métier (validation, sélection des opérations en
+    masse, pagination, logs) et délègue la persistance à un TaskStore:
+    MemoryTaskStore par défaut, SQLiteTaskStore ou JournaledTaskStore
+    pour un stockage durable, CompactTaskStore pour les gros volumes en
+    mémoire (voir storage.py, journal.py et compact.py). Les
+    backends offrent accès par ID, pagination par curseur et filtrage par
+    statut sans parcourir toute la table, compteurs en O(1), recherche
+    plein texte et versions (global et par tâche) qui servent d'ETag pour
+    les requêtes conditionnelles.
+    
+    Le service est sûr en accès concurrent (boucle d'événements et pools
+    de threads, voir async_service.py pour les routes async):
+    les lectures composées partagent un verrou en lecture, les mutations
+    prennent le verrou en écriture, et les IDs sont réservés par le
+    stockage de façon atomique avant la prise du verrou. Les lectures
+    d'une seule entrée (get_by_id, count, task_version) se passent de
+    verrou. L'ordre de création est celui des IDs: deux créations
+    concurrentes peuvent être insérées dans l'ordre inverse de leurs IDs.
+    Chaque mutation forme une transaction du stockage, atomique aussi
+    vis-à-vis des autres processus qui partagent une base SQLite (voir
+    TASKS_WORKERS), puis attend, hors verrou, que le stockage l'ait
+    rendue durable (TaskStore.sync()).
     
-    def __init__(self) -> None:
-        """Initialise le service avec une liste vide et un compteur d'ID."""
-        self._tasks: List[Task] = []
-        self._next_id: int = 1
-        logger.info("Service de tâches initialisé")
+    Les méthodes *_json servent les réponses de lecture sans repasser
+    par Pydantic: chaque tâche est encodée une fois par version et mise
+    en cache (voir serialization.py).
+    
+    Chaque mutation publie, sous le verrou d'écriture, un événement dans
+    `events` (flux GET /tasks/events, voir events.py) et s'inscrit dans
+    un journal borné des changements (changes_since, voir changes.py).
+    Elle tient aussi à jour les index de tri déjà construits
+    (list_sorted_json, voir ordering.py).
+    """
+    
+    def __init__(
+        self,
+        store: Optional[TaskStore] = None,
+        check_invariants: bool = False,
+        json_cache: bool = True
+    ) -> None:
+        """
+        Initialise le service.
+        
+        Args:
+            store (Optional[TaskStore]): Backend de stockage; un
+                                         MemoryTaskStore vide par défaut.
+            check_invariants (bool): Si True, vérifie la cohérence des
+                                     compteurs après chaque mutation
+                                     (coûteux, destiné aux tests).
+            json_cache (bool): Si False, les tâches sont encodées à chaque
+                               lecture JSON au lieu d'être gardées en
+                               cache (économise la mémoire).
+        """
+        self._store: TaskStore = store if store is not None else MemoryTaskStore()
+        self._lock: ReadWriteLock = ReadWriteLock()
+        self._check_invariants: bool = check_invariants
+        self._json: TaskJSONCache = TaskJSONCache(json_cache)
+        self._events: EventBroadcaster = EventBroadcaster(self._store.version)
+        self._changes: ChangeLog = ChangeLog(self._store.version)
+        # Index de tri, construits au premier tri demandé (voir ordering.py)
+        self._orders: Dict[str, TaskOrderIndex] = {}
+        self._orders_lock: threading.Lock = threading.Lock()
+        logger.info("Service de tâches initialisé (stockage %s)", type(self._store).__name__)
+    
+    @property
+    def store(self) -> TaskStore:
+        """Backend de stockage utilisé par le service."""
+        return self._store
+    
+    @property
+    def events(self) -> EventBroadcaster:
+        """Diffuseur des événements de changement des tâches."""
+        return self._events
+    
+    @property
+    def lock(self) -> ReadWriteLock:
+        """Verrou lecteurs/rédacteur pris par chaque opération du service."""
+        return self._lock
     
     def create(self, task_create: TaskCreate) -> Task:
         """
@@ -104,28 +281,128 @@ class TaskService:
         """
         try:
             task = Task(
-                id=self._next_id,
+                id=self._store.allocate_ids(),
                 title=task_create.title,
                 description=task_create.description,
                 done=False
             )
-            self._tasks.append(task)
-            self._next_id += 1
-            logger.info(f"Tâche créée: ID={task.id}, Titre='{task.title}'")
-            return task
         except Exception as e:
-            logger.error(f"Erreur lors de la création de tâche: {str(e)}")
+            logger.error("Erreur lors de la création de tâche: %s", e)
             raise TaskValidationError(f"Erreur lors de la création: {str(e)}")
+        
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            self._store.insert([task])
+            self._after_mutation()
+            self._record(CREATED, [task], before)
+        self._store.sync()
+        logger.info("Tâche créée: ID=%s, Titre='%s'", task.id, task.title)
+        return task
+    
+    def create_many(self, task_creates: List[TaskCreate]) -> List[Task]:
+        """
+        Crée plusieurs tâches en une seule passe.
+        
+        La plage d'IDs est réservée en une fois et les données, déjà
+        validées par TaskCreate, ne sont pas revalidées. Un seul message
+        de log est émis pour tout le lot.
+        
+        Args:
+            task_creates (List[TaskCreate]): Données des tâches à créer.
+            
+        Returns:
+            List[Task]: Les tâches créées, dans l'ordre de la requête.
+        """
+        if not task_creates:
+            return []
+        first_id = self._store.allocate_ids(len(task_creates))
+        
+        tasks = [
+            Task.model_construct(
+                id=task_id,
+                title=task_create.title,
+                description=task_create.description,
+                done=False
+            )
+            for task_id, task_create in enumerate(task_creates, start=first_id)
+        ]
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            self._store.insert(tasks)
+            self._after_mutation()
+            self._record(CREATED, tasks, before)
+        self._store.sync()
+        
+        logger.info("Création en masse: %s tâches (IDs %s-%s)", len(tasks), first_id, tasks[-1].id)
+        return tasks
     
-    def get_all(self) -> List[Task]:
+    def get_all(self, done: Optional[bool] = None) -> List[Task]:
         """
         Récupère toutes les tâches.
         
+        Args:
+            done (Optional[bool]): Filtre optionnel sur le statut, résolu
+                                   par l'index de statut.
+        
         Returns:
-            List[Task]: Liste de toutes les tâches.
+            List[Task]: Liste de toutes les tâches, dans l'ordre de création.
         """
-        logger.debug(f"Récupération de {len(self._tasks)} tâches")
-        return self._tasks.copy()
+        with self._lock.read:
+            tasks = self._store.page(done)
+        logger.debug("Récupération de %s tâches", len(tasks))
+        return tasks
+    
+    def list_page(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: int = 50
+    ) -> Tuple[List[Task], Optional[int]]:
+        """
+        Récupère une page de tâches triées par ID (pagination par curseur).
+        
+        Le parcours démarre directement après `after_id` dans l'index des
+        IDs (ou dans l'index du statut demandé): le coût dépend de la taille
+        de la page, pas du nombre total de tâches.
+        
+        Args:
+            done (Optional[bool]): Filtre optionnel sur le statut.
+            after_id (Optional[int]): Curseur exclusif (dernier ID déjà lu).
+            limit (int): Nombre maximal de tâches dans la page.
+            
+        Returns:
+            Tuple[List[Task], Optional[int]]: La page et le curseur de la
+            page suivante (None s'il n'y a plus de tâches).
+        """
+        with self._lock.read:
+            page = self._store.page(done, after_id, limit + 1)
+        if len(page) > limit:
+            del page[limit:]
+            return page, page[-1].id
+        return page, None
+    
+    def iter_tasks(self, done: Optional[bool] = None, batch_size: int = 500) -> Iterator[List[Task]]:
+        """
+        Parcourt les tâches par lots successifs, sans copier le stockage.
+        
+        Chaque lot est obtenu par list_page() à partir du dernier ID lu:
+        le parcours reste valide si des tâches sont créées ou supprimées
+        entre deux lots.
+        
+        Args:
+            done (Optional[bool]): Filtre optionnel sur le statut.
+            batch_size (int): Nombre de tâches par lot.
+            
+        Yields:
+            List[Task]: Lots de tâches triées par ID.
+        """
+        after_id: Optional[int] = None
+        while True:
+            batch, after_id = self.list_page(done, after_id, batch_size)
+            if batch:
+                yield batch
+            if after_id is None:
+                return
     
     def get_by_id(self, task_id: int) -> Task:
         """
@@ -140,13 +417,113 @@ class TaskService:
         Raises:
             TaskNotFoundError: Si la tâche n'existe pas.
         """
-        for task in self._tasks:
-            if task.id == task_id:
-                logger.debug(f"Tâche trouvée: ID={task_id}")
-                return task
-        logger.warning(f"Tâche non trouvée: ID={task_id}")
+        task = self._store.get(task_id)
+        if task is not None:
+            logger.debug("Tâche trouvée: ID=%s", task_id)
+            return task
+        logger.warning("Tâche non trouvée: ID=%s", task_id)
         raise TaskNotFoundError(f"Tâche avec l'ID {task_id} non trouvée")
     
+    def get_all_json(
+        self,
+        done: Optional[bool] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[bytes, int, int]:
+        """
+        Comme get_all(), encodé en tableau JSON.
+        
+        La version du stockage, les versions des tâches et les tâches
+        sont lues sous le même verrou de lecture: le corps correspond
+        exactement à la version renvoyée (ETag de GET /tasks).
+        
+        Args:
+            done (Optional[bool]): Filtre optionnel sur le statut.
+            fields (Optional[Tuple[str, ...]]): Champs à encoder (voir
+                serialization.parse_fields()); None pour la tâche complète.
+        
+        Returns:
+            Tuple[bytes, int, int]: Tableau JSON des tâches, dans l'ordre
+            des IDs, leur nombre et la version du stockage lue.
+        """
+        with self._lock.read:
+            version = self._store.version
+            if fields is not None:
+                tasks = self._store.page(done)
+            else:
+                task_ids, versions = self._store.page_versions(done)
+                body = self._json.encode_list(task_ids, versions, self._store.get_many)
+        if fields is not None:
+            return encode_projection(tasks, fields), len(tasks), version
+        logger.debug("Récupération de %s tâches (JSON)", len(task_ids))
+        return body, len(task_ids), version
+    
+    def list_page_json(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[bytes, int, Optional[int], int]:
+        """
+        Comme list_page(), encodé en tableau JSON.
+        
+        Comme get_all_json(), la page et la version du stockage sont lues
+        sous le même verrou de lecture.
+        
+        Args:
+            fields (Optional[Tuple[str, ...]]): Champs à encoder; None pour
+                la tâche complète.
+        
+        Returns:
+            Tuple[bytes, int, Optional[int], int]: La page en JSON, son
+            nombre de tâches, le curseur de la page suivante (ou None) et
+            la version du stockage lue.
+        """
+        next_cursor: Optional[int] = None
+        with self._lock.read:
+            version = self._store.version
+            if fields is not None:
+                page = self._store.page(done, after_id, limit + 1)
+            else:
+                task_ids, versions = self._store.page_versions(done, after_id, limit + 1)
+                if len(task_ids) > limit:
+                    del task_ids[limit:]
+                    del versions[limit:]
+                    next_cursor = task_ids[-1]
+                body = self._json.encode_list(task_ids, versions, self._store.get_many)
+        if fields is not None:
+            if len(page) > limit:
+                del page[limit:]
+                next_cursor = page[-1].id
+            return encode_projection(page, fields), len(page), next_cursor, version
+        return body, len(task_ids), next_cursor, version
+    
+    def get_json(self, task_id: int, fields: Optional[Tuple[str, ...]] = None) -> Tuple[bytes, int]:
+        """
+        Comme get_by_id(), encodé en objet JSON.
+        
+        La version et la tâche sont lues sous le même verrou de lecture:
+        le JSON correspond exactement à la version renvoyée (et mise en
+        cache avec lui).
+        
+        Args:
+            task_id (int): L'ID de la tâche à récupérer.
+            fields (Optional[Tuple[str, ...]]): Champs à encoder; None pour
+                la tâche complète.
+            
+        Returns:
+            Tuple[bytes, int]: L'objet JSON de la tâche et sa version.
+            
+        Raises:
+            TaskNotFoundError: Si la tâche n'existe pas.
+        """
+        with self._lock.read:
+            version = self.task_version(task_id)
+            task = self.get_by_id(task_id)
+        if fields is not None:
+            return encode_task_fields(task, fields), version
+        return self._json.encode(task, version), version
+    
     def update(self, task_id: int, task_update: TaskUpdate) -> Task:
         """
         Met à jour une tâche existante.
@@ -161,25 +538,126 @@ class TaskService:
         Raises:
             TaskNotFoundError: Si la tâche n'existe pas.
         """
-        task = self.get_by_id(task_id)
-        
-        updates = []
-        if task_update.title is not None:
-            task.title = task_update.title
-            updates.append(f"title='{task_update.title}'")
-        if task_update.description is not None:
-            task.description = task_update.description
-            updates.append(f"description='{task_update.description}'")
-        if task_update.done is not None:
-            task.done = task_update.done
-            updates.append(f"done={task_update.done}")
-        
-        if updates:
-            logger.info(f"Tâche mise à jour: ID={task_id}, Changements=[{', '.join(updates)}]")
+        changes = task_update.model_dump(exclude_none=True)
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            updated = self._store.update([task_id], changes)
+            self._after_mutation()
+            self._record(UPDATED, updated, before)
+        self._store.sync()
+        if not updated:
+            logger.warning("Tâche non trouvée: ID=%s", task_id)
+            raise TaskNotFoundError(f"Tâche avec l'ID {task_id} non trouvée")
+        
+        if changes:
+            logger.info("Tâche mise à jour: ID=%s, Changements=[%s]", task_id, _LoggedChanges(changes))
         else:
-            logger.debug(f"Aucune modification pour la tâche: ID={task_id}")
+            logger.debug("Aucune modification pour la tâche: ID=%s", task_id)
         
-        return task
+        return updated[0]
+    
+    def _select(self, ids: Optional[List[int]], done: Optional[bool]) -> List[int]:
+        """
+        Résout une sélection de tâches par liste d'IDs ou par statut.
+        
+        Args:
+            ids (Optional[List[int]]): IDs explicites (doublons ignorés).
+            done (Optional[bool]): Statut des tâches à sélectionner si `ids` est None.
+            
+        Returns:
+            List[int]: IDs visés, sans doublons.
+        """
+        if ids is None:
+            return self._store.ids(done)
+        return list(dict.fromkeys(ids))
+    
+    @staticmethod
+    def _bulk_results(requested: List[int], affected: List[Task], outcome: str) -> Dict[int, str]:
+        """Associe à chaque ID demandé son résultat (`outcome` ou "not_found")."""
+        results = dict.fromkeys(requested, BULK_NOT_FOUND)
+        for task in affected:
+            results[task.id] = outcome
+        return results
+    
+    def update_many(
+        self,
+        task_update: TaskUpdate,
+        ids: Optional[List[int]] = None,
+        done: Optional[bool] = None
+    ) -> Dict[int, str]:
+        """
+        Applique la même mise à jour à un ensemble de tâches.
+        
+        Args:
+            task_update (TaskUpdate): Données à mettre à jour.
+            ids (Optional[List[int]]): IDs des tâches visées.
+            done (Optional[bool]): À défaut d'IDs, statut des tâches visées.
+            
+        Returns:
+            Dict[int, str]: Résultat par ID ("updated" ou "not_found").
+        """
+        changes = task_update.model_dump(exclude_none=True)
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            requested = self._select(ids, done)
+            updated = self._store.update(requested, changes)
+            self._after_mutation()
+            self._record(UPDATED, updated, before)
+        self._store.sync()
+        logger.info("Mise à jour en masse: %s tâches, %s introuvables", len(updated), len(requested) - len(updated))
+        return self._bulk_results(requested, updated, BULK_UPDATED)
+    
+    def toggle_many(
+        self,
+        ids: Optional[List[int]] = None,
+        done: Optional[bool] = None
+    ) -> Dict[int, str]:
+        """
+        Bascule l'état de complétion d'un ensemble de tâches.
+        
+        Args:
+            ids (Optional[List[int]]): IDs des tâches visées.
+            done (Optional[bool]): À défaut d'IDs, statut des tâches visées.
+            
+        Returns:
+            Dict[int, str]: Résultat par ID ("toggled" ou "not_found").
+        """
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            requested = self._select(ids, done)
+            toggled = self._store.toggle(requested)
+            self._after_mutation()
+            self._record(TOGGLED, toggled, before)
+        self._store.sync()
+        logger.info("Basculement en masse: %s tâches, %s introuvables", len(toggled), len(requested) - len(toggled))
+        return self._bulk_results(requested, toggled, BULK_TOGGLED)
+    
+    def delete_many(
+        self,
+        ids: Optional[List[int]] = None,
+        done: Optional[bool] = None
+    ) -> Dict[int, str]:
+        """
+        Supprime un ensemble de tâches en une seule passe.
+        
+        Args:
+            ids (Optional[List[int]]): IDs des tâches visées.
+            done (Optional[bool]): À défaut d'IDs, statut des tâches visées
+                                   (ex: done=True pour purger les tâches terminées).
+            
+        Returns:
+            Dict[int, str]: Résultat par ID ("deleted" ou "not_found").
+        """
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            requested = self._select(ids, done)
+            deleted = self._store.delete(requested)
+            self._after_mutation()
+            self._record(DELETED, deleted, before)
+        self._store.sync()
+        self._json.discard(task.id for task in deleted)
+        logger.info("Suppression en masse: %s tâches, %s introuvables", len(deleted), len(requested) - len(deleted))
+        return self._bulk_results(requested, deleted, BULK_DELETED)
     
     def toggle(self, task_id: int) -> Task:
         """
@@ -194,10 +672,17 @@ class TaskService:
         Raises:
             TaskNotFoundError: Si la tâche n'existe pas.
         """
-        task = self.get_by_id(task_id)
-        task.done = not task.done
-        logger.info(f"Tâche basculée: ID={task_id}, Nouvel état={task.done}")
-        return task
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            toggled = self._store.toggle([task_id])
+            self._after_mutation()
+            self._record(TOGGLED, toggled, before)
+        self._store.sync()
+        if not toggled:
+            logger.warning("Tâche non trouvée: ID=%s", task_id)
+            raise TaskNotFoundError(f"Tâche avec l'ID {task_id} non trouvée")
+        logger.info("Tâche basculée: ID=%s, Nouvel état=%s", task_id, toggled[0].done)
+        return toggled[0]
     
     def delete(self, task_id: int) -> None:
         """
@@ -209,13 +694,243 @@ class TaskService:
         Raises:
             TaskNotFoundError: Si la tâche n'existe pas.
         """
-        for i, task in enumerate(self._tasks):
-            if task.id == task_id:
-                self._tasks.pop(i)
-                logger.info(f"Tâche supprimée: ID={task_id}")
-                return
-        logger.warning(f"Tentative de suppression de tâche inexistante: ID={task_id}")
+        with self._lock.write, self._store.transaction():
+            before = self._store.version
+            deleted = self._store.delete([task_id])
+            self._after_mutation()
+            self._record(DELETED, deleted, before)
+        self._store.sync()
+        self._json.discard([task_id])
+        if deleted:
+            logger.info("Tâche supprimée: ID=%s", task_id)
+            return
+        logger.warning("Tentative de suppression de tâche inexistante: ID=%s", task_id)
         raise TaskNotFoundError(f"Tâche avec l'ID {task_id} non trouvée")
+    
+    def list_sorted_json(
+        self,
+        sort: str,
+        descending: bool = False,
+        done: Optional[bool] = None,
+        after: Optional[SortKey] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[bytes, int, Optional[SortKey], int]:
+        """
+        Liste les tâches triées sur un champ, encodée en tableau JSON.
+        
+        La page est lue à partir du curseur dans l'index de tri du champ,
+        ou triée par le stockage s'il en est capable (SQLite: ORDER BY
+        servi par un index): aucune liste n'est triée par la requête, sauf
+        la construction de l'index en mémoire au premier tri sur ce champ
+        (voir order_ready()).
+        
+        Args:
+            sort (str): Champ de tri (id, title ou done; voir ordering.py).
+            descending (bool): Ordre décroissant.
+            done (Optional[bool]): Filtre optionnel sur le statut.
+            after (Optional[SortKey]): Clé de la dernière tâche déjà lue.
+            limit (Optional[int]): Taille de page; None pour toute la liste.
+            fields (Optional[Tuple[str, ...]]): Champs à encoder; None pour
+                la tâche complète.
+        
+        Returns:
+            Tuple[bytes, int, Optional[SortKey], int]: Les tâches en JSON,
+            leur nombre, la clé de la dernière (curseur de la page
+            suivante) ou None s'il n'y a plus de tâches, et la version du
+            stockage lue avec elles.
+        """
+        size = limit + 1 if limit is not None else None
+        with self._lock.read:
+            version = self._store.version
+            if self._store.native_sort:
+                tasks = self._store.sorted_page(sort, descending, done, after, size)
+            else:
+                keys = islice(self._order_index(sort).iter_keys(done, descending, after), size)
+                tasks = self._store.get_many([key[-1] for key in keys])
+        next_key: Optional[SortKey] = None
+        if limit is not None and len(tasks) > limit:
+            del tasks[limit:]
+            next_key = TASK_SORT_KEYS[sort](tasks[-1])
+        if fields is not None:
+            return encode_projection(tasks, fields), len(tasks), next_key, version
+        return b"[" + b",".join(map(encode_task, tasks)) + b"]", len(tasks), next_key, version
+    
+    def order_ready(self, sort: str) -> bool:
+        """
+        True si une liste triée sur `sort` se lit sans construire d'index
+        (tri natif du stockage, ou index déjà construit et à jour).
+        """
+        if self._store.native_sort:
+            return True
+        index = self._orders.get(sort)
+        return index is not None and index.version == self._store.version
+    
+    def _order_index(self, sort: str) -> TaskOrderIndex:
+        """
+        Index de tri du champ `sort` (sous le verrou de lecture).
+        
+        Construit au premier appel, puis reconstruit si le stockage a été
+        modifié hors de ce service. Pas utilisé avec un stockage qui trie
+        lui-même (TaskStore.native_sort, SQLite).
+        """
+        index = self._orders.get(sort)
+        version = self._store.version
+        if index is not None and index.version == version:
+            return index
+        with self._orders_lock:
+            index = self._orders.get(sort)
+            if index is None or index.version != version:
+                index = TaskOrderIndex(sort, self._store.page(), version)
+                self._orders[sort] = index
+                logger.info("Index de tri '%s' construit: %s tâches (v%s)", sort, len(index), version)
+        return index
+    
+    def changes_since(self, version: int) -> Tuple[int, Optional[Tuple[List[Task], List[int]]]]:
+        """
+        Renvoie les changements postérieurs à une version (synchronisation différentielle).
+        
+        Args:
+            version (int): Dernière version connue du client.
+            
+        Returns:
+            Tuple[int, Optional[Tuple[List[Task], List[int]]]]: Version
+            actuelle, puis les tâches créées ou modifiées (état actuel) et
+            les IDs supprimés; None à la place si le journal ne couvre plus
+            `version` (synchronisation complète nécessaire).
+        """
+        with self._lock.read:
+            current = self._store.version
+            changes = self._changes.since(version, current)
+            if changes is None:
+                logger.info("Changements depuis v%s: resynchronisation (plancher v%s)", version, self._changes.floor)
+                return current, None
+            changed, deleted = changes
+            return current, (self._store.get_many(changed), deleted)
+    
+    def search(self, query: str, done: Optional[bool] = None, limit: int = 20) -> List[Task]:
+        """
+        Recherche plein texte dans les titres et descriptions.
+        
+        Les mots sont comparés sans casse ni accents; chaque mot de la
+        requête peut être le début d'un mot indexé (auto-complétion).
+        Toutes les tâches renvoyées contiennent tous les mots recherchés.
+        
+        Args:
+            query (str): Texte recherché.
+            done (Optional[bool]): Filtre optionnel sur le statut.
+            limit (int): Nombre maximal de résultats.
+            
+        Returns:
+            List[Task]: Tâches trouvées, de la plus pertinente à la moins pertinente.
+        """
+        with self._lock.read:
+            tasks = self._store.search(query, done, limit)
+        logger.debug("Recherche '%s': %s résultats", query, len(tasks))
+        return tasks
+    
+    @property
+    def version(self) -> int:
+        """Version globale du stockage, incrémentée à chaque mutation."""
+        return self._store.version
+    
+    def task_version(self, task_id: int) -> int:
+        """
+        Renvoie la version de la dernière modification d'une tâche.
+        
+        Args:
+            task_id (int): L'ID de la tâche.
+            
+        Returns:
+            int: Version globale au moment de sa dernière modification.
+            
+        Raises:
+            TaskNotFoundError: Si la tâche n'existe pas.
+        """
+        version = self._store.task_version(task_id)
+        if version is None:
+            raise TaskNotFoundError(f"Tâche avec l'ID {task_id} non trouvée")
+        return version
+    
+    def count(self, done: Optional[bool] = None) -> int:
+        """
+        Compte les tâches, éventuellement par statut, en O(1).
+        
+        Args:
+            done (Optional[bool]): Statut à compter; None pour le total.
+            
+        Returns:
+            int: Nombre de tâches correspondantes.
+        """
+        return self._store.count(done)
+    
+    def counters(self) -> Tuple[int, int, int]:
+        """
+        Lit ensemble la version, le nombre de tâches et de tâches terminées.
+        
+        Une seule lecture sous le verrou de lecture (une seule requête
+        avec SQLite): les trois valeurs décrivent le même état, même si
+        une écriture a lieu juste avant ou juste après.
+        
+        Returns:
+            Tuple[int, int, int]: (version, total, terminées).
+        """
+        with self._lock.read:
+            return self._store.counters()
+    
+    def check_consistency(self) -> None:
+        """
+        Recalcule les compteurs et les index depuis les tâches et les compare.
+        
+        Opération en O(n), destinée aux tests et au diagnostic.
+        
+        Raises:
+            TaskConsistencyError: Si un compteur ou un index diverge
+                                  (journalisée avant d'être relevée).
+        """
+        with self._lock.read:
+            try:
+                self._store.check_consistency()
+            except TaskConsistencyError as e:
+                logger.error("Stockage incohérent: %s", e)
+                raise
+    
+    def _after_mutation(self) -> None:
+        """Vérifie la cohérence après une mutation si le mode est activé."""
+        if self._check_invariants:
+            self._store.check_consistency()
+    
+    def _record(self, kind: str, tasks: List[Task], before: int) -> None:
+        """
+        Journalise et publie une mutation (sous le verrou d'écriture).
+        
+        Rien n'est enregistré si la mutation n'a rien changé (tâches
+        introuvables, mise à jour sans champ): la version n'a pas bougé.
+        
+        Args:
+            kind (str): Type d'événement (created, updated, toggled, deleted).
+            tasks (List[Task]): Tâches concernées.
+            before (int): Version du stockage avant la mutation.
+        """
+        version = self._store.version
+        if version == before:
+            return
+        task_ids = [task.id for task in tasks]
+        self._changes.record(before, version, task_ids, deleted=kind == DELETED)
+        for sort, index in list(self._orders.items()):
+            if index.version != before:
+                # Mutation d'un autre processus entre-temps: reconstruit au besoin
+                del self._orders[sort]
+            elif kind == DELETED:
+                index.remove(task_ids)
+                index.version = version
+            else:
+                index.upsert(tasks)
+                index.version = version
+        if kind == DELETED:
+            self._events.publish(deleted_event(version, task_ids))
+        else:
+            self._events.publish(tasks_event(version, kind, tasks))
 
 
 # ============================================================================
@@ -239,8 +954,165 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression des réponses (variables d'environnement)
+#   TASKS_COMPRESSION=1 (défaut) ou 0 pour servir les réponses sans compression
+#   TASKS_COMPRESSION_MIN_SIZE=taille minimale d'un corps compressé (défaut: 1024)
+COMPRESSION: bool = os.environ.get("TASKS_COMPRESSION", "1") != "0"
+COMPRESSION_MIN_SIZE: int = int(os.environ.get("TASKS_COMPRESSION_MIN_SIZE", str(DEFAULT_MINIMUM_SIZE)))
+
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+# Profilage à la demande (voir profiling.py; désactivé par défaut)
+#   TASKS_PROFILING=0 (défaut) ou 1: en-tête Server-Timing sur chaque
+#   réponse, profil cProfile des requêtes avec l'en-tête X-Profile ou
+#   tirées au sort, gardés pour GET /admin/profiles
+#   TASKS_PROFILING_SAMPLE_RATE=part des requêtes profilées sans en-tête (défaut: 0)
+#   TASKS_PROFILING_BUFFER=nombre de profils gardés (défaut: 50)
+#   TASKS_PROFILING_TOKEN=valeur exigée de l'en-tête X-Profile (défaut:
+#   aucune); exigée aussi par GET /admin/profiles, fermé (403) sans jeton
+PROFILING: bool = os.environ.get("TASKS_PROFILING", "0") == "1"
+PROFILING_SAMPLE_RATE: float = float(os.environ.get("TASKS_PROFILING_SAMPLE_RATE", "0"))
+PROFILING_BUFFER: int = int(os.environ.get("TASKS_PROFILING_BUFFER", str(DEFAULT_MAX_PROFILES)))
+PROFILING_TOKEN: Optional[str] = os.environ.get("TASKS_PROFILING_TOKEN")
+profile_store: Optional[ProfileStore] = None
+
+if PROFILING:
+    profile_store = ProfileStore(PROFILING_BUFFER)
+    # Avant la déclaration des routes: chacune mesure ses phases
+    app.router.route_class = ProfiledRoute
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_rate=PROFILING_SAMPLE_RATE,
+        token=PROFILING_TOKEN
+    )
+
+# Métriques HTTP (GET /metrics); ajouté en dernier, le middleware est le
+# plus externe et mesure aussi le temps passé dans CORS
+metrics_registry = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+# Configuration du stockage (variables d'environnement)
+#   TASKS_STORAGE=memory (défaut), sqlite, journal ou compact
+#   TASKS_DB_PATH=chemin de la base SQLite (défaut: tasks.db)
+#   TASKS_SQLITE_SYNCHRONOUS=FULL (défaut: commits durables) ou NORMAL
+#   (plus rapide, derniers commits perdus sur coupure de courant)
+#   TASKS_JOURNAL_DIR=répertoire du journal (défaut: tasks-journal)
+#   TASKS_WORKERS=nombre de processus uvicorn (défaut: 1); au-delà de 1,
+#   les workers partagent la base SQLite (TASKS_STORAGE=sqlite requis)
+#   TASKS_JSON_CACHE=1 (défaut) ou 0 pour ne pas garder le JSON encodé
+#   des tâches (à couper avec TASKS_STORAGE=compact si la mémoire prime)
+STORAGE_BACKEND: str = os.environ.get("TASKS_STORAGE", MEMORY_BACKEND)
+SQLITE_PATH: str = os.environ.get("TASKS_DB_PATH", "tasks.db")
+SQLITE_SYNCHRONOUS: str = os.environ.get("TASKS_SQLITE_SYNCHRONOUS", DEFAULT_SQLITE_SYNCHRONOUS)
+JOURNAL_DIR: str = os.environ.get("TASKS_JOURNAL_DIR", "tasks-journal")
+WORKERS: int = int(os.environ.get("TASKS_WORKERS", "1"))
+JSON_CACHE: bool = os.environ.get("TASKS_JSON_CACHE", "1") != "0"
+
 # Instance du service
-task_service = TaskService()
+task_service = TaskService(
+    create_store(STORAGE_BACKEND, SQLITE_PATH, JOURNAL_DIR, SQLITE_SYNCHRONOUS),
+    json_cache=JSON_CACHE
+)
+
+# Pool borné des appels bloquants des routes (stockage SQLite ou journal
+# en mode "group", listes complètes, opérations en masse; voir
+# async_service.py). Sur un stockage en mémoire, les autres appels se
+# font directement dans la boucle d'événements.
+#   TASKS_STORE_THREADS=nombre de threads du pool (défaut: 8)
+STORE_THREADS: int = int(os.environ.get("TASKS_STORE_THREADS", "8"))
+store_executor = ThreadPoolExecutor(max_workers=STORE_THREADS, thread_name_prefix="tasks-store")
+_async_tasks: Optional[AsyncTaskService] = None
+
+
+def _tasks() -> AsyncTaskService:
+    """Interface asynchrone de `task_service` (recréée s'il est remplacé)."""
+    global _async_tasks
+    if _async_tasks is None or _async_tasks.service is not task_service:
+        _async_tasks = AsyncTaskService(task_service, store_executor)
+    return _async_tasks
+
+
+# Clés d'idempotence de POST /tasks (en-tête Idempotency-Key; cache propre
+# à chaque processus, voir idempotency.py)
+#   TASKS_IDEMPOTENCY_SIZE=nombre maximal de clés gardées (défaut: 10000)
+#   TASKS_IDEMPOTENCY_TTL=durée de validité d'une clé en secondes (défaut: 86400)
+IDEMPOTENCY_SIZE: int = int(os.environ.get("TASKS_IDEMPOTENCY_SIZE", str(IDEMPOTENCY_MAX_ENTRIES)))
+IDEMPOTENCY_TTL: float = float(os.environ.get("TASKS_IDEMPOTENCY_TTL", str(IDEMPOTENCY_TTL_SECONDS)))
+idempotency_cache = IdempotencyCache(IDEMPOTENCY_SIZE, IDEMPOTENCY_TTL)
+IDEMPOTENT_REPLAYED_HEADER: str = "Idempotent-Replayed"
+
+
+# Pagination par curseur de GET /tasks
+DEFAULT_PAGE_SIZE: int = 50
+MAX_PAGE_SIZE: int = 1000
+
+# Projection des lectures (paramètre `fields` de GET /tasks et GET /tasks/{id})
+FIELDS_DESCRIPTION: str = f"Champs à renvoyer, séparés par des virgules ({', '.join(TASK_FIELDS)})"
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """
+    Indique si l'en-tête If-None-Match de la requête correspond à l'ETag.
+    
+    Gère les listes d'ETags, le joker '*' et les ETags faibles (W/).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or candidate == "*":
+            return True
+    return False
+
+
+def _not_modified(etag: str) -> Response:
+    """Réponse 304 sans corps: le client réutilise sa copie en cache."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def _projection(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Lit le paramètre `fields`; None pour la tâche complète (422 si invalide)."""
+    if fields is None:
+        return None
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    # Tous les champs: JSON complet, servi depuis le cache du service
+    return projection if projection != TASK_FIELDS else None
+
+
+def _bulk_result(results: Dict[int, str], success: str) -> BulkOperationResult:
+    """Construit la réponse d'une opération en masse."""
+    matched = sum(1 for outcome in results.values() if outcome == success)
+    return BulkOperationResult(matched=matched, results=results)
+
+
+# Export en flux (une tâche JSON par ligne)
+NDJSON_MEDIA_TYPE: str = "application/x-ndjson"
+
+
+def _stream_ndjson(done: Optional[bool], fields: Optional[Tuple[str, ...]] = None) -> StreamingResponse:
+    """
+    Construit une réponse NDJSON produite au fil de l'itération du service.
+    
+    Seul le lot en cours est sérialisé en mémoire: la consommation reste
+    constante quelle que soit la taille du stockage et le premier octet
+    part dès le premier lot. Avec `fields`, chaque ligne ne contient que
+    les champs demandés.
+    """
+    def generate() -> Iterator[Union[str, bytes]]:
+        for batch in task_service.iter_tasks(done):
+            if fields is not None:
+                yield b"".join(encode_task_fields(task, fields) + b"\n" for task in batch)
+            else:
+                yield "".join(task.model_dump_json() + "\n" for task in batch)
+    
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
 
 
 # ============================================================================
@@ -248,7 +1120,7 @@ task_service = TaskService()
 # ============================================================================
 
 @app.get("/", tags=["Info"])
-def read_root() -> dict:
+async def read_root() -> dict:
     """
     Endpoint racine - Bienvenue et informations sur l'API.
     
@@ -266,37 +1138,90 @@ def read_root() -> dict:
         response = requests.get("http://localhost:8000/")
         print(response.json())
     """
-    logger.info("Accès à l'endpoint racine")
+    request_logger.info("Accès à l'endpoint racine")
     return {
         "message": "Bienvenue sur l'API Task Manager",
         "version": "1.0.0",
         "docs": "/api/docs",
         "endpoints": {
             "GET /tasks": "Récupérer toutes les tâches",
+            "GET /tasks/export": "Exporter les tâches en flux NDJSON",
+            "GET /tasks/search": "Rechercher des tâches (plein texte)",
+            "GET /tasks/changes": "Changements depuis une version (synchronisation)",
+            "GET /tasks/events": "Flux des changements (Server-Sent Events)",
             "POST /tasks": "Créer une nouvelle tâche",
+            "POST /tasks/bulk": "Créer plusieurs tâches en une requête",
+            "PATCH /tasks/bulk": "Mettre à jour plusieurs tâches",
+            "PATCH /tasks/bulk/toggle": "Basculer plusieurs tâches",
+            "POST /tasks/bulk/delete": "Supprimer plusieurs tâches",
             "GET /tasks/{id}": "Récupérer une tâche spécifique",
             "PATCH /tasks/{id}": "Mettre à jour une tâche",
             "PATCH /tasks/{id}/toggle": "Basculer l'état d'une tâche",
-            "DELETE /tasks/{id}": "Supprimer une tâche"
+            "DELETE /tasks/{id}": "Supprimer une tâche",
+            "GET /stats": "Statistiques des tâches",
+            "GET /metrics": "Métriques au format Prometheus",
+            "GET /admin/profiles": "Derniers profils de requêtes (TASKS_PROFILING=1)"
         }
     }
 
 
 @app.get("/tasks", response_model=List[Task], tags=["Tasks"])
-def list_tasks(done: Optional[bool] = None) -> List[Task]:
+async def list_tasks(
+    request: Request,
+    done: Optional[bool] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(default=None, ge=0),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    sort: str = Query(default=SORT_ID, pattern=f"^({'|'.join(SORT_FIELDS)})$"),
+    order: str = Query(default=ASCENDING, pattern=f"^({ASCENDING}|{DESCENDING})$"),
+    cursor: Optional[str] = Query(default=None, description="Curseur d'une liste triée (X-Next-Cursor)")
+) -> Response:
     """
     Récupère toutes les tâches avec filtrage optionnel.
     
     Retourne une liste de toutes les tâches. Vous pouvez filtrer par statut
     en utilisant le paramètre de requête 'done'.
     
+    Si 'limit' ou 'after_id' est fourni, la réponse est paginée par curseur
+    sur l'ordre des IDs. Le curseur de la page suivante est renvoyé dans
+    l'en-tête 'X-Next-Cursor' et dans un en-tête 'Link' (rel="next");
+    ces en-têtes sont absents sur la dernière page.
+    
+    La réponse porte un ETag dérivé de la version du stockage: avec
+    'If-None-Match', la réponse est 304 tant qu'aucune tâche n'a changé.
+    
+    Avec l'en-tête 'Accept: application/x-ndjson', la liste (filtrée ou
+    non) est renvoyée en flux, comme pour GET /tasks/export: toujours
+    complète et dans l'ordre des IDs. Seuls 'done' et 'fields' s'y
+    appliquent; 'limit', 'after_id', 'cursor' ou un tri autre que
+    sort=id&order=asc renvoient 400 au lieu d'être ignorés.
+    
+    Le corps est assemblé à partir du JSON de chaque tâche, encodé une
+    fois par version et mis en cache par le service. Avec 'fields', seuls
+    les champs demandés sont encodés (sans passer par le modèle Task).
+    
     Query Parameters:
         done (Optional[bool]): Filtrer par statut de complétion (true/false).
                               Si non spécifié, retourne toutes les tâches.
+        limit (Optional[int]): Taille de page (1-1000, défaut 50 si paginé).
+        after_id (Optional[int]): Curseur: ID de la dernière tâche déjà lue.
+        fields (Optional[str]): Champs à renvoyer, séparés par des virgules
+                                (id, title, done, description); 422 si un
+                                champ est inconnu.
+        sort (str): Champ de tri: id (défaut), title (sans casse ni accents) ou done;
+                    à égalité, les tâches sont triées par ID.
+        order (str): Sens du tri: asc (défaut) ou desc.
+        cursor (Optional[str]): Curseur d'une liste triée, à reprendre de
+                                l'en-tête X-Next-Cursor (remplace after_id
+                                dès que sort ou order est précisé).
     
     Returns:
         List[Task]: Liste de toutes les tâches (ou filtrées).
     
+    Raises:
+        HTTPException: 400 si 'limit', 'after_id', 'cursor', 'sort' ou
+            'order' accompagne 'Accept: application/x-ndjson'.
+    
     Examples:
         Récupérer toutes les tâches:
         curl http://localhost:8000/tasks
@@ -307,23 +1232,115 @@ def list_tasks(done: Optional[bool] = None) -> List[Task]:
         Récupérer uniquement les tâches en cours:
         curl http://localhost:8000/tasks?done=false
         
+        Paginer par 50 (puis suivre X-Next-Cursor):
+        curl -i "http://localhost:8000/tasks?limit=50"
+        curl -i "http://localhost:8000/tasks?limit=50&after_id=50"
+        
+        Seulement l'ID et le statut:
+        curl "http://localhost:8000/tasks?fields=id,done"
+        
+        Triées par titre, pages de 50 (puis suivre X-Next-Cursor):
+        curl -i "http://localhost:8000/tasks?sort=title&limit=50"
+        
         Python:
         import requests
         response = requests.get("http://localhost:8000/tasks")
         tasks = response.json()
     """
-    logger.info(f"Listage des tâches (filtre done={done})")
-    tasks = task_service.get_all()
+    request_logger.info("Listage des tâches (filtre done=%s, champs=%s)", done, fields)
+    projection = _projection(fields)
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        ignored = [name for name, given in (
+            ("limit", limit is not None),
+            ("after_id", after_id is not None),
+            ("cursor", cursor is not None),
+            ("sort", sort != SORT_ID),
+            ("order", order != ASCENDING),
+        ) if given]
+        if ignored:
+            logger.warning("Paramètres refusés en NDJSON: %s", ", ".join(ignored))
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Le flux NDJSON est complet et dans l'ordre des IDs: "
+                       f"{', '.join(ignored)} non pris en charge (utiliser Accept: application/json)"
+            )
+        return _stream_ndjson(done, projection)
+    
+    etag = _list_etag(await _tasks().version())
+    if _etag_matches(request, etag):
+        request_logger.info("Liste inchangée (ETag %s)", etag)
+        return _not_modified(etag)
+    
+    if sort != SORT_ID or order != ASCENDING or cursor is not None:
+        return await _list_sorted(request, done, limit, after_id, projection, sort, order, cursor)
+    
+    # Tâches déjà valides: JSON pré-encodé, sans repasser par response_model.
+    # L'ETag vient de la version lue avec le corps (et non de celle du
+    # contrôle ci-dessus): une écriture intercalée change l'ETag envoyé.
+    if limit is not None or after_id is not None:
+        page_size = limit if limit is not None else DEFAULT_PAGE_SIZE
+        body, count, next_cursor, version = await _tasks().list_page_json(done, after_id, page_size, projection)
+        headers = {"ETag": _list_etag(version)}
+        if next_cursor is not None:
+            next_url = request.url.include_query_params(limit=page_size, after_id=next_cursor)
+            headers["X-Next-Cursor"] = str(next_cursor)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        request_logger.info("Page de %s tâches (after_id=%s, suivant=%s)", count, after_id, next_cursor)
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
+    
+    body, count, version = await _tasks().get_all_json(done, projection)
     
     if done is not None:
-        tasks = [task for task in tasks if task.done == done]
-        logger.info(f"Filtre appliqué: {len(tasks)} tâches avec done={done}")
+        request_logger.info("Filtre appliqué: %s tâches avec done=%s", count, done)
+    
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers={"ETag": _list_etag(version)})
+
+
+def _list_etag(version: int) -> str:
+    """ETag de GET /tasks pour une version du stockage."""
+    return f'"tasks-{version}"'
+
+
+async def _list_sorted(
+    request: Request,
+    done: Optional[bool],
+    limit: Optional[int],
+    after_id: Optional[int],
+    projection: Optional[Tuple[str, ...]],
+    sort: str,
+    order: str,
+    cursor: Optional[str]
+) -> Response:
+    """Liste triée de GET /tasks (sort, order), paginée par curseur opaque."""
+    if after_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="after_id ne s'applique qu'à l'ordre des IDs: utiliser cursor avec sort/order"
+        )
+    try:
+        after = decode_cursor(sort, order, cursor) if cursor is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     
-    return tasks
+    page_size = limit if limit is not None else (DEFAULT_PAGE_SIZE if cursor is not None else None)
+    body, count, next_key, version = await _tasks().list_sorted_json(
+        sort, order == DESCENDING, done, after, page_size, projection
+    )
+    headers = {"ETag": _list_etag(version)}
+    if next_key is not None:
+        next_cursor = encode_cursor(sort, order, next_key)
+        next_url = request.url.include_query_params(limit=page_size, cursor=next_cursor)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    request_logger.info("Liste triée de %s tâches (sort=%s, order=%s)", count, sort, order)
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
 
 
 @app.post("/tasks", response_model=Task, status_code=status.HTTP_201_CREATED, tags=["Tasks"])
-def create_task(task_create: TaskCreate) -> Task:
+async def create_task(
+    task_create: TaskCreate,
+    idempotency_key: Optional[str] = Header(default=None, min_length=1, max_length=255)
+) -> Response:
     """
     Crée une nouvelle tâche.
     
@@ -334,6 +1351,12 @@ def create_task(task_create: TaskCreate) -> Task:
         - title (str): Titre de la tâche (requis, 1-255 caractères).
         - description (str, optional): Description détaillée de la tâche.
     
+    Headers:
+        - Idempotency-Key (str, optional): Clé choisie par le client. Une
+          requête renvoyée avec la même clé (et le même corps) reçoit la
+          réponse 201 d'origine, avec l'en-tête Idempotent-Replayed: true,
+          sans nouvelle création. La même clé avec un autre corps: 422.
+    
     Returns:
         Task: La tâche créée avec son ID généré.
     
@@ -348,27 +1371,307 @@ def create_task(task_create: TaskCreate) -> Task:
         )
         new_task = response.json()
     """
+    if idempotency_key is None:
+        task = await _create_task(task_create)
+        return Response(encode_task(task), status_code=status.HTTP_201_CREATED, media_type=JSON_MEDIA_TYPE)
+
+    try:
+        owner, entry = idempotency_cache.begin(idempotency_key, task_create.model_dump_json())
+    except IdempotencyConflict as e:
+        logger.warning("Clé d'idempotence réutilisée: %s", e)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    if not owner:
+        # Requête renvoyée: réponse d'origine (attendue si encore en cours)
+        body = await asyncio.wrap_future(entry.result)
+        request_logger.info("Création rejouée: Idempotency-Key='%s'", idempotency_key)
+        return Response(
+            body,
+            status_code=status.HTTP_201_CREATED,
+            media_type=JSON_MEDIA_TYPE,
+            headers={IDEMPOTENT_REPLAYED_HEADER: "true"}
+        )
+
+    try:
+        task = await _create_task(task_create)
+    except Exception as e:
+        idempotency_cache.fail(entry, e)
+        raise
+    except BaseException:
+        # Requête annulée: les requêtes en attente sont invitées à réessayer
+        idempotency_cache.fail(entry, HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Requête d'origine interrompue, réessayer avec la même clé"
+        ))
+        raise
+    body = encode_task(task)
+    idempotency_cache.complete(entry, body)
+    return Response(body, status_code=status.HTTP_201_CREATED, media_type=JSON_MEDIA_TYPE)
+
+
+async def _create_task(task_create: TaskCreate) -> Task:
+    """Crée une tâche (erreur de validation convertie en 400)."""
     try:
-        logger.info(f"Création de tâche: title='{task_create.title}'")
-        return task_service.create(task_create)
+        request_logger.info("Création de tâche: title='%s'", task_create.title)
+        return await _tasks().create(task_create)
     except TaskValidationError as e:
-        logger.error(f"Erreur de validation: {str(e)}")
+        logger.error("Erreur de validation: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
 
+@app.post("/tasks/bulk", response_model=BulkCreateResult, status_code=status.HTTP_201_CREATED, tags=["Tasks"])
+async def create_tasks_bulk(task_creates: List[TaskCreate]) -> BulkCreateResult:
+    """
+    Crée plusieurs tâches en une seule requête.
+    
+    Remplace des milliers d'appels à POST /tasks lors des imports: une
+    seule validation du corps, une réservation d'IDs et une insertion en
+    une passe.
+    
+    Request Body:
+        Liste d'objets TaskCreate (title, description optionnelle).
+    
+    Returns:
+        BulkCreateResult: Nombre de tâches créées et leurs IDs.
+    
+    Examples:
+        curl: curl -X POST http://localhost:8000/tasks/bulk -H "Content-Type: application/json" -d '[{"title":"Tâche 1"},{"title":"Tâche 2"}]'
+        
+        Python:
+        import requests
+        response = requests.post(
+            "http://localhost:8000/tasks/bulk",
+            json=[{"title": f"Tâche {i}"} for i in range(1000)]
+        )
+        ids = response.json()["ids"]
+    """
+    request_logger.info("Création en masse demandée: %s tâches", len(task_creates))
+    tasks = await _tasks().create_many(task_creates)
+    return BulkCreateResult(count=len(tasks), ids=[task.id for task in tasks])
+
+
+@app.patch("/tasks/bulk", response_model=BulkOperationResult, tags=["Tasks"])
+async def update_tasks_bulk(bulk_update: BulkUpdateRequest) -> BulkOperationResult:
+    """
+    Met à jour plusieurs tâches en une seule requête.
+    
+    Request Body:
+        - ids (List[int]) ou done (bool): Tâches visées.
+        - changes (TaskUpdate): Champs à modifier sur chaque tâche.
+    
+    Returns:
+        BulkOperationResult: Nombre de tâches traitées et résultat par ID.
+    
+    Examples:
+        Clore toutes les tâches en cours:
+        curl -X PATCH http://localhost:8000/tasks/bulk -H "Content-Type: application/json" -d '{"done":false,"changes":{"done":true}}'
+    """
+    request_logger.info("Mise à jour en masse demandée")
+    results = await _tasks().update_many(bulk_update.changes, bulk_update.ids, bulk_update.done)
+    return _bulk_result(results, BULK_UPDATED)
+
+
+@app.patch("/tasks/bulk/toggle", response_model=BulkOperationResult, tags=["Tasks"])
+async def toggle_tasks_bulk(selection: BulkSelection) -> BulkOperationResult:
+    """
+    Bascule l'état de plusieurs tâches en une seule requête.
+    
+    Request Body:
+        - ids (List[int]) ou done (bool): Tâches visées.
+    
+    Returns:
+        BulkOperationResult: Nombre de tâches traitées et résultat par ID.
+    
+    Examples:
+        curl: curl -X PATCH http://localhost:8000/tasks/bulk/toggle -H "Content-Type: application/json" -d '{"ids":[1,2,3]}'
+    """
+    request_logger.info("Basculement en masse demandé")
+    results = await _tasks().toggle_many(selection.ids, selection.done)
+    return _bulk_result(results, BULK_TOGGLED)
+
+
+@app.post("/tasks/bulk/delete", response_model=BulkOperationResult, tags=["Tasks"])
+async def delete_tasks_bulk(selection: BulkSelection) -> BulkOperationResult:
+    """
+    Supprime plusieurs tâches en une seule requête.
+    
+    Exposé en POST car le corps d'une requête DELETE n'est pas toujours
+    transmis par les proxys et clients HTTP.
+    
+    Request Body:
+        - ids (List[int]) ou done (bool): Tâches visées.
+    
+    Returns:
+        BulkOperationResult: Nombre de tâches supprimées et résultat par ID.
+    
+    Examples:
+        Supprimer toutes les tâches terminées:
+        curl -X POST http://localhost:8000/tasks/bulk/delete -H "Content-Type: application/json" -d '{"done":true}'
+    """
+    request_logger.info("Suppression en masse demandée")
+    results = await _tasks().delete_many(selection.ids, selection.done)
+    return _bulk_result(results, BULK_DELETED)
+
+
+@app.get("/tasks/search", response_model=List[Task], tags=["Tasks"])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=255),
+    done: Optional[bool] = None,
+    limit: int = Query(default=20, ge=1, le=MAX_PAGE_SIZE)
+) -> List[Task]:
+    """
+    Recherche plein texte dans les titres et descriptions des tâches.
+    
+    La recherche ignore la casse et les accents ("tache" trouve "Tâche"),
+    et chaque mot peut être un début de mot ("ach" trouve "Acheter").
+    Les résultats contiennent tous les mots recherchés et sont classés
+    par pertinence (un mot du titre compte plus qu'un mot de description).
+    
+    Query Parameters:
+        q (str): Texte recherché.
+        done (Optional[bool]): Filtrer par statut de complétion.
+        limit (int): Nombre maximal de résultats (1-1000, défaut 20).
+    
+    Returns:
+        List[Task]: Tâches trouvées, par pertinence décroissante.
+    
+    Examples:
+        curl: curl "http://localhost:8000/tasks/search?q=ache&done=false"
+    """
+    request_logger.info("Recherche de tâches: q='%s', done=%s, limit=%s", q, done, limit)
+    return await _tasks().search(q, done, limit)
+
+
+@app.get("/tasks/export", tags=["Tasks"])
+async def export_tasks(done: Optional[bool] = None) -> StreamingResponse:
+    """
+    Exporte toutes les tâches en flux NDJSON (une tâche JSON par ligne).
+    
+    Les tâches sont lues par lots et envoyées au fur et à mesure: adapté
+    aux gros volumes, là où GET /tasks construit une seule réponse JSON.
+    
+    Query Parameters:
+        done (Optional[bool]): Filtrer par statut de complétion (true/false).
+    
+    Returns:
+        StreamingResponse: Flux application/x-ndjson.
+    
+    Examples:
+        curl: curl -N http://localhost:8000/tasks/export?done=false
+        
+        Python:
+        import json, requests
+        with requests.get("http://localhost:8000/tasks/export", stream=True) as response:
+            for line in response.iter_lines():
+                task = json.loads(line)
+    """
+    request_logger.info("Export NDJSON des tâches (filtre done=%s)", done)
+    return _stream_ndjson(done)
+
+
+@app.get("/tasks/changes", response_model=TaskChanges, tags=["Tasks"])
+async def get_task_changes(since: int = Query(..., ge=0)) -> TaskChanges:
+    """
+    Synchronisation différentielle: changements depuis une version.
+    
+    Renvoie seulement les tâches créées ou modifiées (état actuel) et les
+    IDs des tâches supprimées depuis la version `since`, ainsi que la
+    version actuelle à repasser au prochain appel. Le journal des
+    changements est borné: si `since` est trop ancienne (ou inconnue),
+    `resync` vaut true et le client doit relire GET /tasks. Reprendre
+    ensuite depuis la `version` de cette réponse: les changements
+    survenus entre-temps seront renvoyés une seconde fois, sans effet.
+    
+    Query Parameters:
+        since (int): Dernière version connue (0 au premier appel).
+    
+    Returns:
+        TaskChanges: Version actuelle, resync, tâches et IDs supprimés.
+    
+    Examples:
+        curl: curl "http://localhost:8000/tasks/changes?since=42"
+    """
+    request_logger.info("Changements depuis la version %s", since)
+    version, changes = await _tasks().changes_since(since)
+    if changes is None:
+        return TaskChanges(version=version, resync=True, tasks=[], deleted=[])
+    tasks, deleted = changes
+    return TaskChanges(version=version, resync=False, tasks=tasks, deleted=deleted)
+
+
+@app.get("/tasks/events", tags=["Tasks"])
+async def task_events(last_event_id: Optional[str] = Header(default=None)) -> StreamingResponse:
+    """
+    Flux des changements de tâches (Server-Sent Events).
+    
+    Chaque mutation produit un événement dont l'ID est la version du
+    stockage atteinte: created, updated et toggled portent les tâches
+    dans leur nouvel état (`tasks`), deleted leurs IDs (`ids`). Un
+    client qui se reconnecte avec l'en-tête Last-Event-ID (envoyé
+    automatiquement par EventSource) reçoit les événements manqués; si
+    l'historique ne les couvre plus, il reçoit `resync` et doit relire
+    GET /tasks. Un client trop lent est déconnecté, puis reprend de la
+    même façon. Un commentaire `: ping` maintient la connexion ouverte.
+    
+    Les événements sont ceux du processus qui sert la connexion: avec
+    plusieurs workers (TASKS_WORKERS), les écritures des autres
+    processus n'y apparaissent pas.
+    
+    Headers:
+        Last-Event-ID: Dernier ID reçu (reprise après reconnexion).
+    
+    Returns:
+        StreamingResponse: Flux text/event-stream.
+    
+    Raises:
+        HTTPException: 400 si Last-Event-ID n'est pas une version entière.
+    
+    Examples:
+        curl: curl -N http://localhost:8000/tasks/events
+        
+        JavaScript:
+        const source = new EventSource("/tasks/events");
+        source.addEventListener("updated", (e) => console.log(JSON.parse(e.data).tasks));
+    """
+    try:
+        last_version = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Last-Event-ID invalide: {last_event_id!r}"
+        )
+    request_logger.info("Abonnement au flux des tâches (Last-Event-ID=%s)", last_version)
+    return StreamingResponse(
+        event_stream(task_service.events, last_version),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        # Pas de mise en cache ni de tamponnage par un proxy (nginx)
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/tasks/{task_id}", response_model=Task, tags=["Tasks"])
-def get_task(task_id: int) -> Task:
+async def get_task(
+    task_id: int,
+    request: Request,
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """
     Récupère une tâche spécifique par son ID.
     
-    Retourne les détails complets d'une tâche identifiée par son ID.
+    Retourne les détails complets d'une tâche identifiée par son ID, ou
+    seulement les champs demandés avec 'fields'.
+    
+    La réponse porte un ETag dérivé de la version de la tâche: avec
+    'If-None-Match', la réponse est 304 si la tâche n'a pas changé.
     
     Path Parameters:
         task_id (int): L'ID unique de la tâche à récupérer.
     
+    Query Parameters:
+        fields (Optional[str]): Champs à renvoyer (ex: id,done).
+    
     Returns:
         Task: La tâche demandée.
     
@@ -377,6 +1680,7 @@ def get_task(task_id: int) -> Task:
     
     Examples:
         curl: curl http://localhost:8000/tasks/1
+        curl: curl "http://localhost:8000/tasks/1?fields=id,done"
         
         Python:
         import requests
@@ -385,10 +1689,15 @@ def get_task(task_id: int) -> Task:
             task = response.json()
     """
     try:
-        logger.info(f"Récupération de la tâche: ID={task_id}")
-        return task_service.get_by_id(task_id)
+        request_logger.info("Récupération de la tâche: ID=%s", task_id)
+        projection = _projection(fields)
+        etag = f'"task-{task_id}-{await _tasks().task_version(task_id)}"'
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        body, version = await _tasks().get_json(task_id, projection)
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers={"ETag": f'"task-{task_id}-{version}"'})
     except TaskNotFoundError as e:
-        logger.warning(f"Tâche non trouvée: {str(e)}")
+        logger.warning("Tâche non trouvée: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
@@ -396,7 +1705,7 @@ def get_task(task_id: int) -> Task:
 
 
 @app.patch("/tasks/{task_id}", response_model=Task, tags=["Tasks"])
-def update_task(task_id: int, task_update: TaskUpdate) -> Task:
+async def update_task(task_id: int, task_update: TaskUpdate) -> Task:
     """
     Met à jour une tâche existante (mise à jour partielle).
     
@@ -429,10 +1738,10 @@ def update_task(task_id: int, task_update: TaskUpdate) -> Task:
         )
     """
     try:
-        logger.info(f"Mise à jour de la tâche: ID={task_id}")
-        return task_service.update(task_id, task_update)
+        request_logger.info("Mise à jour de la tâche: ID=%s", task_id)
+        return await _tasks().update(task_id, task_update)
     except TaskNotFoundError as e:
-        logger.warning(f"Tâche non trouvée: {str(e)}")
+        logger.warning("Tâche non trouvée: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
@@ -440,7 +1749,7 @@ def update_task(task_id: int, task_update: TaskUpdate) -> Task:
 
 
 @app.patch("/tasks/{task_id}/toggle", response_model=Task, tags=["Tasks"])
-def toggle_task(task_id: int) -> Task:
+async def toggle_task(task_id: int) -> Task:
     """
     Bascule l'état de complétion d'une tâche.
     
@@ -465,10 +1774,10 @@ def toggle_task(task_id: int) -> Task:
         task = response.json()
     """
     try:
-        logger.info(f"Basculement de la tâche: ID={task_id}")
-        return task_service.toggle(task_id)
+        request_logger.info("Basculement de la tâche: ID=%s", task_id)
+        return await _tasks().toggle(task_id)
     except TaskNotFoundError as e:
-        logger.warning(f"Tâche non trouvée: {str(e)}")
+        logger.warning("Tâche non trouvée: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
@@ -476,7 +1785,7 @@ def toggle_task(task_id: int) -> Task:
 
 
 @app.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Tasks"])
-def delete_task(task_id: int) -> None:
+async def delete_task(task_id: int) -> None:
     """
     Supprime une tâche de manière permanente.
     
@@ -502,10 +1811,10 @@ def delete_task(task_id: int) -> None:
             print("Tache supprimee avec succes")
     """
     try:
-        logger.info(f"Suppression de la tâche: ID={task_id}")
-        task_service.delete(task_id)
+        request_logger.info("Suppression de la tâche: ID=%s", task_id)
+        await _tasks().delete(task_id)
     except TaskNotFoundError as e:
-        logger.warning(f"Tâche non trouvée: {str(e)}")
+        logger.warning("Tâche non trouvée: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
@@ -513,12 +1822,13 @@ def delete_task(task_id: int) -> None:
 
 
 @app.get("/stats", tags=["Stats"])
-def get_statistics() -> dict:
+async def get_statistics(request: Request, response: Response) -> dict:
     """
     Récupère les statistiques sur l'ensemble des tâches.
     
     Retourne des statistiques utiles sur vos tâches: nombre total, nombre
     de tâches complétées, nombre en cours, et pourcentage de completion.
+    Comme GET /tasks, la réponse porte un ETag et accepte 'If-None-Match'.
     
     Returns:
         dict: Statistiques incluant le total, en cours, terminées, et pourcentage.
@@ -531,10 +1841,14 @@ def get_statistics() -> dict:
         response = requests.get("http://localhost:8000/stats")
         stats = response.json()
     """
-    logger.info("Récupération des statistiques")
-    tasks = task_service.get_all()
-    total = len(tasks)
-    done_count = sum(1 for task in tasks if task.done)
+    request_logger.info("Récupération des statistiques")
+    # Version et compteurs lus ensemble: le corps correspond à l'ETag
+    version, total, done_count = await _tasks().counters()
+    etag = f'"stats-{version}"'
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    
     pending_count = total - done_count
     completion_percentage = round((done_count / total * 100) if total > 0 else 0, 2)
     
@@ -545,10 +1859,131 @@ def get_statistics() -> dict:
         "pourcentage_completion": completion_percentage
     }
     
-    logger.info(f"Statistiques: total={total}, terminees={done_count}, en_cours={pending_count}, completion={completion_percentage}%")
+    request_logger.info("Statistiques: total=%s, terminees=%s, en_cours=%s, completion=%s%%", total, done_count, pending_count, completion_percentage)
     return stats
 
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Stats"])
+async def get_metrics() -> PlainTextResponse:
+    """
+    Expose les métriques de l'API au format texte Prometheus.
+    
+    Comprend, par modèle de route (`/tasks/{task_id}` et non l'ID
+    concret): le nombre de requêtes, les erreurs par statut et
+    l'histogramme des latences; ainsi que des jauges du service (nombre
+    de tâches, tâches terminées, version du stockage). Avec plusieurs
+    workers, chaque processus expose ses propres compteurs HTTP.
+    
+    Returns:
+        PlainTextResponse: Métriques (text/plain; version=0.0.4).
+    
+    Examples:
+        curl: curl http://localhost:8000/metrics
+    """
+    version, total, done_count = await _tasks().counters()
+    gauges = [
+        ("tasks_total", "Nombre de tâches.", total),
+        ("tasks_done", "Nombre de tâches terminées.", done_count),
+        ("tasks_store_version", "Version du stockage.", version),
+    ]
+    return PlainTextResponse(metrics_registry.render(gauges), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+def _profile_store(x_profile: Optional[str]) -> ProfileStore:
+    """
+    Tampon des profils, réservé aux détenteurs du jeton de profilage.
+    
+    Les profils gardés (tirés au sort compris) révèlent chemins de
+    fichiers et piles d'appels des requêtes d'autres clients: l'en-tête
+    X-Profile doit valoir TASKS_PROFILING_TOKEN, et la consultation est
+    fermée si aucun jeton n'est configuré.
+    
+    Raises:
+        HTTPException: 404 si le profilage n'est pas activé, 403 sans
+            jeton configuré ou si l'en-tête ne correspond pas.
+    """
+    if profile_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profilage désactivé (TASKS_PROFILING=1 pour l'activer)"
+        )
+    if PROFILING_TOKEN is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Consultation des profils fermée (TASKS_PROFILING_TOKEN non défini)"
+        )
+    if x_profile is None or not hmac.compare_digest(x_profile.encode(), PROFILING_TOKEN.encode()):
+        logger.warning("Accès refusé aux profils: en-tête X-Profile absent ou invalide")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="En-tête X-Profile absent ou invalide"
+        )
+    return profile_store
+
+
+@app.get("/admin/profiles", tags=["Admin"])
+async def list_profiles(x_profile: Optional[str] = Header(default=None)) -> List[Dict[str, object]]:
+    """
+    Liste les derniers profils de requêtes, du plus récent au plus ancien.
+    
+    Disponible avec TASKS_PROFILING=1. Une requête est profilée si elle
+    porte l'en-tête X-Profile (égal à TASKS_PROFILING_TOKEN s'il est
+    défini) ou si elle est tirée au sort (TASKS_PROFILING_SAMPLE_RATE);
+    son identifiant est renvoyé dans l'en-tête X-Profile-Id.
+    
+    Headers:
+        - X-Profile (str): Jeton TASKS_PROFILING_TOKEN (obligatoire).
+    
+    Returns:
+        List[Dict]: Résumés (id, route, statut, durée et phases en ms).
+    
+    Raises:
+        HTTPException: 404 si le profilage est désactivé, 403 sans le jeton.
+    
+    Examples:
+        curl: curl -H "X-Profile: $TASKS_PROFILING_TOKEN" http://localhost:8000/tasks
+        curl: curl -H "X-Profile: $TASKS_PROFILING_TOKEN" http://localhost:8000/admin/profiles
+    """
+    return [record.summary() for record in _profile_store(x_profile).records()]
+
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse, tags=["Admin"])
+async def get_profile(
+    profile_id: int,
+    sort: str = Query(default=SORT_KEYS[0], pattern=f"^({'|'.join(SORT_KEYS)})$"),
+    limit: int = Query(default=DEFAULT_REPORT_LINES, ge=1, le=1000),
+    x_profile: Optional[str] = Header(default=None)
+) -> PlainTextResponse:
+    """
+    Rapport cProfile d'une requête profilée.
+    
+    Args:
+        profile_id (int): Identifiant du profil (en-tête X-Profile-Id).
+        sort (str): Tri des fonctions: cumulative, tottime ou calls.
+        limit (int): Nombre de fonctions affichées.
+    
+    Headers:
+        - X-Profile (str): Jeton TASKS_PROFILING_TOKEN (obligatoire).
+    
+    Returns:
+        PlainTextResponse: Rapport pstats (phases, puis fonctions).
+    
+    Raises:
+        HTTPException: 404 si le profil est inconnu, évincé du tampon ou
+            si le profilage est désactivé; 403 sans le jeton.
+    
+    Examples:
+        curl: curl -H "X-Profile: $TASKS_PROFILING_TOKEN" "http://localhost:8000/admin/profiles/3?sort=tottime&limit=20"
+    """
+    record = _profile_store(x_profile).get(profile_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profil {profile_id} introuvable"
+        )
+    return PlainTextResponse(record.report(sort, limit))
+
+
 # ============================================================================
 # Point d'Entrée
 # ============================================================================
@@ -556,10 +1991,13 @@ def get_statistics() -> dict:
 if __name__ == "__main__":
     logger.info("Démarrage de l'API Task Manager")
     logger.info("Documentation disponible à: http://localhost:8000/api/docs")
-    uvicorn.run(
-        "main:app",
-        host="127.0.0.1",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    # Chaque worker est un processus avec son propre TaskService: seul un
+    # stockage partagé garde un état commun.
+    if WORKERS > 1 and STORAGE_BACKEND != SQLITE_BACKEND:
+        raise SystemExit(
+            f"TASKS_WORKERS={WORKERS} nécessite TASKS_STORAGE={SQLITE_BACKEND} "
+            f"(stockage actuel: {STORAGE_BACKEND})"
+        )
+    if WORKERS > 1:
+        logger.info("Démarrage de %s workers sur la base %s", WORKERS, SQLITE_PATH)
+    server.run(workers=WORKERS, reload=True)
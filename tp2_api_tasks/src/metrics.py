@@ -0,0 +1,182 @@
+"""
+Métriques HTTP de l'API au format texte Prometheus.
+
+MetricsMiddleware est un middleware ASGI pur (sans BaseHTTPMiddleware):
+pour chaque requête, il relève la méthode, le modèle de route (par
+exemple `/tasks/{task_id}`, jamais l'URL concrète), le statut et la durée,
+puis les range dans un MetricsRegistry:
+
+- nombre de requêtes par route;
+- nombre d'erreurs (statuts 4xx et 5xx) par route et par statut;
+- histogramme des latences par route, à seaux préalloués.
+
+Le middleware s'exécute dans la boucle d'événements, qui est seule à
+écrire dans le registre: aucun verrou n'est pris sur le chemin des
+requêtes. La lecture (render) travaille sur des copies atomiques.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, MutableMapping, Tuple
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+# Bornes supérieures des seaux de l'histogramme des latences (secondes)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+# Modèle de route des requêtes qui ne correspondent à aucune route
+UNMATCHED_ROUTE: str = "<unmatched>"
+
+PROMETHEUS_MEDIA_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RouteMetrics:
+    """Compteurs d'une route (méthode + modèle de chemin)."""
+
+    __slots__ = ("buckets", "duration_sum", "errors")
+
+    def __init__(self) -> None:
+        """Préalloue un compteur par seau, plus le seau +Inf."""
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.duration_sum: float = 0.0
+        self.errors: Dict[int, int] = {}
+
+    def observe(self, status: int, duration: float) -> None:
+        """Enregistre une requête terminée."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.duration_sum += duration
+        if status >= 400:
+            self.errors[status] = self.errors.get(status, 0) + 1
+
+
+class MetricsRegistry:
+    """
+    Registre des métriques par route.
+
+    Exemple:
+        >>> registry = MetricsRegistry()
+        >>> registry.observe("GET", "/tasks/{task_id}", 200, 0.002)
+        >>> "tasks_http_requests_total" in registry.render([])
+        True
+    """
+
+    def __init__(self) -> None:
+        """Initialise un registre vide."""
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float) -> None:
+        """
+        Enregistre une requête.
+
+        Args:
+            method (str): Méthode HTTP.
+            route (str): Modèle de route.
+            status (int): Statut de la réponse.
+            duration (float): Durée en secondes.
+        """
+        metrics = self._routes.get((method, route))
+        if metrics is None:
+            metrics = self._routes[(method, route)] = RouteMetrics()
+        metrics.observe(status, duration)
+
+    def render(self, gauges: Iterable[Tuple[str, str, float]]) -> str:
+        """
+        Produit les métriques au format texte Prometheus.
+
+        Args:
+            gauges: Jauges supplémentaires (nom, description, valeur).
+
+        Returns:
+            str: Exposition texte (version 0.0.4).
+        """
+        lines: List[str] = []
+        for name, description, value in gauges:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+        routes = sorted(
+            (key, list(metrics.buckets), metrics.duration_sum, dict(metrics.errors))
+            for key, metrics in list(self._routes.items())
+        )
+        lines += [
+            "# HELP tasks_http_requests_total Requêtes HTTP traitées, par route.",
+            "# TYPE tasks_http_requests_total counter",
+        ]
+        for (method, route), buckets, _, _ in routes:
+            lines.append(f"tasks_http_requests_total{{{_labels(method, route)}}} {sum(buckets)}")
+
+        lines += [
+            "# HELP tasks_http_errors_total Réponses HTTP en erreur (4xx, 5xx), par route et statut.",
+            "# TYPE tasks_http_errors_total counter",
+        ]
+        for (method, route), _, _, errors in routes:
+            for status, count in sorted(errors.items()):
+                lines.append(
+                    f'tasks_http_errors_total{{{_labels(method, route)},status="{status}"}} {count}'
+                )
+
+        lines += [
+            "# HELP tasks_http_request_duration_seconds Latence des requêtes HTTP, par route.",
+            "# TYPE tasks_http_request_duration_seconds histogram",
+        ]
+        for (method, route), buckets, duration_sum, _ in routes:
+            labels = _labels(method, route)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'tasks_http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"tasks_http_request_duration_seconds_sum{{{labels}}} {duration_sum}")
+            lines.append(f"tasks_http_request_duration_seconds_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    """Étiquettes Prometheus d'une route (valeurs échappées)."""
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+class MetricsMiddleware:
+    """Middleware ASGI qui mesure chaque requête HTTP dans un MetricsRegistry."""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        """
+        Args:
+            app: Application ASGI enveloppée.
+            registry (MetricsRegistry): Registre alimenté.
+        """
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Le routeur complète le scope avec la route trouvée
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                time.perf_counter() - start
+            )
@@ -0,0 +1,67 @@
+"""
+Modèles de données et exceptions du domaine des tâches.
+
+Partagés par l'application FastAPI (main.py) et les backends de stockage
+(storage.py).
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+# ============================================================================
+# Exceptions Personnalisées
+# ============================================================================
+
+class TaskNotFoundError(Exception):
+    """Exception levée quand une tâche n'est pas trouvée."""
+    pass
+
+
+class TaskValidationError(Exception):
+    """Exception levée en cas d'erreur de validation de tâche."""
+    pass
+
+
+class TaskConsistencyError(Exception):
+    """Exception levée quand les compteurs ou index du service sont incohérents."""
+    pass
+
+
+# ============================================================================
+# Modèles Pydantic
+# ============================================================================
+
+class Task(BaseModel):
+    """
+    Modèle représentant une tâche.
+
+    Attributs:
+        id (int): Identifiant unique de la tâche.
+        title (str): Titre de la tâche.
+        done (bool): Statut de complétion. Par défaut, False.
+        description (Optional[str]): Description détaillée de la tâche.
+
+    Exemple:
+        >>> task = Task(id=1, title="Acheter du lait", done=False)
+        >>> print(task.title)
+        Acheter du lait
+    """
+    id: int = Field(..., description="Identifiant unique de la tâche")
+    title: str = Field(..., min_length=1, max_length=255, description="Titre de la tâche")
+    done: bool = Field(default=False, description="Statut de complétion")
+    description: Optional[str] = Field(default=None, description="Description optionnelle")
+
+
+class TaskCreate(BaseModel):
+    """Modèle pour la création d'une tâche (sans ID)."""
+    title: str = Field(..., min_length=1, max_length=255, description="Titre de la tâche")
+    description: Optional[str] = Field(default=None, description="Description optionnelle")
+
+
+class TaskUpdate(BaseModel):
+    """Modèle pour la mise à jour d'une tâche."""
+    title: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    description: Optional[str] = Field(default=None)
+    done: Optional[bool] = Field(default=None)
@@ -0,0 +1,165 @@
+"""
+Tri des listes de tâches (paramètres sort et order de GET /tasks).
+
+Chaque ordre de tri est un TaskOrderIndex: les clés de tri des tâches
+(par exemple `(titre normalisé, id)`) rangées dans des SortedIndex, un
+par statut. Le service le construit au premier tri demandé sur ce champ
+puis le tient à jour à chaque mutation, tâche par tâche (insertion et
+suppression par dichotomie): une page triée se lit à partir de la
+position du curseur, sans trier la table à chaque requête. Un stockage
+qui trie lui-même (TaskStore.native_sort: SQLite, ORDER BY servi par un
+index) n'a pas d'index en mémoire: les clés de SORT_KEYS y sont
+seulement calculées pour le curseur.
+
+- filtre `done`: parcours d'un seul index;
+- sans filtre: fusion paresseuse des deux index (heapq.merge), dont le
+  coût dépend de la taille de la page;
+- `order=desc`: parcours des mêmes index en sens inverse.
+
+Le curseur d'une page triée est la clé de la dernière tâche lue, encodée
+en base64 (opaque pour le client): il reste valide si cette tâche est
+modifiée ou supprimée entre deux pages.
+"""
+
+import base64
+import heapq
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from indexes import SortedIndex
+from models import Task
+from search import normalize
+
+
+# Champs de tri et sens
+SORT_ID: str = "id"
+SORT_TITLE: str = "title"
+SORT_DONE: str = "done"
+SORT_FIELDS: Tuple[str, ...] = (SORT_ID, SORT_TITLE, SORT_DONE)
+ASCENDING: str = "asc"
+DESCENDING: str = "desc"
+
+SortKey = Tuple[Any, ...]
+
+# Clé de tri de chaque champ; l'ID départage les égalités. Le titre est
+# comparé sans casse ni accents, comme pour la recherche ("Été" entre
+# "date" et "fraise", pas après "z").
+SORT_KEYS: Dict[str, Callable[[Task], SortKey]] = {
+    SORT_ID: lambda task: (task.id,),
+    SORT_TITLE: lambda task: (normalize(task.title), task.id),
+    SORT_DONE: lambda task: (task.done, task.id),
+}
+
+
+class TaskOrderIndex:
+    """
+    Ordre de tri des tâches sur un champ (voir l'en-tête du module).
+
+    Non thread-safe: le service le lit sous le verrou de lecture et le
+    modifie sous le verrou d'écriture.
+
+    Exemple:
+        >>> index = TaskOrderIndex(SORT_TITLE, [Task(id=1, title="b"), Task(id=2, title="A")], version=2)
+        >>> [key[-1] for key in index.iter_keys()]
+        [2, 1]
+    """
+
+    def __init__(self, field: str, tasks: Iterable[Task], version: int) -> None:
+        """
+        Construit l'index à partir des tâches du stockage.
+
+        Args:
+            field (str): Champ de tri (voir SORT_FIELDS).
+            tasks: Toutes les tâches du stockage.
+            version (int): Version du stockage lue avant les tâches.
+        """
+        self.field: str = field
+        self.version: int = version
+        self._key: Callable[[Task], SortKey] = SORT_KEYS[field]
+        self._entries: Dict[int, Tuple[bool, SortKey]] = {}
+        keys: Dict[bool, List[SortKey]] = {False: [], True: []}
+        for task in tasks:
+            key = self._key(task)
+            self._entries[task.id] = (task.done, key)
+            keys[task.done].append(key)
+        # Un seul tri, à la construction; ensuite, mises à jour unitaires
+        self._by_status: Dict[bool, SortedIndex] = {
+            done: SortedIndex.from_sorted(sorted(status_keys)) for done, status_keys in keys.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def upsert(self, tasks: Iterable[Task]) -> None:
+        """Insère des tâches créées ou repositionne des tâches modifiées."""
+        for task in tasks:
+            entry = (task.done, self._key(task))
+            previous = self._entries.get(task.id)
+            if previous == entry:
+                continue
+            if previous is not None:
+                self._by_status[previous[0]].discard(previous[1])
+            self._by_status[entry[0]].add(entry[1])
+            self._entries[task.id] = entry
+
+    def remove(self, task_ids: Iterable[int]) -> None:
+        """Retire des tâches supprimées."""
+        for task_id in task_ids:
+            previous = self._entries.pop(task_id, None)
+            if previous is not None:
+                self._by_status[previous[0]].discard(previous[1])
+
+    def iter_keys(
+        self,
+        done: Optional[bool] = None,
+        descending: bool = False,
+        after: Optional[SortKey] = None
+    ) -> Iterator[SortKey]:
+        """
+        Itère sur les clés triées, strictement après le curseur `after`.
+
+        Args:
+            done (Optional[bool]): Filtre optionnel sur le statut.
+            descending (bool): Ordre décroissant.
+            after (Optional[SortKey]): Clé de la dernière tâche déjà lue.
+
+        Yields:
+            SortKey: Clés dans l'ordre demandé; l'ID est le dernier élément.
+        """
+        statuses = (False, True) if done is None else (done,)
+        iterators = [
+            self._by_status[status].iter_before(after) if descending else self._by_status[status].iter_after(after)
+            for status in statuses
+        ]
+        if len(iterators) == 1:
+            return iterators[0]
+        return heapq.merge(*iterators, reverse=descending)
+
+
+def encode_cursor(field: str, order: str, key: SortKey) -> str:
+    """Encode le curseur d'une page triée (clé de la dernière tâche)."""
+    payload = json.dumps([field, order, *key], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(field: str, order: str, cursor: str) -> SortKey:
+    """
+    Décode un curseur produit par encode_cursor() pour le même tri.
+
+    Raises:
+        ValueError: Si le curseur est illisible ou vient d'un autre tri.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Curseur invalide: {cursor!r}") from e
+    if not isinstance(payload, list) or payload[:2] != [field, order]:
+        raise ValueError(f"Curseur invalide pour sort={field}&order={order}")
+    key = tuple(payload[2:])
+    expected = SORT_KEYS[field](Task.model_construct(id=0, title="", done=False))
+    if len(key) != len(expected) or not all(
+        type(value) is type(reference) for value, reference in zip(key, expected)
+    ):
+        raise ValueError(f"Curseur invalide pour sort={field}&order={order}")
+    return key
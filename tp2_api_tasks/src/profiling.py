@@ -0,0 +1,376 @@
+"""
+Profilage à la demande des requêtes HTTP (opt-in, TASKS_PROFILING=1).
+
+Trois pièces, actives seulement si le profilage est configuré:
+- ProfilingMiddleware (ASGI pur, comme MetricsMiddleware): ouvre un
+  RequestProfile pour chaque requête, dans une variable de contexte, et
+  ajoute l'en-tête Server-Timing (validation, service, sérialisation,
+  total). Une requête est profilée avec cProfile si elle porte l'en-tête
+  X-Profile (de valeur égale au jeton configuré, s'il y en a un) ou si
+  elle est tirée au sort (taux d'échantillonnage); son profil est alors
+  gardé dans un ProfileStore (tampon circulaire des N derniers) et son
+  identifiant renvoyé dans l'en-tête X-Profile-Id;
+- ProfiledRoute (classe de route FastAPI): mesure la validation (lecture
+  du corps, paramètres), l'exécution de la route et la sérialisation de
+  la réponse, et active cProfile autour du traitement de la route;
+- profiled_call() / profiled_thread_call(), appelés par AsyncTaskService:
+  mesurent le temps passé dans le TaskService, et profilent aussi les
+  appels exécutés dans le pool de threads (un cProfile par thread,
+  fusionné au profil de la requête).
+
+cProfile s'attache au thread de la boucle d'événements: pendant les
+`await` de la requête profilée, le travail des autres requêtes exécuté
+dans la boucle apparaît aussi dans le profil. Un seul profil à la fois
+est donc pris dans la boucle; une requête déclenchée pendant ce temps
+reçoit seulement l'en-tête Server-Timing.
+"""
+
+import asyncio
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    TypeVar,
+)
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+T = TypeVar("T")
+
+
+# En-têtes
+PROFILE_HEADER: str = "x-profile"
+PROFILE_ID_HEADER: str = "X-Profile-Id"
+
+# Phases de l'en-tête Server-Timing
+VALIDATION: str = "validation"
+SERVICE: str = "service"
+SERIALISATION: str = "serialisation"
+PHASES = (VALIDATION, SERVICE, SERIALISATION)
+
+# Nombre de profils gardés par défaut, lignes d'un rapport
+DEFAULT_MAX_PROFILES: int = 50
+DEFAULT_REPORT_LINES: int = 40
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+
+class RequestProfile:
+    """Mesures d'une requête en cours (voir l'en-tête du module)."""
+
+    __slots__ = ("timings", "profiler", "thread_profilers", "endpoint_start", "endpoint_end")
+
+    def __init__(self, profiler: Optional[cProfile.Profile] = None) -> None:
+        """
+        Args:
+            profiler (Optional[cProfile.Profile]): Profileur de la requête,
+                None si seules les phases sont mesurées.
+        """
+        self.timings: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.profiler: Optional[cProfile.Profile] = profiler
+        self.thread_profilers: List[cProfile.Profile] = []
+        self.endpoint_start: Optional[float] = None
+        self.endpoint_end: Optional[float] = None
+
+    def handled(self, start: float, end: float) -> None:
+        """Répartit le traitement de la route entre validation et sérialisation."""
+        if self.endpoint_start is None or self.endpoint_end is None:
+            # Paramètres invalides (422): la route n'a pas été exécutée
+            self.timings[VALIDATION] += end - start
+            return
+        self.timings[VALIDATION] += self.endpoint_start - start
+        self.timings[SERIALISATION] += end - self.endpoint_end
+
+    def server_timing(self, total: float) -> str:
+        """Valeur de l'en-tête Server-Timing (durées en millisecondes)."""
+        parts = [f"{name};dur={self.timings[name] * 1000:.3f}" for name in PHASES]
+        parts.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(parts)
+
+    def stats(self) -> pstats.Stats:
+        """Statistiques cProfile de la boucle et des threads du pool, fusionnées."""
+        stats = pstats.Stats(self.profiler)
+        for profiler in self.thread_profilers:
+            stats.add(profiler)
+        return stats
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("tasks_request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profil de la requête en cours, None hors requête ou sans profilage."""
+    return _current.get()
+
+
+def profiled_call(profile: RequestProfile, function: Callable[..., T], *args: Any) -> T:
+    """Appelle le service dans la boucle en comptant sa durée dans la phase service."""
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        profile.timings[SERVICE] += time.perf_counter() - start
+
+
+def profiled_thread_call(profile: RequestProfile, function: Callable[..., T], *args: Any) -> T:
+    """Appelle le service dans un thread du pool, sous cProfile si la requête est profilée."""
+    if profile.profiler is None:
+        return function(*args)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: un seul profileur actif pour tous les threads
+        return function(*args)
+    try:
+        return function(*args)
+    finally:
+        profiler.disable()
+        profile.thread_profilers.append(profiler)
+
+
+class ProfileRecord:
+    """Profil cProfile gardé d'une requête."""
+
+    __slots__ = ("id", "timestamp", "method", "path", "route", "status", "duration", "timings", "stats")
+
+    def __init__(
+        self,
+        profile_id: int,
+        scope: Scope,
+        status: int,
+        duration: float,
+        profile: RequestProfile
+    ) -> None:
+        route = scope.get("route")
+        self.id: int = profile_id
+        self.timestamp: float = time.time()
+        self.method: str = scope["method"]
+        self.path: str = scope["path"]
+        self.route: Optional[str] = route.path if route is not None else None
+        self.status: int = status
+        self.duration: float = duration
+        self.timings: Dict[str, float] = dict(profile.timings)
+        self.stats: pstats.Stats = profile.stats()
+
+    def summary(self) -> Dict[str, Any]:
+        """Résumé du profil (liste de GET /admin/profiles), durées en ms."""
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 3),
+            "phases_ms": {name: round(value * 1000, 3) for name, value in self.timings.items()},
+        }
+
+    def report(self, sort: str = "cumulative", limit: int = DEFAULT_REPORT_LINES) -> str:
+        """Rapport pstats des `limit` fonctions les plus coûteuses selon `sort`."""
+        output = io.StringIO()
+        summary = self.summary()
+        output.write(
+            f"{self.method} {self.path} -> {self.status} en {summary['duration_ms']} ms "
+            f"(phases en ms: {summary['phases_ms']})\n"
+        )
+        self.stats.stream = output
+        self.stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+class ProfileStore:
+    """
+    Tampon circulaire des derniers profils.
+
+    Écrit et lu seulement dans la boucle d'événements (comme le
+    MetricsRegistry): aucun verrou.
+    """
+
+    def __init__(self, max_profiles: int = DEFAULT_MAX_PROFILES) -> None:
+        self._records: Deque[ProfileRecord] = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def next_id(self) -> int:
+        """Réserve l'identifiant d'un profil."""
+        return next(self._ids)
+
+    def add(self, record: ProfileRecord) -> None:
+        """Garde un profil (le plus ancien est évincé si le tampon est plein)."""
+        self._records.append(record)
+
+    def records(self) -> List[ProfileRecord]:
+        """Profils gardés, du plus récent au plus ancien."""
+        return list(reversed(self._records))
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        """Profil d'identifiant `profile_id`, None s'il est inconnu ou évincé."""
+        for record in self._records:
+            if record.id == profile_id:
+                return record
+        return None
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI du profilage à la demande (voir l'en-tête du module)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        token: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            app: Application ASGI enveloppée.
+            store (ProfileStore): Tampon des profils gardés.
+            sample_rate (float): Part des requêtes profilées sans en-tête (0 à 1).
+            token (Optional[str]): Valeur attendue de l'en-tête X-Profile;
+                sans jeton, toute valeur non vide déclenche le profilage.
+        """
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.token = token
+        self._busy = False
+
+    def _requested(self, scope: Scope) -> bool:
+        """Indique si la requête demande un profil (en-tête ou tirage)."""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                value = value.decode("latin-1")
+                return value == self.token if self.token is not None else bool(value)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_id: Optional[int] = None
+        if not self._busy and self._requested(scope):
+            self._busy = True
+            profile_id = self.store.next_id()
+            profile = RequestProfile(cProfile.Profile())
+        else:
+            profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                timing = profile.server_timing(time.perf_counter() - start)
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                if profile_id is not None:
+                    headers.append((PROFILE_ID_HEADER.lower().encode(), str(profile_id).encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if profile_id is not None:
+                self._busy = False
+            if profile_id is not None and profile.profiler is not None:
+                self.store.add(ProfileRecord(
+                    profile_id, scope, status, time.perf_counter() - start, profile
+                ))
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route FastAPI qui mesure ses phases pour le profil de la requête.
+
+    S'utilise avec `app.router.route_class = ProfiledRoute`, avant la
+    déclaration des routes. Hors requête profilée, le surcoût est une
+    lecture de variable de contexte.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        route_handler = super().get_route_handler()
+
+        async def profiled_route_handler(request: Request) -> Response:
+            profile = _current.get()
+            if profile is None:
+                return await route_handler(request)
+            start = time.perf_counter()
+            if profile.profiler is not None:
+                try:
+                    profile.profiler.enable()
+                except ValueError:
+                    # Python 3.12+: un autre profileur est déjà actif
+                    profile.profiler = None
+            try:
+                return await route_handler(request)
+            finally:
+                if profile.profiler is not None:
+                    profile.profiler.disable()
+                profile.handled(start, time.perf_counter())
+
+        return profiled_route_handler
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Enveloppe la fonction de la route pour noter son début et sa fin."""
+    if getattr(call, "__profiled__", False):
+        return call
+
+    if asyncio.iscoroutinefunction(call):
+
+        @wraps(call)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            profile = _current.get()
+            if profile is None:
+                return await call(*args, **kwargs)
+            profile.endpoint_start = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                profile.endpoint_end = time.perf_counter()
+    else:
+
+        @wraps(call)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            # Route `def`: exécutée dans un thread, avec une copie du contexte
+            profile = _current.get()
+            if profile is None:
+                return call(*args, **kwargs)
+            profile.endpoint_start = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                profile.endpoint_end = time.perf_counter()
+
+    timed.__profiled__ = True  # type: ignore[attr-defined]
+    return timed
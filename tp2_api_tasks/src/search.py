@@ -0,0 +1,188 @@
+"""
+Index inversé pour la recherche plein texte des tâches.
+
+Les titres et descriptions sont découpés en mots normalisés (minuscules,
+sans accents) et indexés de façon incrémentale. La recherche accepte des
+préfixes pour l'auto-complétion et classe les résultats par pertinence.
+"""
+
+import heapq
+import re
+import unicodedata
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from indexes import SortedIndex
+
+
+# Poids d'un mot selon le champ où il apparaît
+TITLE_WEIGHT: int = 2
+DESCRIPTION_WEIGHT: int = 1
+
+# Un mot trouvé par préfixe compte moins qu'un mot exact
+PREFIX_FACTOR: float = 0.5
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "ß": "ss"})
+
+
+def _fold(text: str) -> str:
+    """Retire les accents par décomposition Unicode (chemin lent, générique)."""
+    decomposed = unicodedata.normalize("NFKD", text.translate(_LIGATURES))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+# Table de translittération précalculée pour les alphabets latins (U+0080 à
+# U+024F): couvre le français sans passer par unicodedata à chaque appel.
+_FOLD_TABLE = {code: _fold(chr(code)) for code in range(0x80, 0x250)}
+
+
+def normalize(text: str) -> str:
+    """
+    Normalise un texte pour l'indexation: minuscules et accents retirés.
+
+    Exemple:
+        >>> normalize("Tâche Élevée")
+        'tache elevee'
+    """
+    folded = text.casefold().translate(_FOLD_TABLE)
+    if folded.isascii():
+        return folded
+    return _fold(folded)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Découpe un texte en mots normalisés.
+
+    Exemple:
+        >>> tokenize("Préparer l'œuvre d'été")
+        ['preparer', 'l', 'oeuvre', 'd', 'ete']
+    """
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(normalize(text))
+
+
+class InvertedIndex:
+    """
+    Index inversé mot -> {ID de tâche: poids}.
+
+    Le vocabulaire est conservé trié pour retrouver les mots commençant
+    par un préfixe donné par dichotomie. Les mots de chaque tâche sont
+    mémorisés afin de pouvoir la retirer ou la réindexer sans parcourir
+    tout l'index.
+    """
+
+    def __init__(self) -> None:
+        """Initialise un index vide."""
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulary: SortedIndex = SortedIndex()
+        self._documents: Dict[int, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._documents)
+
+    def index(self, task_id: int, title: str, description: Optional[str]) -> None:
+        """
+        Indexe (ou réindexe) une tâche.
+
+        Args:
+            task_id (int): ID de la tâche.
+            title (str): Titre de la tâche.
+            description (Optional[str]): Description de la tâche.
+        """
+        self.remove(task_id)
+
+        weights: Dict[str, int] = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(description):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+
+        for token, weight in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                self._vocabulary.add(token)
+            posting[task_id] = weight
+        self._documents[task_id] = weights
+
+    def remove(self, task_id: int) -> None:
+        """
+        Retire une tâche de l'index (sans effet si elle n'y est pas).
+
+        Args:
+            task_id (int): ID de la tâche.
+        """
+        weights = self._documents.pop(task_id, None)
+        if weights is None:
+            return
+        for token in weights:
+            posting = self._postings[token]
+            del posting[task_id]
+            if not posting:
+                del self._postings[token]
+                self._vocabulary.discard(token)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        accept: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Recherche les tâches contenant tous les mots de la requête.
+
+        Chaque mot de la requête peut correspondre exactement ou comme
+        préfixe d'un mot indexé. Le score d'une tâche est la somme, pour
+        chaque mot de la requête, du meilleur poids trouvé.
+
+        Args:
+            query (str): Texte recherché.
+            limit (int): Nombre maximal de résultats.
+            accept (Optional[Callable[[int], bool]]): Filtre optionnel sur les IDs.
+
+        Returns:
+            List[Tuple[int, float]]: Couples (ID, score), du plus pertinent au
+            moins pertinent, à score égal par ID croissant.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        per_term = sorted((self._match(term) for term in terms), key=len)
+        scores = per_term[0]
+        for matches in per_term[1:]:
+            scores = {
+                task_id: score + matches[task_id]
+                for task_id, score in scores.items()
+                if task_id in matches
+            }
+            if not scores:
+                return []
+
+        candidates = scores.items()
+        if accept is not None:
+            candidates = ((task_id, score) for task_id, score in candidates if accept(task_id))
+        return heapq.nsmallest(limit, candidates, key=lambda item: (-item[1], item[0]))
+
+    def _match(self, term: str) -> Dict[int, float]:
+        """
+        Renvoie le meilleur score par tâche pour un mot (exact ou préfixe).
+
+        Tous les mots du vocabulaire qui commencent par `term` sont
+        développés, sans plafond: les résultats sont ceux de la recherche
+        FTS5 de SQLite (`"term"*`), seul le classement diffère.
+        """
+        scores: Dict[int, float] = dict(self._postings.get(term, {}))
+        for token in self._vocabulary.iter_after(term):
+            if not token.startswith(term):
+                break
+            for task_id, weight in self._postings[token].items():
+                score = weight * PREFIX_FACTOR
+                if score > scores.get(task_id, 0):
+                    scores[task_id] = score
+        return scores
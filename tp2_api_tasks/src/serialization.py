@@ -0,0 +1,204 @@
+"""
+Sérialisation JSON rapide des tâches.
+
+Chemin de réponse optimisé de GET /tasks et GET /tasks/{id}: les tâches
+viennent du stockage et sont déjà valides, elles ne repassent donc pas
+par la validation du response_model de FastAPI. Chaque tâche est
+encodée une fois (orjson si disponible, sinon json de la bibliothèque
+standard) et ses octets sont mis en cache sous sa version: une liste se
+construit en joignant des fragments déjà encodés.
+
+Le JSON produit est identique à celui de FastAPI (mêmes clés, dans le
+même ordre, caractères non ASCII non échappés).
+
+Avec le paramètre `fields` (par exemple `?fields=id,done`), seuls les
+champs demandés sont encodés (encode_projection()): les descriptions
+longues ne sont ni sérialisées ni transférées.
+"""
+
+import json
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Task
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+
+JSON_MEDIA_TYPE: str = "application/json"
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Encode comme JSONResponse de Starlette (compact, UTF-8)."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+# Encodeur JSON compact vers des octets UTF-8
+dumps: Callable[[Any], bytes] = orjson.dumps if orjson is not None else _json_dumps
+
+
+def encode_task(task: Task) -> bytes:
+    """Encode une tâche sans validation (l'ordre des clés est celui du modèle)."""
+    return dumps({"id": task.id, "title": task.title, "done": task.done, "description": task.description})
+
+
+# Champs d'une tâche, dans l'ordre du modèle (paramètre `fields` des lectures)
+TASK_FIELDS: Tuple[str, ...] = ("id", "title", "done", "description")
+
+
+def parse_fields(spec: str) -> Tuple[str, ...]:
+    """
+    Lit une projection de champs (paramètre `fields`).
+
+    Exemple:
+        >>> parse_fields("done, id")
+        ('id', 'done')
+
+    Raises:
+        ValueError: Si la liste est vide ou contient un champ inconnu.
+    """
+    requested = {name.strip() for name in spec.split(",") if name.strip()}
+    unknown = requested.difference(TASK_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Champs inconnus: {', '.join(sorted(unknown))} (champs possibles: {', '.join(TASK_FIELDS)})"
+        )
+    if not requested:
+        raise ValueError(f"Aucun champ demandé (champs possibles: {', '.join(TASK_FIELDS)})")
+    return tuple(name for name in TASK_FIELDS if name in requested)
+
+
+def _projector(fields: Tuple[str, ...]) -> Callable[[Task], Dict[str, Any]]:
+    """Construit la fonction qui extrait les champs demandés d'une tâche."""
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        name = fields[0]
+        return lambda task: {name: getter(task)}
+    return lambda task: dict(zip(fields, getter(task)))
+
+
+def encode_task_fields(task: Task, fields: Tuple[str, ...]) -> bytes:
+    """Encode seulement les champs demandés d'une tâche (voir parse_fields())."""
+    return dumps(_projector(fields)(task))
+
+
+def encode_projection(tasks: Iterable[Task], fields: Tuple[str, ...]) -> bytes:
+    """
+    Encode un tableau JSON des tâches réduites aux champs demandés.
+
+    Les projections ne passent pas par TaskJSONCache (une entrée par
+    combinaison de champs): les objets réduits sont construits puis
+    encodés en un seul appel.
+    """
+    return dumps(list(map(_projector(fields), tasks)))
+
+
+class TaskJSONCache:
+    """
+    Cache des tâches encodées en JSON, par ID et version.
+
+    Une entrée n'est servie que pour la version sous laquelle elle a été
+    encodée: toute modification de la tâche (nouvelle version) invalide
+    son entrée. Les entrées des tâches supprimées sont retirées par
+    discard(). L'appelant lit versions et contenu sous le même verrou de
+    lecture: une entrée correspond exactement à sa version (une écriture
+    intercalée laisserait sinon un contenu plus récent sous une version
+    plus ancienne).
+
+    Sans verrou: lectures et écritures du dictionnaire sont atomiques, et
+    deux threads qui encodent la même tâche produisent les mêmes octets.
+    Désactivé (enabled=False), le cache encode sans rien garder: chaque
+    entrée coûte environ 200 octets par tâche, plus qu'une tâche du
+    stockage compact.
+
+    Exemple:
+        >>> cache = TaskJSONCache()
+        >>> cache.encode(Task(id=1, title="Lait"), version=3)
+        b'{"id":1,"title":"Lait","done":false,"description":null}'
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        Initialise un cache vide.
+
+        Args:
+            enabled (bool): Si False, les tâches encodées ne sont pas gardées.
+        """
+        self._enabled: bool = enabled
+        self._entries: Dict[int, Tuple[int, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def encode(self, task: Task, version: int) -> bytes:
+        """
+        Renvoie le JSON de la tâche, encodé au besoin.
+
+        Args:
+            task (Task): Tâche du stockage.
+            version (int): Version de la tâche, lue avec son contenu.
+
+        Returns:
+            bytes: Objet JSON de la tâche.
+        """
+        entry = self._entries.get(task.id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        encoded = encode_task(task)
+        if self._enabled:
+            self._entries[task.id] = (version, encoded)
+        return encoded
+
+    def encode_list(
+        self,
+        task_ids: List[int],
+        versions: List[int],
+        load: Callable[[List[int]], List[Task]]
+    ) -> bytes:
+        """
+        Renvoie le tableau JSON des tâches, en joignant leurs fragments.
+
+        Seules les tâches absentes du cache (ou d'une autre version) sont
+        chargées, par un seul appel à `load`.
+
+        Args:
+            task_ids (List[int]): IDs des tâches, dans l'ordre voulu.
+            versions (List[int]): Version de chaque tâche (voir
+                                  TaskStore.page_versions()).
+            load: Charge les tâches existantes parmi des IDs (comme
+                  TaskStore.get_many()), sous le verrou de lecture où
+                  `versions` a été lu.
+
+        Returns:
+            bytes: Tableau JSON des tâches.
+        """
+        entries = self._entries
+        fragments: List[Optional[bytes]] = []
+        missing: Dict[int, int] = {}
+        for task_id, version in zip(task_ids, versions):
+            entry = entries.get(task_id)
+            if entry is not None and entry[0] == version:
+                fragments.append(entry[1])
+            else:
+                fragments.append(None)
+                missing[task_id] = version
+        if not missing:
+            return b"[" + b",".join(fragments) + b"]"
+
+        encoded = {task.id: encode_task(task) for task in load(list(missing))}
+        if self._enabled:
+            for task_id, fragment in encoded.items():
+                entries[task_id] = (missing[task_id], fragment)
+        joined = (
+            fragment if fragment is not None else encoded.get(task_id)
+            for task_id, fragment in zip(task_ids, fragments)
+        )
+        return b"[" + b",".join(fragment for fragment in joined if fragment is not None) + b"]"
+
+    def discard(self, task_ids: Iterable[int]) -> None:
+        """Retire les entrées des tâches supprimées."""
+        for task_id in task_ids:
+            self._entries.pop(task_id, None)
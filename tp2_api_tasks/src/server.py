@@ -0,0 +1,60 @@
+"""
+Lancement du serveur uvicorn, en un ou plusieurs processus.
+
+Avec plusieurs workers, chaque processus importe `main:app` et possède son
+propre TaskService: l'état n'est partagé que par le stockage (base SQLite,
+voir TASKS_WORKERS dans main.py).
+"""
+
+import asyncio
+import socket
+
+import uvicorn
+from uvicorn.protocols.http.h11_impl import H11Protocol
+
+
+class NoDelayH11Protocol(H11Protocol):
+    """
+    Protocole HTTP/1.1 de uvicorn avec TCP_NODELAY sur chaque connexion.
+
+    En mode multi-workers, uvicorn crée lui-même le socket d'écoute partagé
+    sans préciser de protocole (proto=0): asyncio n'active alors pas
+    TCP_NODELAY sur les connexions acceptées, et l'algorithme de Nagle,
+    combiné à l'ACK retardé du client, ajoute environ 40 ms à chaque
+    requête d'une connexion persistante.
+    """
+
+    def connection_made(self, transport: asyncio.Transport) -> None:  # type: ignore[override]
+        sock = transport.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().connection_made(transport)
+
+
+def run(
+    workers: int = 1,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    reload: bool = False,
+    log_level: str = "info"
+) -> None:
+    """
+    Démarre l'API.
+
+    Args:
+        workers (int): Nombre de processus; au-delà de 1, le rechargement
+                       automatique est désactivé.
+        host (str): Adresse d'écoute.
+        port (int): Port d'écoute.
+        reload (bool): Rechargement automatique (un seul processus).
+        log_level (str): Niveau de log de uvicorn.
+    """
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        reload=reload and workers == 1,
+        http=NoDelayH11Protocol,
+        log_level=log_level
+    )
@@ -0,0 +1,927 @@
+"""
+Backends de stockage des tâches.
+
+Le TaskService délègue la persistance à un TaskStore interchangeable:
+
+- MemoryTaskStore: dictionnaire indexé en mémoire (par défaut, tests);
+- SQLiteTaskStore: base SQLite durable (mode WAL, une connexion par
+  thread), partageable entre plusieurs processus;
+- JournaledTaskStore (journal.py): stockage en mémoire rendu durable par
+  un journal d'écriture et des instantanés périodiques;
+- CompactTaskStore (compact.py): stockage en mémoire en colonnes, sans
+  objet Task par tâche, pour les très gros volumes.
+
+Les opérations d'écriture prennent des listes d'IDs pour que les
+opérations en masse se fassent en un seul appel (et une seule
+transaction côté SQLite). Les backends ne sont pas tenus d'être sûrs en
+accès concurrent: le TaskService sérialise les écritures.
+
+Durabilité SQLite (PRAGMA synchronous, TASKS_SQLITE_SYNCHRONOUS):
+
+- FULL (défaut): le WAL est synchronisé (fsync) à chaque commit; une
+  écriture confirmée survit à une coupure de courant;
+- NORMAL: fsync seulement aux checkpoints; plus rapide en écriture, la
+  base reste cohérente mais les derniers commits confirmés peuvent être
+  perdus sur coupure de courant (pas sur arrêt brutal du processus);
+- EXTRA et OFF sont acceptés (OFF: aucun fsync, réservé aux tests).
+"""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from itertools import islice
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+from concurrency import IdAllocator
+from indexes import SortedIndex
+from models import Task, TaskConsistencyError
+from ordering import SORT_DONE, SORT_ID, SORT_TITLE, SortKey
+from search import InvertedIndex, normalize, tokenize
+
+
+# Backends sélectionnables par configuration
+MEMORY_BACKEND: str = "memory"
+SQLITE_BACKEND: str = "sqlite"
+JOURNAL_BACKEND: str = "journal"
+COMPACT_BACKEND: str = "compact"
+
+# Niveaux PRAGMA synchronous de SQLiteTaskStore (voir plus haut)
+SQLITE_SYNCHRONOUS_LEVELS: Tuple[str, ...] = ("OFF", "NORMAL", "FULL", "EXTRA")
+DEFAULT_SQLITE_SYNCHRONOUS: str = "FULL"
+
+
+class TaskStore(ABC):
+    """Interface commune des backends de stockage des tâches."""
+
+    # True si les appels peuvent attendre des E/S (disque, fsync): la
+    # couche asynchrone (AsyncTaskService) les exécute alors dans un pool
+    # de threads borné au lieu de la boucle d'événements
+    blocking: bool = False
+
+    # True si le backend trie lui-même (sorted_page()): le TaskService n'a
+    # alors pas d'index de tri à construire ni à tenir à jour
+    native_sort: bool = False
+
+    # ------------------------------------------------------------------ Lecture
+
+    @abstractmethod
+    def get(self, task_id: int) -> Optional[Task]:
+        """Renvoie la tâche d'ID `task_id`, ou None si elle n'existe pas."""
+
+    @abstractmethod
+    def get_many(self, task_ids: Iterable[int]) -> List[Task]:
+        """Renvoie les tâches existantes parmi `task_ids`, dans le même ordre."""
+
+    @abstractmethod
+    def page(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        """Renvoie au plus `limit` tâches d'ID > `after_id`, triées par ID."""
+
+    @abstractmethod
+    def page_versions(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Comme page(), mais renvoie les IDs et la version de chaque tâche.
+
+        Deux listes parallèles plutôt qu'une paire par tâche (pas d'objet
+        par ligne à suivre par le ramasse-miettes), et aucune Task n'est
+        construite: l'appelant ne charge que les tâches dont il n'a pas
+        déjà la version courante.
+        """
+
+    def sorted_page(
+        self,
+        sort: str,
+        descending: bool = False,
+        done: Optional[bool] = None,
+        after: Optional[SortKey] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        """
+        Renvoie au plus `limit` tâches triées sur `sort`, de clé strictement
+        après `after` (voir ordering.SORT_KEYS). Seulement si native_sort.
+        """
+        raise NotImplementedError(f"{type(self).__name__} ne trie pas lui-même")
+
+    @abstractmethod
+    def ids(self, done: Optional[bool] = None) -> List[int]:
+        """Renvoie les IDs triés des tâches, éventuellement filtrés par statut."""
+
+    @abstractmethod
+    def count(self, done: Optional[bool] = None) -> int:
+        """Compte les tâches, éventuellement par statut."""
+
+    def counters(self) -> Tuple[int, int, int]:
+        """
+        Version globale, nombre de tâches et nombre de tâches terminées, lus
+        ensemble. Cohérents sous le verrou du service; un backend partagé
+        entre processus les lit en une seule requête.
+        """
+        return self.version, self.count(), self.count(done=True)
+
+    @abstractmethod
+    def search(self, query: str, done: Optional[bool], limit: int) -> List[Task]:
+        """Recherche plein texte, résultats par pertinence décroissante."""
+
+    @property
+    @abstractmethod
+    def version(self) -> int:
+        """Version globale, incrémentée à chaque modification d'une tâche."""
+
+    @abstractmethod
+    def task_version(self, task_id: int) -> Optional[int]:
+        """Version de la dernière modification d'une tâche, ou None."""
+
+    # ----------------------------------------------------------------- Écriture
+
+    @abstractmethod
+    def allocate_ids(self, count: int = 1) -> int:
+        """Réserve atomiquement `count` IDs consécutifs et renvoie le premier."""
+
+    @abstractmethod
+    def insert(self, tasks: List[Task]) -> None:
+        """Ajoute des tâches dont les IDs ont été réservés par allocate_ids()."""
+
+    @abstractmethod
+    def update(self, task_ids: List[int], changes: Dict[str, Any]) -> List[Task]:
+        """Applique `changes` (title, description, done) et renvoie les tâches trouvées."""
+
+    @abstractmethod
+    def toggle(self, task_ids: List[int]) -> List[Task]:
+        """Inverse le statut des tâches et renvoie les tâches trouvées."""
+
+    @abstractmethod
+    def delete(self, task_ids: List[int]) -> List[Task]:
+        """Supprime les tâches et renvoie celles qui existaient."""
+
+    def transaction(self) -> ContextManager[Any]:
+        """
+        Regroupe les lectures et écritures d'une mutation du service.
+
+        Le TaskService sérialise déjà les écritures de son processus;
+        un backend partagé entre plusieurs processus rend en plus la
+        mutation atomique vis-à-vis des autres processus (sélection des
+        tâches comprise). Sans effet par défaut.
+        """
+        return nullcontext()
+
+    def sync(self) -> None:
+        """
+        Attend que les écritures du thread courant soient durables.
+
+        Appelée par le service après avoir relâché son verrou d'écriture,
+        pour que plusieurs écritures concurrentes partagent un même fsync.
+        Sans effet pour les backends dont les écritures sont durables (ou
+        volatiles) dès leur retour.
+        """
+
+    # ------------------------------------------------------------- Maintenance
+
+    @abstractmethod
+    def check_consistency(self) -> None:
+        """Recalcule compteurs et index; lève TaskConsistencyError en cas d'écart."""
+
+    def close(self) -> None:
+        """Libère les ressources du backend."""
+
+
+# ============================================================================
+# Backend en mémoire
+# ============================================================================
+
+class MemoryTaskStore(TaskStore):
+    """
+    Stockage en mémoire, indexé par ID.
+
+    Les tâches sont rangées dans un dictionnaire (accès en O(1)), avec un
+    index trié des IDs pour la pagination par curseur, un index trié par
+    statut pour le filtrage et les compteurs, et un index inversé pour la
+    recherche plein texte. Chaque modification incrémente une version
+    globale et monotone, mémorisée aussi par tâche.
+
+    Un stockage reconstruit par restore() ne bâtit son index plein texte
+    qu'à la première recherche: le démarrage ne paie pas la tokenisation
+    de toutes les tâches.
+    """
+
+    def __init__(self) -> None:
+        """Initialise un stockage vide."""
+        self._tasks: Dict[int, Task] = {}
+        self._ids: SortedIndex = SortedIndex()
+        self._status_ids: Dict[bool, SortedIndex] = {False: SortedIndex(), True: SortedIndex()}
+        self._search_index: Optional[InvertedIndex] = InvertedIndex()
+        self._version: int = 0
+        self._task_versions: Dict[int, int] = {}
+        self._id_allocator: IdAllocator = IdAllocator()
+
+    @classmethod
+    def restore(
+        cls,
+        rows: Iterable[Tuple[int, str, Optional[str], bool, int]],
+        version: int,
+        next_id: int
+    ) -> "MemoryTaskStore":
+        """
+        Reconstruit un stockage à partir d'un instantané (voir dump()).
+
+        Les index triés sont remplis en une passe et l'index plein texte
+        est construit à la demande: le coût est dominé par la création
+        des objets Task.
+
+        Args:
+            rows: Lignes (id, title, description, done, version).
+            version (int): Version globale au moment de l'instantané.
+            next_id (int): Prochain ID à attribuer.
+
+        Returns:
+            MemoryTaskStore: Le stockage reconstruit.
+        """
+        store = cls()
+        rows = sorted(rows)
+        store._tasks = {
+            row[0]: Task(id=row[0], title=row[1], description=row[2], done=row[3])
+            for row in rows
+        }
+        store._task_versions = {row[0]: row[4] for row in rows}
+        store._ids = SortedIndex.from_sorted(row[0] for row in rows)
+        store._status_ids = {
+            done: SortedIndex.from_sorted(row[0] for row in rows if row[3] == done)
+            for done in (False, True)
+        }
+        store._search_index = None
+        store._version = version
+        store._id_allocator = IdAllocator(next_id)
+        return store
+
+    def dump(self) -> Tuple[List[Tuple[int, str, Optional[str], bool, int]], int, int]:
+        """
+        Capture l'état complet du stockage, pour un instantané.
+
+        Returns:
+            Tuple: Lignes (id, title, description, done, version) triées par
+            ID, version globale et prochain ID à attribuer.
+        """
+        versions = self._task_versions
+        rows = [
+            (task.id, task.title, task.description, task.done, versions[task.id])
+            for task in map(self._tasks.__getitem__, self._ids)
+        ]
+        return rows, self._version, self._id_allocator.next_id
+
+    def advance_ids(self, next_id: int) -> None:
+        """Garantit que les prochains IDs attribués seront >= `next_id`."""
+        self._id_allocator.advance(next_id)
+
+    def get(self, task_id: int) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> List[Task]:
+        tasks = (self._tasks.get(task_id) for task_id in task_ids)
+        return [task for task in tasks if task is not None]
+
+    def page(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        index = self._ids if done is None else self._status_ids[done]
+        return [self._tasks[task_id] for task_id in islice(index.iter_after(after_id), limit)]
+
+    def page_versions(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[int], List[int]]:
+        index = self._ids if done is None else self._status_ids[done]
+        task_ids = list(islice(index.iter_after(after_id), limit))
+        return task_ids, list(map(self._task_versions.__getitem__, task_ids))
+
+    def ids(self, done: Optional[bool] = None) -> List[int]:
+        return list(self._ids if done is None else self._status_ids[done])
+
+    def count(self, done: Optional[bool] = None) -> int:
+        if done is None:
+            return len(self._tasks)
+        return len(self._status_ids[done])
+
+    def search(self, query: str, done: Optional[bool], limit: int) -> List[Task]:
+        accept = None
+        if done is not None:
+            accept = self._status_ids[done].__contains__
+        results = self._searchable().search(query, limit, accept)
+        return [self._tasks[task_id] for task_id, _ in results]
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def task_version(self, task_id: int) -> Optional[int]:
+        return self._task_versions.get(task_id)
+
+    def allocate_ids(self, count: int = 1) -> int:
+        return self._id_allocator.allocate(count)
+
+    def insert(self, tasks: List[Task]) -> None:
+        for task in tasks:
+            self._tasks[task.id] = task
+            self._ids.add(task.id)
+            self._status_ids[task.done].add(task.id)
+            if self._search_index is not None:
+                self._search_index.index(task.id, task.title, task.description)
+            self._touch(task.id)
+
+    def update(self, task_ids: List[int], changes: Dict[str, Any]) -> List[Task]:
+        title = changes.get("title")
+        description = changes.get("description")
+        done = changes.get("done")
+        updated = self.get_many(task_ids)
+        for task in updated:
+            text_changed = False
+            if title is not None and title != task.title:
+                task.title = title
+                text_changed = True
+            if description is not None and description != task.description:
+                task.description = description
+                text_changed = True
+            if text_changed:
+                if self._search_index is not None:
+                    self._search_index.index(task.id, task.title, task.description)
+                self._touch(task.id)
+            if done is not None:
+                self._set_done(task, done)
+        return updated
+
+    def toggle(self, task_ids: List[int]) -> List[Task]:
+        toggled = self.get_many(task_ids)
+        for task in toggled:
+            self._set_done(task, not task.done)
+        return toggled
+
+    def delete(self, task_ids: List[int]) -> List[Task]:
+        deleted = self.get_many(task_ids)
+        for task in deleted:
+            del self._tasks[task.id]
+            self._ids.discard(task.id)
+            self._status_ids[task.done].discard(task.id)
+            if self._search_index is not None:
+                self._search_index.remove(task.id)
+            self._version += 1
+            del self._task_versions[task.id]
+        return deleted
+
+    def check_consistency(self) -> None:
+        done_count = sum(1 for task in self._tasks.values() if task.done)
+        if done_count != self.count(done=True):
+            raise TaskConsistencyError(
+                f"Compteur done incohérent: {self.count(done=True)} maintenu, {done_count} recalculé"
+            )
+        if list(self._ids) != sorted(self._tasks):
+            raise TaskConsistencyError("Index des IDs incohérent avec les tâches stockées")
+        for done, index in self._status_ids.items():
+            expected = sorted(task.id for task in self._tasks.values() if task.done == done)
+            if list(index) != expected:
+                raise TaskConsistencyError(f"Index de statut done={done} incohérent")
+        if set(self._searchable()) != set(self._tasks):
+            raise TaskConsistencyError("Index plein texte incohérent avec les tâches stockées")
+        if self._task_versions.keys() != self._tasks.keys():
+            raise TaskConsistencyError("Versions par tâche incohérentes avec les tâches stockées")
+        if any(version > self._version for version in self._task_versions.values()):
+            raise TaskConsistencyError("Version de tâche supérieure à la version globale")
+
+    def _searchable(self) -> InvertedIndex:
+        """Renvoie l'index plein texte, en le construisant s'il est absent."""
+        if self._search_index is None:
+            search_index = InvertedIndex()
+            for task in self._tasks.values():
+                search_index.index(task.id, task.title, task.description)
+            self._search_index = search_index
+        return self._search_index
+
+    def _set_done(self, task: Task, done: bool) -> None:
+        """Change le statut d'une tâche et la déplace d'un index de statut à l'autre."""
+        if task.done != done:
+            self._status_ids[task.done].discard(task.id)
+            self._status_ids[done].add(task.id)
+            task.done = done
+            self._touch(task.id)
+
+    def _touch(self, task_id: int) -> None:
+        """Incrémente la version globale et l'attribue à la tâche modifiée."""
+        self._version += 1
+        self._task_versions[task_id] = self._version
+
+
+# ============================================================================
+# Backend SQLite
+# ============================================================================
+
+_SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        done INTEGER NOT NULL DEFAULT 0,
+        version INTEGER NOT NULL,
+        title_key TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tasks_done ON tasks (done, id)",
+    """
+    CREATE TABLE IF NOT EXISTS store_meta (
+        singleton INTEGER PRIMARY KEY CHECK (singleton = 1),
+        next_id INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        done INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO store_meta VALUES (1, 1, 0, 0, 0)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+)
+
+# Index du tri par titre, créés après l'ajout éventuel de title_key
+# (bases créées avant le tri côté serveur)
+_SORT_SCHEMA: Tuple[str, ...] = (
+    "CREATE INDEX IF NOT EXISTS idx_tasks_title ON tasks (title_key, id)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_done_title ON tasks (done, title_key, id)",
+)
+
+_SELECT_COLUMNS: str = "SELECT id, title, description, done FROM tasks"
+
+# Colonnes SQL de la clé de tri de chaque champ (voir ordering.SORT_KEYS);
+# title_key est le titre normalisé, comme la clé du tri en mémoire
+_SORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    SORT_ID: ("id",),
+    SORT_TITLE: ("title_key", "id"),
+    SORT_DONE: ("done", "id"),
+}
+
+# Limite de variables par requête des anciennes versions de SQLite
+_MAX_VARIABLES: int = 900
+
+
+def _row_to_task(row: Tuple[int, str, Optional[str], int]) -> Task:
+    """Construit une Task depuis une ligne déjà validée à l'écriture."""
+    return Task.model_construct(id=row[0], title=row[1], description=row[2], done=bool(row[3]))
+
+
+def _fts_row(task: Task) -> Tuple[str, str, int]:
+    """Texte normalisé (comme l'index en mémoire) indexé par FTS5."""
+    return normalize(task.title), normalize(task.description or ""), task.id
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    Stockage durable dans une base SQLite.
+
+    - Mode WAL: les lectures ne bloquent pas l'écriture en cours;
+    - une connexion par thread, créée à la demande et réutilisée;
+    - requêtes constantes, gardées dans le cache de requêtes préparées
+      de chaque connexion;
+    - index sur id (clé primaire) et (done, id) pour le filtrage et la
+      pagination par curseur;
+    - tri natif (sorted_page): ORDER BY sur la clé de tri et curseur en
+      WHERE (row values), servis par les index (title_key, id) et
+      (done, title_key, id); title_key est le titre normalisé, écrit
+      avec la tâche;
+    - compteurs, version globale et prochain ID dans la table store_meta,
+      mis à jour dans la même transaction que les tâches: /stats reste en
+      O(1) et plusieurs processus peuvent partager la même base (workers
+      uvicorn), les IDs étant réservés atomiquement dans store_meta;
+    - transaction(): une mutation du service (sélection comprise) forme
+      une seule transaction BEGIN IMMEDIATE, les transactions internes
+      des écritures s'y fondent;
+    - recherche plein texte via une table FTS5;
+    - synchronous=FULL par défaut: chaque commit est durable (voir le
+      docstring du module pour NORMAL).
+    """
+
+    blocking = True
+    native_sort = True
+
+    def __init__(self, path: str, synchronous: str = DEFAULT_SQLITE_SYNCHRONOUS) -> None:
+        """
+        Ouvre (ou crée) la base.
+
+        Args:
+            path (str): Chemin du fichier SQLite.
+            synchronous (str): Niveau PRAGMA synchronous (OFF, NORMAL, FULL
+                               ou EXTRA; NORMAL peut perdre les derniers
+                               commits sur coupure de courant).
+
+        Raises:
+            ValueError: Si le niveau est inconnu.
+        """
+        if synchronous.upper() not in SQLITE_SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Niveau synchronous inconnu: {synchronous!r}")
+        self._path: str = path
+        self._synchronous: str = synchronous.upper()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with self._transaction() as cursor:
+            for statement in _SCHEMA:
+                cursor.execute(statement)
+            self._add_title_key(cursor)
+            for statement in _SORT_SCHEMA:
+                cursor.execute(statement)
+
+    @staticmethod
+    def _add_title_key(cursor: sqlite3.Cursor) -> None:
+        """Ajoute et remplit la colonne title_key d'une base créée sans elle."""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(tasks)")}
+        if "title_key" in columns:
+            return
+        cursor.execute("ALTER TABLE tasks ADD COLUMN title_key TEXT")
+        rows = cursor.execute("SELECT id, title FROM tasks").fetchall()
+        cursor.executemany(
+            "UPDATE tasks SET title_key = ? WHERE id = ?",
+            [(normalize(title), task_id) for task_id, title in rows]
+        )
+
+    # ----------------------------------------------------------- Connexions
+
+    def _connection(self) -> sqlite3.Connection:
+        """Renvoie la connexion du thread courant, en l'ouvrant si besoin."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+                timeout=30.0
+            )
+            connection.execute(f"PRAGMA synchronous={self._synchronous}")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _transaction(self) -> "_Transaction":
+        """Transaction d'écriture (BEGIN IMMEDIATE) sur la connexion du thread."""
+        return _Transaction(self._connection())
+
+    def transaction(self) -> "_Transaction":
+        return self._transaction()
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # -------------------------------------------------------------- Lecture
+
+    def get(self, task_id: int) -> Optional[Task]:
+        row = self._connection().execute(f"{_SELECT_COLUMNS} WHERE id = ?", (task_id,)).fetchone()
+        return _row_to_task(row) if row is not None else None
+
+    def get_many(self, task_ids: Iterable[int]) -> List[Task]:
+        task_ids = list(task_ids)
+        found: Dict[int, Task] = {}
+        for chunk in _chunks(task_ids):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection().execute(
+                f"{_SELECT_COLUMNS} WHERE id IN ({placeholders})", chunk
+            )
+            found.update((row[0], _row_to_task(row)) for row in rows)
+        return [found[task_id] for task_id in task_ids if task_id in found]
+
+    def page(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        rows = self._page_rows(_SELECT_COLUMNS, done, after_id, limit)
+        return [_row_to_task(row) for row in rows]
+
+    def page_versions(
+        self,
+        done: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[int], List[int]]:
+        rows = self._page_rows("SELECT id, version FROM tasks", done, after_id, limit).fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    def _page_rows(
+        self,
+        select: str,
+        done: Optional[bool],
+        after_id: Optional[int],
+        limit: Optional[int]
+    ) -> sqlite3.Cursor:
+        """Exécute `select` sur les lignes d'une page (voir page())."""
+        after = after_id if after_id is not None else 0
+        size = limit if limit is not None else -1
+        if done is None:
+            return self._connection().execute(
+                f"{select} WHERE id > ? ORDER BY id LIMIT ?", (after, size)
+            )
+        return self._connection().execute(
+            f"{select} WHERE done = ? AND id > ? ORDER BY id LIMIT ?",
+            (int(done), after, size)
+        )
+
+    def sorted_page(
+        self,
+        sort: str,
+        descending: bool = False,
+        done: Optional[bool] = None,
+        after: Optional[SortKey] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        columns = _SORT_COLUMNS[sort]
+        conditions: List[str] = []
+        params: List[Any] = []
+        if done is not None:
+            conditions.append("done = ?")
+            params.append(int(done))
+            if columns[0] == "done":
+                # Statut fixé par le filtre: tri et curseur sur l'ID seul
+                columns = columns[1:]
+                after = after[1:] if after is not None else None
+        if after is not None:
+            # Curseur: comparaison de row values, résolue par l'index du tri
+            conditions.append(
+                f"({', '.join(columns)}) {'<' if descending else '>'} ({', '.join('?' * len(columns))})"
+            )
+            params.extend(int(value) if isinstance(value, bool) else value for value in after)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = " DESC" if descending else ""
+        order = ", ".join(column + direction for column in columns)
+        params.append(limit if limit is not None else -1)
+        rows = self._connection().execute(f"{_SELECT_COLUMNS}{where} ORDER BY {order} LIMIT ?", params)
+        return [_row_to_task(row) for row in rows]
+
+    def ids(self, done: Optional[bool] = None) -> List[int]:
+        if done is None:
+            rows = self._connection().execute("SELECT id FROM tasks ORDER BY id")
+        else:
+            rows = self._connection().execute(
+                "SELECT id FROM tasks WHERE done = ? ORDER BY id", (int(done),)
+            )
+        return [row[0] for row in rows]
+
+    def count(self, done: Optional[bool] = None) -> int:
+        total, done_count = self._connection().execute(
+            "SELECT total, done FROM store_meta"
+        ).fetchone()
+        if done is None:
+            return total
+        return done_count if done else total - done_count
+
+    def counters(self) -> Tuple[int, int, int]:
+        return self._connection().execute("SELECT version, total, done FROM store_meta").fetchone()
+
+    def search(self, query: str, done: Optional[bool], limit: int) -> List[Task]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        sql = (
+            "SELECT t.id, t.title, t.description, t.done FROM tasks_fts "
+            "JOIN tasks t ON t.id = tasks_fts.rowid WHERE tasks_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if done is not None:
+            sql += " AND t.done = ?"
+            params.append(int(done))
+        sql += " ORDER BY bm25(tasks_fts, 2.0, 1.0), t.id LIMIT ?"
+        params.append(limit)
+        return [_row_to_task(row) for row in self._connection().execute(sql, params)]
+
+    @property
+    def version(self) -> int:
+        return self._connection().execute("SELECT version FROM store_meta").fetchone()[0]
+
+    def task_version(self, task_id: int) -> Optional[int]:
+        row = self._connection().execute(
+            "SELECT version FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    # ------------------------------------------------------------- Écriture
+
+    def allocate_ids(self, count: int = 1) -> int:
+        return self._connection().execute(
+            "UPDATE store_meta SET next_id = next_id + ? RETURNING next_id - ?",
+            (count, count)
+        ).fetchone()[0]
+
+    def insert(self, tasks: List[Task]) -> None:
+        if not tasks:
+            return
+        with self._transaction() as cursor:
+            version = cursor.execute("SELECT version FROM store_meta").fetchone()[0]
+            cursor.executemany(
+                "INSERT INTO tasks (id, title, description, done, version, title_key) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (task.id, task.title, task.description, int(task.done), version + offset, normalize(task.title))
+                    for offset, task in enumerate(tasks, start=1)
+                ]
+            )
+            cursor.executemany(
+                "INSERT INTO tasks_fts (title, description, rowid) VALUES (?, ?, ?)",
+                [_fts_row(task) for task in tasks]
+            )
+            cursor.execute(
+                "UPDATE store_meta SET version = ?, total = total + ?, done = done + ?",
+                (version + len(tasks), len(tasks), sum(1 for task in tasks if task.done))
+            )
+
+    def update(self, task_ids: List[int], changes: Dict[str, Any]) -> List[Task]:
+        title = changes.get("title")
+        description = changes.get("description")
+        done = changes.get("done")
+        with self._transaction() as cursor:
+            tasks = self.get_many(task_ids)
+            modified: List[Task] = []
+            text_modified: List[Task] = []
+            done_delta = 0
+            for task in tasks:
+                text_changed = False
+                if title is not None and title != task.title:
+                    task.title = title
+                    text_changed = True
+                if description is not None and description != task.description:
+                    task.description = description
+                    text_changed = True
+                done_changed = done is not None and done != task.done
+                if done_changed:
+                    task.done = done
+                    done_delta += 1 if done else -1
+                if text_changed:
+                    text_modified.append(task)
+                if text_changed or done_changed:
+                    modified.append(task)
+            self._write_changes(cursor, modified, text_modified, done_delta)
+        return tasks
+
+    def toggle(self, task_ids: List[int]) -> List[Task]:
+        with self._transaction() as cursor:
+            tasks = self.get_many(task_ids)
+            done_delta = 0
+            for task in tasks:
+                task.done = not task.done
+                done_delta += 1 if task.done else -1
+            self._write_changes(cursor, tasks, [], done_delta)
+        return tasks
+
+    def delete(self, task_ids: List[int]) -> List[Task]:
+        with self._transaction() as cursor:
+            tasks = self.get_many(task_ids)
+            if tasks:
+                rows = [(task.id,) for task in tasks]
+                cursor.executemany("DELETE FROM tasks WHERE id = ?", rows)
+                cursor.executemany("DELETE FROM tasks_fts WHERE rowid = ?", rows)
+                cursor.execute(
+                    "UPDATE store_meta SET version = version + ?, total = total - ?, done = done - ?",
+                    (len(tasks), len(tasks), sum(1 for task in tasks if task.done))
+                )
+        return tasks
+
+    def _write_changes(
+        self,
+        cursor: sqlite3.Cursor,
+        modified: List[Task],
+        text_modified: List[Task],
+        done_delta: int
+    ) -> None:
+        """Écrit les tâches modifiées avec de nouvelles versions et met à jour store_meta."""
+        if not modified:
+            return
+        version = cursor.execute("SELECT version FROM store_meta").fetchone()[0]
+        cursor.executemany(
+            "UPDATE tasks SET title = ?, description = ?, done = ?, version = ?, title_key = ? WHERE id = ?",
+            [
+                (task.title, task.description, int(task.done), version + offset, normalize(task.title), task.id)
+                for offset, task in enumerate(modified, start=1)
+            ]
+        )
+        cursor.executemany(
+            "UPDATE tasks_fts SET title = ?, description = ? WHERE rowid = ?",
+            [_fts_row(task) for task in text_modified]
+        )
+        cursor.execute(
+            "UPDATE store_meta SET version = ?, done = done + ?",
+            (version + len(modified), done_delta)
+        )
+
+    # ---------------------------------------------------------- Maintenance
+
+    def check_consistency(self) -> None:
+        connection = self._connection()
+        total, done_count, version = connection.execute(
+            "SELECT total, done, version FROM store_meta"
+        ).fetchone()
+        actual_total, actual_done, max_version = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(done), 0), COALESCE(MAX(version), 0) FROM tasks"
+        ).fetchone()
+        if (total, done_count) != (actual_total, actual_done):
+            raise TaskConsistencyError(
+                f"Compteurs incohérents: ({total}, {done_count}) maintenus, "
+                f"({actual_total}, {actual_done}) recalculés"
+            )
+        if max_version > version:
+            raise TaskConsistencyError("Version de tâche supérieure à la version globale")
+        fts_total = connection.execute("SELECT COUNT(*) FROM tasks_fts").fetchone()[0]
+        if fts_total != actual_total:
+            raise TaskConsistencyError("Index plein texte incohérent avec les tâches stockées")
+
+
+class _Transaction:
+    """
+    Gestionnaire de contexte: BEGIN IMMEDIATE puis COMMIT, ou ROLLBACK sur erreur.
+
+    Imbriqué dans une transaction déjà ouverte sur la connexion, il s'y
+    fond: seule la transaction englobante valide ou annule.
+    """
+
+    __slots__ = ("_connection", "_cursor", "_outermost")
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self._outermost: bool = False
+
+    def __enter__(self) -> sqlite3.Cursor:
+        self._cursor = self._connection.cursor()
+        self._outermost = not self._connection.in_transaction
+        if self._outermost:
+            self._cursor.execute("BEGIN IMMEDIATE")
+        return self._cursor
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if not self._outermost:
+            return
+        if exc_type is None:
+            self._connection.execute("COMMIT")
+        else:
+            self._connection.execute("ROLLBACK")
+
+
+def _chunks(values: List[int]) -> Iterable[List[int]]:
+    """Découpe une liste d'IDs en paquets compatibles avec la limite de variables."""
+    for start in range(0, len(values), _MAX_VARIABLES):
+        yield values[start:start + _MAX_VARIABLES]
+
+
+def create_store(
+    backend: str = MEMORY_BACKEND,
+    path: str = "tasks.db",
+    journal_dir: str = "tasks-journal",
+    sqlite_synchronous: str = DEFAULT_SQLITE_SYNCHRONOUS
+) -> TaskStore:
+    """
+    Instancie le backend de stockage demandé.
+
+    Args:
+        backend (str): "memory", "sqlite", "journal" ou "compact".
+        path (str): Chemin de la base pour le backend SQLite.
+        journal_dir (str): Répertoire du journal et des instantanés pour
+                           le backend journal.
+        sqlite_synchronous (str): Niveau PRAGMA synchronous du backend
+                                  SQLite (FULL par défaut).
+
+    Returns:
+        TaskStore: Le backend configuré.
+
+    Raises:
+        ValueError: Si le backend (ou le niveau synchronous) est inconnu.
+    """
+    if backend == MEMORY_BACKEND:
+        return MemoryTaskStore()
+    if backend == SQLITE_BACKEND:
+        return SQLiteTaskStore(path, sqlite_synchronous)
+    if backend == JOURNAL_BACKEND:
+        from journal import JournaledTaskStore
+        return JournaledTaskStore(journal_dir)
+    if backend == COMPACT_BACKEND:
+        from compact import CompactTaskStore
+        return CompactTaskStore()
+    raise ValueError(f"Backend de stockage inconnu: {backend!r}")
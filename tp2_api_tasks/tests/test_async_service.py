@@ -0,0 +1,189 @@
+"""
+Tests de l'interface asynchrone du service et des routes async.
+"""
+
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from async_service import AsyncTaskService
+from journal import SYNC_ASYNC, JournaledTaskStore
+from main import TaskService
+from models import TaskCreate, TaskNotFoundError, TaskUpdate
+from storage import MemoryTaskStore, SQLiteTaskStore
+
+
+@pytest.fixture
+def executor():
+    """Pool de threads reconnaissable par le nom de ses threads."""
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-store")
+    yield pool
+    pool.shutdown()
+
+
+def spy(service, name, threads):
+    """Remplace la méthode `name` du service pour noter le thread appelant."""
+    original = getattr(service, name)
+
+    def wrapper(*args):
+        threads.append(threading.current_thread().name)
+        return original(*args)
+
+    setattr(service, name, wrapper)
+
+
+class TestAsyncTaskService:
+    """Tests du choix entre appel direct et pool de threads."""
+
+    def test_memoire_sans_thread(self, executor):
+        """Test que les appels unitaires sur la mémoire restent dans la boucle."""
+        service = TaskService()
+        tasks = AsyncTaskService(service, executor)
+        threads = []
+        for name in ("create", "get_json", "toggle"):
+            spy(service, name, threads)
+
+        async def scenario():
+            task = await tasks.create(TaskCreate(title="Acheter du lait"))
+            await tasks.get_json(task.id)
+            await tasks.toggle(task.id)
+            return threading.current_thread().name
+
+        assert threads == [asyncio.run(scenario())] * 3
+
+    def test_stockage_bloquant_dans_le_pool(self, executor, tmp_path):
+        """Test que les appels sur SQLite passent par le pool dédié."""
+        service = TaskService(SQLiteTaskStore(str(tmp_path / "tasks.db")))
+        tasks = AsyncTaskService(service, executor)
+        threads = []
+        spy(service, "create", threads)
+
+        async def scenario():
+            task = await tasks.create(TaskCreate(title="Acheter du lait"))
+            await tasks.update(task.id, TaskUpdate(done=True))
+            return await tasks.count(done=True), await tasks.version()
+
+        assert asyncio.run(scenario()) == (1, service.version)
+        assert tasks.blocking and threads[0].startswith("test-store")
+
+    def test_operations_en_o_n_dans_le_pool(self, executor):
+        """Test que la liste complète et les opérations en masse quittent la boucle."""
+        service = TaskService()
+        tasks = AsyncTaskService(service, executor)
+        threads = []
+        for name in ("create_many", "get_all_json", "search", "delete_many"):
+            spy(service, name, threads)
+
+        async def scenario():
+            await tasks.create_many([TaskCreate(title=f"Tâche {i}") for i in range(3)])
+            body, count, _ = await tasks.get_all_json()
+            assert len(await tasks.search("tac", None, 10)) == 3
+            await tasks.delete_many(done=False)
+            return count
+
+        assert asyncio.run(scenario()) == 3
+        assert len(threads) == 4 and all(name.startswith("test-store") for name in threads)
+
+    def test_index_de_tri_construit_dans_le_pool(self, executor):
+        """Test que seul le premier tri (construction de l'index) quitte la boucle."""
+        service = TaskService()
+        tasks = AsyncTaskService(service, executor)
+        service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(3)])
+        threads = []
+        spy(service, "list_sorted_json", threads)
+
+        async def scenario():
+            for _ in range(2):
+                await tasks.list_sorted_json("title", limit=2)
+            await tasks.toggle(1)
+            await tasks.list_sorted_json("title", limit=2)
+            return threading.current_thread().name
+
+        loop_thread = asyncio.run(scenario())
+        assert threads[0].startswith("test-store") and threads[1:] == [loop_thread] * 2
+
+    def test_boucle_libre_pendant_une_operation_en_masse(self, executor):
+        """Test que la boucle n'attend pas le verrou tenu par une opération en masse."""
+        service = TaskService()
+        tasks = AsyncTaskService(service, executor)
+        service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(50)])
+        original = service.store.update
+        started = threading.Event()
+
+        def slow_update(*args):
+            # Opération en masse longue, sous le verrou d'écriture
+            started.set()
+            threading.Event().wait(0.5)
+            return original(*args)
+
+        service.store.update = slow_update
+
+        async def scenario():
+            bulk = asyncio.ensure_future(tasks.update_many(TaskUpdate(done=True), done=False))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            gaps = []
+
+            async def ticker():
+                while not bulk.done():
+                    start = loop.time()
+                    await asyncio.sleep(0.01)
+                    gaps.append(loop.time() - start)
+
+            loop = asyncio.get_running_loop()
+            ticking = asyncio.ensure_future(ticker())
+            await asyncio.sleep(0)
+            body, _, _, _ = await tasks.list_page_json(None, None, 20)
+            await bulk
+            await ticking
+            return body, max(gaps)
+
+        body, max_gap = asyncio.run(scenario())
+        # La page est lue dans le pool, après l'opération en masse
+        assert body.count(b'"done":true') == 20
+        assert max_gap < 0.2
+
+    def test_exceptions_propagees(self, executor, tmp_path):
+        """Test qu'une erreur du service remonte telle quelle, pool ou non."""
+        for store in (MemoryTaskStore(), SQLiteTaskStore(str(tmp_path / "tasks.db"))):
+            tasks = AsyncTaskService(TaskService(store), executor)
+            with pytest.raises(TaskNotFoundError):
+                asyncio.run(tasks.toggle(42))
+
+    def test_journal_selon_le_mode(self, tmp_path):
+        """Test que seul le journal qui attend le fsync est bloquant."""
+        group = JournaledTaskStore(str(tmp_path / "group"))
+        background = JournaledTaskStore(str(tmp_path / "async"), sync_mode=SYNC_ASYNC)
+        try:
+            assert group.blocking and not background.blocking
+            assert not MemoryTaskStore.blocking and SQLiteTaskStore.blocking
+        finally:
+            group.close()
+            background.close()
+
+
+class TestRoutes:
+    """Tests des routes async sur un stockage bloquant."""
+
+    def test_crud_sqlite(self, monkeypatch, tmp_path):
+        """Test un cycle complet via l'API, appels exécutés dans le pool."""
+        import main
+
+        service = TaskService(SQLiteTaskStore(str(tmp_path / "tasks.db")))
+        monkeypatch.setattr(main, "task_service", service)
+        client = TestClient(main.app)
+
+        created = client.post("/tasks", json={"title": "Appeler le plombier"}).json()
+        assert client.patch(f"/tasks/{created['id']}/toggle").json()["done"] is True
+        assert client.get(f"/tasks/{created['id']}").headers["etag"] == f'"task-1-{service.task_version(1)}"'
+        assert client.get("/stats").json()["terminees"] == 1
+        assert client.delete(f"/tasks/{created['id']}").status_code == 204
+        assert client.get(f"/tasks/{created['id']}").status_code == 404
+        assert main._tasks().service is service
@@ -0,0 +1,126 @@
+"""
+Tests du journal des changements et de GET /tasks/changes.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from changes import ChangeLog
+from main import TaskService
+from models import TaskCreate, TaskUpdate
+from storage import SQLiteTaskStore
+
+
+class TestChangeLog:
+    """Tests du journal borné."""
+
+    def test_une_entree_par_tache(self):
+        """Test que seul le dernier changement d'une tâche compte."""
+        log = ChangeLog()
+        log.record(0, 1, [1, 2])
+        log.record(1, 2, [1])
+        log.record(2, 3, [2], deleted=True)
+        assert len(log) == 2
+        assert log.since(0, current=3) == ([1], [2])
+        assert log.since(2, current=3) == ([], [2])
+        assert log.since(3, current=3) == ([], [])
+
+    def test_eviction(self):
+        """Test que l'éviction remonte le plancher et impose un resync."""
+        log = ChangeLog(version=10, max_entries=2)
+        assert log.since(9, current=10) is None
+        log.record(10, 11, [1])
+        log.record(11, 12, [2], deleted=True)
+        log.record(12, 13, [3])
+        assert log.floor == 11
+        assert log.since(10, current=13) is None
+        assert log.since(11, current=13) == ([3], [2])
+        # Version venue d'un autre état du stockage
+        assert log.since(14, current=13) is None
+
+    def test_ecritures_hors_journal(self):
+        """Test qu'une mutation non vue (autre processus) remonte le plancher."""
+        log = ChangeLog()
+        log.record(0, 1, [1])
+        log.record(3, 4, [2])
+        assert log.since(1, current=4) is None
+        assert log.since(3, current=4) == ([2], [])
+        assert log.since(4, current=6) is None
+        assert log.since(6, current=6) == ([], [])
+
+
+class TestService:
+    """Tests de TaskService.changes_since()."""
+
+    def test_creations_modifications_suppressions(self):
+        """Test le contenu des changements depuis une version."""
+        service = TaskService(check_invariants=True)
+        service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(4)])
+        since = service.version
+        service.update(1, TaskUpdate(title="Modifiée"))
+        service.toggle(2)
+        service.delete_many(ids=[3, 42])
+        service.create(TaskCreate(title="Nouvelle"))
+
+        version, (tasks, deleted) = service.changes_since(since)
+        assert version == service.version
+        assert [(task.id, task.title, task.done) for task in tasks] == [
+            (1, "Modifiée", False), (2, "Tâche 1", True), (5, "Nouvelle", False)
+        ]
+        assert deleted == [3]
+        assert service.changes_since(version) == (version, ([], []))
+
+    def test_sans_changement(self):
+        """Test qu'une mutation sans effet n'apparaît pas."""
+        service = TaskService()
+        service.create(TaskCreate(title="Tâche"))
+        since = service.version
+        service.update(1, TaskUpdate())
+        assert service.changes_since(since) == (since, ([], []))
+
+    def test_base_sqlite_partagee(self, tmp_path):
+        """Test le resync quand un autre processus a écrit dans la base."""
+        path = str(tmp_path / "tasks.db")
+        first, second = TaskService(SQLiteTaskStore(path)), TaskService(SQLiteTaskStore(path))
+        first.create(TaskCreate(title="A"))
+        since = first.version
+        second.create(TaskCreate(title="B"))
+        assert first.changes_since(since)[1] is None
+        first.create(TaskCreate(title="C"))
+        assert first.changes_since(since)[1] is None
+        version, (tasks, _) = first.changes_since(first.version - 1)
+        assert [task.title for task in tasks] == ["C"]
+
+
+class TestAPI:
+    """Tests de l'endpoint GET /tasks/changes."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        """Client de test branché sur un service de tâches vierge."""
+        import main
+
+        monkeypatch.setattr(main, "task_service", TaskService())
+        return TestClient(main.app)
+
+    def test_synchronisation(self, client):
+        """Test une synchronisation différentielle puis un resync."""
+        client.post("/tasks", json={"title": "Première"})
+        first = client.get("/tasks/changes?since=0").json()
+        assert first["resync"] is False
+        assert [task["title"] for task in first["tasks"]] == ["Première"]
+
+        client.patch("/tasks/1/toggle")
+        client.delete("/tasks/1")
+        response = client.get(f"/tasks/changes?since={first['version']}").json()
+        assert response["tasks"] == [] and response["deleted"] == [1]
+
+        assert client.get("/tasks/changes?since=999").json() == {
+            "version": response["version"], "resync": True, "tasks": [], "deleted": []
+        }
+        assert client.get("/tasks/changes").status_code == 422
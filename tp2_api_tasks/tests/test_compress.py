@@ -0,0 +1,139 @@
+"""
+Tests de la compression des réponses.
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compress import GZIP, CompressedBodyCache, CompressionMiddleware, choose_encoding
+from main import TaskService
+from models import TaskCreate
+
+
+BIG = json.dumps([{"id": i, "title": f"Préparer la réunion n°{i}"} for i in range(200)]).encode()
+
+
+@pytest.fixture
+def compressed():
+    """Application minimale derrière le middleware de compression."""
+    app = FastAPI()
+    middleware = CompressionMiddleware(app, minimum_size=1024)
+
+    @app.get("/big")
+    def big() -> Response:
+        return Response(BIG, media_type="application/json", headers={"ETag": '"big-1"'})
+
+    @app.get("/small")
+    def small() -> dict:
+        return {"total": 3}
+
+    @app.get("/png")
+    def png() -> Response:
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(iter([b"x" * 2000, b"y" * 2000]), media_type="text/plain")
+
+    return TestClient(middleware), middleware
+
+
+def raw_get(client, path, encoding=GZIP):
+    """GET sans décompression automatique: (réponse, corps brut)."""
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestChooseEncoding:
+    """Tests de la négociation Accept-Encoding."""
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("br, gzip", "br"),
+        ("gzip;q=0, *;q=0.5", "br"),
+        ("identity", None),
+        ("", None),
+        ("gzip;q=abc", None),
+    ])
+    def test_qualites(self, header, expected):
+        """Test la qualité, la préférence à égalité, le joker et le refus (q=0)."""
+        assert choose_encoding(header, ["br", "gzip"]) == expected
+
+
+class TestMiddleware:
+    """Tests du middleware."""
+
+    def test_gros_corps_compresse(self, compressed):
+        """Test qu'un gros corps JSON est compressé, avec Vary et ETag faible."""
+        client, _ = compressed
+        response, body = raw_get(client, "/big")
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == len(body) < len(BIG)
+        assert gzip.decompress(body) == BIG
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"big-1"'
+
+    @pytest.mark.parametrize("path", ["/small", "/png", "/stream"])
+    def test_reponses_non_compressees(self, compressed, path):
+        """Test que les petites réponses, les types binaires et les flux passent tels quels."""
+        client, _ = compressed
+        response, body = raw_get(client, path)
+        assert "content-encoding" not in response.headers
+        assert body == client.get(path, headers={"Accept-Encoding": "identity"}).content
+
+    def test_sans_accept_encoding(self, compressed):
+        """Test qu'un client sans gzip reçoit le corps brut."""
+        client, _ = compressed
+        response, body = raw_get(client, "/big", encoding="identity")
+        assert "content-encoding" not in response.headers and body == BIG
+
+    def test_cache_des_corps_compresses(self, compressed):
+        """Test qu'une réponse inchangée (même ETag) n'est compressée qu'une fois."""
+        client, middleware = compressed
+        first = raw_get(client, "/big")[1]
+        second = raw_get(client, "/big")[1]
+        assert first == second
+        assert (middleware.cache.misses, middleware.cache.hits) == (1, 1)
+        raw_get(client, "/big?page=2")
+        assert len(middleware.cache) == 2
+
+    def test_cache_borne(self):
+        """Test l'éviction LRU au-delà de la taille maximale."""
+        cache = CompressedBodyCache(max_bytes=10)
+        cache.put(("/a", b"", '"1"', GZIP), b"12345")
+        cache.put(("/b", b"", '"1"', GZIP), b"12345")
+        cache.get(("/a", b"", '"1"', GZIP))
+        cache.put(("/c", b"", '"1"', GZIP), b"123")
+        assert cache.get(("/b", b"", '"1"', GZIP)) is None
+        assert len(cache) == 2
+
+
+class TestAPI:
+    """Tests de la compression sur l'application."""
+
+    def test_liste_compressee_et_conditionnelle(self, monkeypatch):
+        """Test GET /tasks compressé puis 304 avec l'ETag faible."""
+        import main
+
+        service = TaskService()
+        service.create_many([TaskCreate(title=f"Acheter du pain n°{i}") for i in range(100)])
+        monkeypatch.setattr(main, "task_service", service)
+        client = TestClient(main.app)
+
+        response = client.get("/tasks")
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 100
+        etag = response.headers["etag"]
+        assert etag == f'W/"tasks-{service.version}"'
+        assert client.get("/tasks", headers={"If-None-Match": etag}).status_code == 304
+        assert "content-encoding" not in client.get("/stats").headers
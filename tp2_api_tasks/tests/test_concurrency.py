@@ -0,0 +1,151 @@
+"""
+Tests de concurrence du service de tâches et de ses primitives.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from concurrency import IdAllocator, ReadWriteLock
+from main import TaskCreate, TaskNotFoundError, TaskService
+
+
+THREADS = 8
+OPERATIONS = 300
+
+
+def run_threads(target, count=THREADS):
+    """Lance `count` threads sur `target(index)` et attend leur fin."""
+    barrier = threading.Barrier(count)
+    errors = []
+    
+    def worker(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as e:  # pragma: no cover - remonté par l'assert
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+class TestPrimitives:
+    """Tests du verrou lecteurs/rédacteur et du générateur d'IDs."""
+    
+    def test_ids_uniques(self):
+        """Test qu'aucun ID n'est attribué deux fois sous concurrence."""
+        allocator = IdAllocator()
+        allocated = [[] for _ in range(THREADS)]
+        
+        def allocate(index):
+            for _ in range(OPERATIONS):
+                allocated[index].append(allocator.allocate())
+        
+        run_threads(allocate)
+        ids = [task_id for chunk in allocated for task_id in chunk]
+        assert sorted(ids) == list(range(1, THREADS * OPERATIONS + 1))
+    
+    def test_avance_des_ids(self):
+        """Test qu'avancer le générateur ne fait jamais reculer les IDs."""
+        ids = IdAllocator()
+        ids.advance(10)
+        assert ids.allocate() == 10
+        ids.advance(5)
+        assert ids.allocate() == 11
+    
+    def test_lecteurs_simultanes(self):
+        """Test que plusieurs lecteurs détiennent le verrou en même temps."""
+        lock = ReadWriteLock()
+        barrier = threading.Barrier(THREADS, timeout=5)
+        
+        def read(index):
+            with lock.read:
+                barrier.wait()
+        
+        run_threads(read)
+    
+    def test_ecriture_exclusive_et_reentrante(self):
+        """Test l'exclusion mutuelle des rédacteurs et la réentrance."""
+        lock = ReadWriteLock()
+        counter = {"value": 0}
+        
+        def write(index):
+            for _ in range(OPERATIONS):
+                with lock.write:
+                    with lock.read:
+                        value = counter["value"]
+                    counter["value"] = value + 1
+        
+        run_threads(write)
+        assert counter["value"] == THREADS * OPERATIONS
+    
+    def test_ecriture_sans_attente(self):
+        """Test que try_acquire_write échoue sans attendre si le verrou est pris."""
+        lock = ReadWriteLock()
+        held = threading.Event()
+        release = threading.Event()
+        
+        def read():
+            with lock.read:
+                held.set()
+                release.wait(5)
+        
+        reader = threading.Thread(target=read)
+        reader.start()
+        held.wait(5)
+        assert not lock.try_acquire_write()
+        release.set()
+        reader.join()
+        
+        assert lock.try_acquire_write()
+        assert lock.try_acquire_write()
+        with lock.read:
+            pass
+        lock.release_write()
+        lock.release_write()
+        assert lock.try_acquire_write()
+        lock.release_write()
+
+
+class TestTaskServiceStress:
+    """Test de charge multi-thread du service."""
+    
+    def test_invariants_sous_charge(self):
+        """Test créations, basculements, suppressions et lectures concurrents."""
+        service = TaskService()
+        created = [[] for _ in range(THREADS)]
+        
+        def mixed(index):
+            for i in range(OPERATIONS):
+                task = service.create(TaskCreate(title=f"Tâche {index}-{i}"))
+                created[index].append(task.id)
+                if i % 3 == 0:
+                    service.toggle(task.id)
+                if i % 5 == 0:
+                    service.delete(task.id)
+                if i % 7 == 0:
+                    service.create_many([TaskCreate(title="Lot")] * 3)
+                service.list_page(done=True, limit=20)
+                service.search("tache", limit=5)
+                try:
+                    service.get_by_id(task.id)
+                except TaskNotFoundError:
+                    assert i % 5 == 0
+        
+        run_threads(mixed)
+        service.check_consistency()
+        
+        ids = [task_id for chunk in created for task_id in chunk]
+        assert len(ids) == len(set(ids))
+        per_thread_deleted = len(range(0, OPERATIONS, 5))
+        per_thread_batches = len(range(0, OPERATIONS, 7)) * 3
+        expected = THREADS * (OPERATIONS - per_thread_deleted + per_thread_batches)
+        assert service.count() == expected
+        assert len(service.get_all()) == expected
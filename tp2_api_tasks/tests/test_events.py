@@ -0,0 +1,193 @@
+"""
+Tests du flux des changements de tâches (Server-Sent Events).
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from events import RETRY_MS, EventBroadcaster, deleted_event, event_stream
+from main import TaskService
+from models import TaskCreate, TaskUpdate
+
+
+def parse(message):
+    """Décode un message SSE en (id, event, data)."""
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+async def take(stream, count, timeout=2.0):
+    """Lit `count` messages du flux, sans le message initial `retry`."""
+    assert await stream.__anext__() == b"retry: %d\n\n" % RETRY_MS
+    return [await asyncio.wait_for(stream.__anext__(), timeout) for _ in range(count)]
+
+
+def replayed(service, last_event_id, count):
+    """Messages reçus par un client qui se reconnecte avec `last_event_id`."""
+    async def scenario():
+        stream = event_stream(service.events, last_event_id)
+        try:
+            return [parse(message) for message in await take(stream, count)]
+        finally:
+            await stream.aclose()
+
+    return asyncio.run(scenario())
+
+
+class TestService:
+    """Tests des événements publiés par les mutations du service."""
+
+    def test_evenements_des_mutations(self):
+        """Test les types, IDs et contenus des événements."""
+        service = TaskService(check_invariants=True)
+        task = service.create(TaskCreate(title="Initiale"))
+        service.create_many([TaskCreate(title="A"), TaskCreate(title="B")])
+        service.update(task.id, TaskUpdate(title="Modifiée"))
+        service.toggle_many(ids=[1, 2])
+        service.delete(3)
+
+        events = replayed(service, 0, 5)
+        assert [kind for _, kind, _ in events] == ["created", "created", "updated", "toggled", "deleted"]
+        versions = [version for version, _, _ in events]
+        assert versions == sorted(versions) and versions[-1] == service.version
+        assert all(data["version"] == version for version, _, data in events)
+        assert [item["id"] for item in events[1][2]["tasks"]] == [2, 3]
+        assert events[2][2]["tasks"] == [{"id": 1, "title": "Modifiée", "done": False, "description": None}]
+        assert [item["done"] for item in events[3][2]["tasks"]] == [True, True]
+        assert events[4][2]["ids"] == [3]
+
+    def test_mutation_sans_effet(self):
+        """Test qu'une mutation qui ne change rien ne publie rien."""
+        service = TaskService()
+        task = service.create(TaskCreate(title="Tâche"))
+        service.update(task.id, TaskUpdate())
+        service.toggle_many(ids=[42])
+        assert service.events.version == service.version == 1
+
+    def test_reprise(self):
+        """Test que seuls les événements postérieurs au Last-Event-ID sont rejoués."""
+        service = TaskService()
+        for i in range(3):
+            service.create(TaskCreate(title=f"Tâche {i}"))
+        assert [version for version, _, _ in replayed(service, 1, 2)] == [2, 3]
+
+
+class TestBroadcaster:
+    """Tests de l'historique et de la contre-pression."""
+
+    def test_resync_hors_historique(self):
+        """Test resync pour un ID évincé de l'historique ou inconnu."""
+        broadcaster = EventBroadcaster(version=10, history_events=2)
+        for version in (11, 12, 13):
+            broadcaster.publish(deleted_event(version, [version]))
+
+        async def first(last_event_id):
+            stream = event_stream(broadcaster, last_event_id)
+            try:
+                return parse((await take(stream, 1))[0])
+            finally:
+                await stream.aclose()
+
+        assert asyncio.run(first(11))[:2] == (12, "deleted")
+        assert asyncio.run(first(10)) == (13, "resync", {"version": 13})
+        # ID d'un autre état du stockage (ex: redémarrage en mémoire)
+        assert asyncio.run(first(99))[1] == "resync"
+
+    def test_publication_depuis_un_thread(self):
+        """Test qu'un événement publié hors de la boucle réveille l'abonné."""
+        broadcaster = EventBroadcaster()
+
+        async def scenario():
+            stream = event_stream(broadcaster, heartbeat=0.05)
+            try:
+                assert await stream.__anext__() == b"retry: %d\n\n" % RETRY_MS
+                assert await stream.__anext__() == b": ping\n\n"
+                publisher = threading.Thread(target=broadcaster.publish, args=(deleted_event(1, [5]),))
+                publisher.start()
+                publisher.join()
+                return parse(await asyncio.wait_for(stream.__anext__(), 2.0))
+            finally:
+                await stream.aclose()
+
+        assert asyncio.run(scenario()) == (1, "deleted", {"version": 1, "ids": [5]})
+        assert broadcaster.subscribers == 0
+
+    def test_abonne_lent_deconnecte(self):
+        """Test qu'un abonné au tampon plein reçoit ce qu'il a, puis est déconnecté."""
+        broadcaster = EventBroadcaster(subscriber_events=2)
+
+        async def scenario():
+            stream = event_stream(broadcaster)
+            assert await stream.__anext__() == b"retry: %d\n\n" % RETRY_MS
+            for version in range(1, 6):
+                broadcaster.publish(deleted_event(version, [version]))
+            await asyncio.sleep(0)
+            return [parse(message)[0] async for message in stream]
+
+        assert asyncio.run(scenario()) == [1, 2]
+        assert broadcaster.subscribers == 0
+
+
+class TestAPI:
+    """Tests de l'endpoint GET /tasks/events."""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Service de tâches vierge branché sur l'application."""
+        import main
+
+        service = TaskService()
+        monkeypatch.setattr(main, "task_service", service)
+        return service
+
+    def test_flux_http(self, service):
+        """Test les en-têtes et la reprise par Last-Event-ID via l'ASGI."""
+        import main
+
+        service.create(TaskCreate(title="Avant"))
+        service.create(TaskCreate(title="Après"))
+
+        async def scenario():
+            received = []
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                received.append(message)
+                if b"event: created" in message.get("body", b""):
+                    disconnected.set()
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": "/tasks/events",
+                "raw_path": b"/tasks/events", "query_string": b"", "root_path": "",
+                "headers": [(b"last-event-id", b"1")], "client": ("test", 1), "server": ("test", 80),
+            }
+            await asyncio.wait_for(main.app(scope, receive, send), 5.0)
+            return received
+
+        messages = asyncio.run(scenario())
+        headers = dict(messages[0]["headers"])
+        assert headers[b"content-type"].startswith(b"text/event-stream")
+        assert headers[b"cache-control"] == b"no-cache"
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        assert b"id: 2\nevent: created\n" in body and b"id: 1\n" not in body
+        assert service.events.subscribers == 0
+
+    def test_last_event_id_invalide(self, service):
+        """Test le refus d'un Last-Event-ID non numérique."""
+        import main
+
+        response = TestClient(main.app).get("/tasks/events", headers={"Last-Event-ID": "abc"})
+        assert response.status_code == 400
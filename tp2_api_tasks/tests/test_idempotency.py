@@ -0,0 +1,265 @@
+"""
+Tests des clés d'idempotence de POST /tasks.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from idempotency import IdempotencyCache, IdempotencyConflict
+from main import TaskService
+from models import TaskValidationError
+
+
+class FakeClock:
+    """Horloge avancée à la main."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestIdempotencyCache:
+    """Tests du cache seul."""
+
+    def test_rejeu(self):
+        """Test qu'une clé terminée renvoie la réponse d'origine."""
+        cache = IdempotencyCache()
+        owner, entry = cache.begin("a", "corps")
+        assert owner and not entry.result.done()
+        cache.complete(entry, b'{"id":1}')
+        owner, entry = cache.begin("a", "corps")
+        assert not owner and entry.result.result() == b'{"id":1}'
+
+    def test_contenu_different(self):
+        """Test qu'une clé réutilisée avec un autre contenu est refusée."""
+        cache = IdempotencyCache()
+        cache.begin("a", "corps")
+        with pytest.raises(IdempotencyConflict):
+            cache.begin("a", "autre corps")
+
+    def test_echec_oublie(self):
+        """Test qu'un échec est transmis aux requêtes en attente puis oublié."""
+        cache = IdempotencyCache()
+        _, entry = cache.begin("a", "corps")
+        _, waiting = cache.begin("a", "corps")
+        cache.fail(entry, ValueError("refusé"))
+        with pytest.raises(ValueError):
+            waiting.result.result()
+        assert cache.begin("a", "corps")[0] is True
+
+    def test_borne_lru_et_ttl(self):
+        """Test l'éviction de la clé la moins récente et l'expiration."""
+        clock = FakeClock()
+        cache = IdempotencyCache(max_entries=2, ttl=60.0, clock=clock)
+        for key in ("a", "b"):
+            cache.complete(cache.begin(key, key)[1], key.encode())
+        cache.begin("a", "a")
+        cache.complete(cache.begin("c", "c")[1], b"c")
+        assert len(cache) == 2
+        owner, entry = cache.begin("b", "b")
+        assert owner
+        cache.complete(entry, b"b")
+
+        clock.now = 61.0
+        assert cache.begin("a", "a")[0] is True
+        assert len(cache) == 1
+
+    def test_requetes_simultanees(self):
+        """Test qu'une seule requête parmi 8 threads exécute la création."""
+        cache = IdempotencyCache()
+        barrier = threading.Barrier(8)
+        owners = []
+        results = []
+
+        def request():
+            barrier.wait()
+            owner, entry = cache.begin("a", "corps")
+            if owner:
+                owners.append(threading.current_thread().name)
+                cache.complete(entry, b"tache")
+            results.append(entry.result.result(timeout=5))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(owners) == 1 and results == [b"tache"] * 8
+
+    def test_requete_en_cours_non_evincee(self):
+        """Test qu'une requête en cours survit à la borne LRU et au TTL."""
+        clock = FakeClock()
+        cache = IdempotencyCache(max_entries=2, ttl=60.0, clock=clock)
+        _, first = cache.begin("a", "a")
+        cache.complete(cache.begin("b", "b")[1], b"b")
+        cache.complete(cache.begin("c", "c")[1], b"c")
+        # "b", terminée, est évincée à la place de "a", en cours
+        owner, retry = cache.begin("a", "a")
+        assert not owner and retry is first
+        assert cache.begin("b", "b")[0] is True
+
+        clock.now = 61.0
+        cache.begin("d", "d")
+        assert cache.begin("a", "a") == (False, first)
+        cache.complete(first, b"a")
+        assert retry.result.result(timeout=0) == b"a"
+
+    def test_attente_apres_eviction(self):
+        """Test qu'une requête en attente est réveillée malgré d'autres clés."""
+        cache = IdempotencyCache(max_entries=1)
+        _, first = cache.begin("a", "a")
+        _, waiting = cache.begin("a", "a")
+        for key in ("b", "c"):
+            cache.complete(cache.begin(key, key)[1], key.encode())
+        cache.complete(first, b"a")
+        assert waiting.result.result(timeout=0) == b"a"
+
+    def test_echec_apres_reutilisation(self):
+        """Test qu'un échec tardif n'oublie pas la requête qui a repris la clé."""
+        clock = FakeClock()
+        cache = IdempotencyCache(ttl=60.0, clock=clock)
+        _, first = cache.begin("a", "a")
+        cache.complete(first, b"a")
+        clock.now = 61.0
+        owner, second = cache.begin("a", "a")
+        assert owner
+        cache.fail(first, ValueError("trop tard"))
+        assert cache.begin("a", "a") == (False, second)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Client de l'API sur un service et un cache neufs."""
+    import main
+
+    service = TaskService()
+    monkeypatch.setattr(main, "task_service", service)
+    monkeypatch.setattr(main, "idempotency_cache", IdempotencyCache())
+    return TestClient(main.app), service
+
+
+class TestRoute:
+    """Tests de l'en-tête Idempotency-Key sur POST /tasks."""
+
+    def test_rejeu_sans_doublon(self, api):
+        """Test qu'un POST renvoyé avec la même clé ne crée pas de doublon."""
+        client, service = api
+        headers = {"Idempotency-Key": "commande-42"}
+        first = client.post("/tasks", json={"title": "Acheter du lait"}, headers=headers)
+        second = client.post("/tasks", json={"title": "Acheter du lait"}, headers=headers)
+        assert first.status_code == second.status_code == 201
+        assert first.json() == second.json()
+        assert "idempotent-replayed" not in first.headers
+        assert second.headers["idempotent-replayed"] == "true"
+        assert service.count() == 1
+
+        other = client.post("/tasks", json={"title": "Acheter du lait"}, headers={"Idempotency-Key": "commande-43"})
+        assert other.json()["id"] != first.json()["id"]
+        assert client.post("/tasks", json={"title": "Acheter du lait"}).status_code == 201
+        assert service.count() == 3
+
+    def test_contenu_different(self, api):
+        """Test qu'une clé réutilisée avec un autre corps renvoie 422."""
+        client, service = api
+        headers = {"Idempotency-Key": "commande-42"}
+        client.post("/tasks", json={"title": "Acheter du lait"}, headers=headers)
+        response = client.post("/tasks", json={"title": "Acheter du pain"}, headers=headers)
+        assert response.status_code == 422
+        assert service.count() == 1
+
+    def test_echec_reessayable(self, api, monkeypatch):
+        """Test qu'une création en échec n'est pas gardée pour la clé."""
+        client, service = api
+        original = service.create
+
+        def refuse(task_create):
+            raise TaskValidationError("stockage indisponible")
+
+        monkeypatch.setattr(service, "create", refuse)
+        headers = {"Idempotency-Key": "commande-42"}
+        assert client.post("/tasks", json={"title": "Acheter du lait"}, headers=headers).status_code == 400
+        monkeypatch.setattr(service, "create", original)
+        response = client.post("/tasks", json={"title": "Acheter du lait"}, headers=headers)
+        assert response.status_code == 201 and "idempotent-replayed" not in response.headers
+
+    def test_requetes_simultanees(self, api, monkeypatch):
+        """Test que deux requêtes simultanées avec la même clé créent une seule tâche."""
+        import main
+
+        client, service = api
+        original = service.create
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(task_create):
+            started.set()
+            release.wait(5)
+            return original(task_create)
+
+        monkeypatch.setattr(service, "create", slow)
+        monkeypatch.setattr(main._tasks(), "_blocking", True)
+        headers = {"Idempotency-Key": "commande-42"}
+        responses = []
+
+        def post():
+            responses.append(client.post("/tasks", json={"title": "Acheter du lait"}, headers=headers))
+
+        first = threading.Thread(target=post)
+        first.start()
+        assert started.wait(5)
+        second = threading.Thread(target=post)
+        second.start()
+        second.join(0.2)
+        release.set()
+        first.join()
+        second.join()
+        assert [r.status_code for r in responses] == [201, 201]
+        assert responses[0].json() == responses[1].json()
+        assert service.count() == 1
+
+    def test_renvoi_pendant_eviction(self, api, monkeypatch):
+        """Test qu'un renvoi n'est pas recréé quand d'autres clés remplissent le cache."""
+        import main
+
+        client, service = api
+        monkeypatch.setattr(main, "idempotency_cache", IdempotencyCache(max_entries=1))
+        original = service.create
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(task_create):
+            if task_create.title == "lent":
+                started.set()
+                release.wait(5)
+            return original(task_create)
+
+        monkeypatch.setattr(service, "create", slow)
+        monkeypatch.setattr(main._tasks(), "_blocking", True)
+        headers = {"Idempotency-Key": "commande-42"}
+        responses = []
+
+        def post():
+            responses.append(client.post("/tasks", json={"title": "lent"}, headers=headers))
+
+        first = threading.Thread(target=post)
+        first.start()
+        assert started.wait(5)
+        for key in ("autre-1", "autre-2"):
+            client.post("/tasks", json={"title": key}, headers={"Idempotency-Key": key})
+        retry = threading.Thread(target=post)
+        retry.start()
+        retry.join(0.2)
+        release.set()
+        first.join(5)
+        retry.join(5)
+        assert [r.status_code for r in responses] == [201, 201]
+        assert responses[0].json() == responses[1].json()
+        assert service.count() == 3
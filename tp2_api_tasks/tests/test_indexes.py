@@ -0,0 +1,76 @@
+"""
+Tests unitaires des index ordonnés utilisés par le service de tâches.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from indexes import SortedIndex
+
+
+class TestSortedIndex:
+    """Tests de la liste triée par blocs."""
+    
+    def test_ajout_et_ordre(self):
+        """Test que les clés sont itérées dans l'ordre, quel que soit l'ajout."""
+        index = SortedIndex(load=4)
+        keys = random.sample(range(1000), 200)
+        for key in keys:
+            index.add(key)
+        
+        assert list(index) == sorted(keys)
+        assert list(reversed(index)) == sorted(keys, reverse=True)
+        assert len(index) == 200
+    
+    def test_suppression(self):
+        """Test la suppression de clés, présentes ou non."""
+        index = SortedIndex(load=4)
+        for key in range(50):
+            index.add(key)
+        
+        for key in range(0, 50, 3):
+            assert index.discard(key) is True
+        assert index.discard(0) is False
+        assert index.discard(999) is False
+        
+        expected = [key for key in range(50) if key % 3]
+        assert list(index) == expected
+        assert 3 not in index
+        assert 4 in index
+    
+    def test_iter_after_et_before(self):
+        """Test le positionnement sur une clé exclusive."""
+        index = SortedIndex(load=4)
+        for key in range(0, 100, 2):
+            index.add(key)
+        
+        assert list(index.iter_after(10))[:3] == [12, 14, 16]
+        assert list(index.iter_after(11))[:2] == [12, 14]
+        assert list(index.iter_after(98)) == []
+        assert list(index.iter_before(10)) == [8, 6, 4, 2, 0]
+        assert list(index.iter_before(1000))[:2] == [98, 96]
+        assert list(index.iter_before(0)) == []
+    
+    def test_cles_composees(self):
+        """Test l'utilisation de tuples comme clés."""
+        index = SortedIndex()
+        index.add(("b", 2))
+        index.add(("a", 3))
+        index.add(("a", 1))
+        
+        assert list(index) == [("a", 1), ("a", 3), ("b", 2)]
+        assert list(index.iter_after(("a", 1))) == [("a", 3), ("b", 2)]
+    
+    def test_construction_depuis_cles_triees(self):
+        """Test la construction en bloc, puis les ajouts et suppressions."""
+        index = SortedIndex.from_sorted(range(0, 100, 2), load=4)
+        index.add(51)
+        index.discard(0)
+        
+        assert len(index) == 50
+        assert 51 in index and 0 not in index
+        assert list(index.iter_after(48))[:3] == [50, 51, 52]
+        assert len(SortedIndex.from_sorted([])) == 0
@@ -0,0 +1,161 @@
+"""
+Tests du stockage journalisé: rejeu, instantanés et fsync groupé.
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from journal import SYNC_ASYNC, JournaledTaskStore
+from main import TaskService
+from models import TaskConsistencyError, TaskCreate, TaskUpdate
+
+
+def open_service(directory, **options):
+    """Ouvre un service sur un stockage journalisé."""
+    return TaskService(JournaledTaskStore(str(directory), **options), check_invariants=True)
+
+
+def files(directory, prefix):
+    """Noms triés des fichiers du répertoire commençant par `prefix`."""
+    return sorted(name for name in os.listdir(directory) if name.startswith(prefix))
+
+
+class TestReplay:
+    """Tests de la reprise depuis le journal."""
+
+    def test_reprise_apres_arret_brutal(self, tmp_path):
+        """Test que les écritures confirmées survivent sans fermeture du stockage."""
+        service = open_service(tmp_path)
+        service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(5)])
+        service.update(1, TaskUpdate(title="Préparer la réunion"))
+        service.toggle(2)
+        service.delete(3)
+        service.delete_many(ids=[4, 99])
+        version = service.version
+
+        # Pas de close(): seul ce qui a été synchronisé compte
+        reopened = open_service(tmp_path)
+        assert [task.id for task in reopened.get_all()] == [1, 2, 5]
+        assert reopened.get_by_id(2).done is True
+        assert reopened.version == version
+        assert reopened.task_version(1) == service.task_version(1)
+        assert [task.id for task in reopened.search("reunion")] == [1]
+        assert reopened.create(TaskCreate(title="Suivante")).id == 6
+        reopened.store.close()
+        service.store.close()
+
+    def test_enregistrement_tronque_ignore(self, tmp_path):
+        """Test qu'une fin de journal incomplète est ignorée puis retirée."""
+        service = open_service(tmp_path)
+        service.create(TaskCreate(title="Durable"))
+        service.store.close()
+        segment = tmp_path / files(tmp_path, "journal-")[-1]
+        with open(segment, "ab") as segment_file:
+            segment_file.write(b'[2,"t",[1')
+
+        reopened = open_service(tmp_path)
+        assert reopened.get_by_id(1).done is False
+        reopened.toggle(1)
+        reopened.store.close()
+
+        again = open_service(tmp_path)
+        assert again.get_by_id(1).done is True
+        again.store.close()
+
+    def test_segment_corrompu(self, tmp_path):
+        """Test qu'une corruption en milieu de journal est signalée."""
+        service = open_service(tmp_path)
+        service.create(TaskCreate(title="A"))
+        service.create(TaskCreate(title="B"))
+        service.store.close()
+        segment = tmp_path / files(tmp_path, "journal-")[0]
+        segment.write_bytes(b"pas du json\n" + segment.read_bytes())
+
+        with pytest.raises(TaskConsistencyError):
+            JournaledTaskStore(str(tmp_path))
+
+    def test_mode_inconnu(self, tmp_path):
+        """Test le rejet d'un mode de synchronisation inconnu."""
+        with pytest.raises(ValueError):
+            JournaledTaskStore(str(tmp_path), sync_mode="jamais")
+
+
+class TestSnapshots:
+    """Tests des instantanés et de la troncature du journal."""
+
+    def test_instantane_et_troncature(self, tmp_path):
+        """Test que l'instantané remplace les segments qu'il couvre."""
+        service = open_service(tmp_path, snapshot_every=4)
+        for i in range(10):
+            service.create(TaskCreate(title=f"Tâche {i}"))
+        service.toggle(3)
+        version = service.version
+        service.store.close()
+
+        snapshots = files(tmp_path, "snapshot-")
+        assert len(snapshots) == 1
+        snapshot_lsn = int(snapshots[0][len("snapshot-"):-len(".json")])
+        segments = [int(name[len("journal-"):-len(".log")]) for name in files(tmp_path, "journal-")]
+        assert all(first_lsn > snapshot_lsn for first_lsn in segments)
+
+        reopened = open_service(tmp_path)
+        assert reopened.count() == 10
+        assert reopened.count(done=True) == 1
+        assert reopened.version == version
+        assert reopened.create(TaskCreate(title="Suivante")).id == 11
+        reopened.store.close()
+
+    def test_instantane_explicite(self, tmp_path):
+        """Test un instantané sans journal à rejouer derrière lui."""
+        service = open_service(tmp_path)
+        service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(3)])
+        service.store.snapshot(wait=True)
+        service.store.close()
+
+        assert files(tmp_path, "snapshot-")
+        reopened = open_service(tmp_path)
+        assert [task.title for task in reopened.get_all()] == ["Tâche 0", "Tâche 1", "Tâche 2"]
+        reopened.store.close()
+
+
+class TestGroupCommit:
+    """Tests du fsync groupé."""
+
+    def test_ecritures_concurrentes(self, tmp_path):
+        """Test que des écritures concurrentes sont toutes durables et partagent des fsyncs."""
+        service = open_service(tmp_path, commit_delay=0.002)
+
+        def worker():
+            for i in range(20):
+                service.create(TaskCreate(title=f"Tâche {i}"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = service.store.stats()
+        assert stats["records"] == 160
+        assert stats["fsyncs"] < 160
+        assert stats["write_amplification"] == 1.0
+        reopened = open_service(tmp_path)
+        assert reopened.count() == 160
+        reopened.store.close()
+        service.store.close()
+
+    def test_mode_asynchrone(self, tmp_path):
+        """Test que le mode asynchrone écrit le journal à la fermeture au plus tard."""
+        service = open_service(tmp_path, sync_mode=SYNC_ASYNC)
+        service.create(TaskCreate(title="Asynchrone"))
+        service.store.close()
+
+        reopened = open_service(tmp_path)
+        assert reopened.get_by_id(1).title == "Asynchrone"
+        reopened.store.close()
@@ -0,0 +1,95 @@
+"""
+Tests de la configuration des logs (mode production, échantillonnage).
+"""
+
+import logging
+import queue
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from logging_config import (
+    PRODUCTION_MODE,
+    SamplingFilter,
+    _DeferredQueueHandler,
+    configure_logging,
+    parse_sampling,
+)
+
+
+def make_record(name, level=logging.INFO, msg="ID=%s", args=(1,)):
+    """Construit un enregistrement de log."""
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def root_logger():
+    """Restaure la configuration du logger racine après le test."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    flags = (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+    yield root
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing = flags
+
+
+class TestSampling:
+    """Tests de l'échantillonnage par logger."""
+
+    def test_un_message_sur_n(self):
+        """Test qu'un message sur N passe pour un logger échantillonné."""
+        sampling = SamplingFilter({"main.requests": 10})
+        kept = sum(sampling.filter(make_record("main.requests")) for _ in range(100))
+        assert kept == 10
+        assert all(sampling.filter(make_record("main")) for _ in range(5))
+
+    def test_avertissements_toujours_gardes(self):
+        """Test que WARNING et au-delà ne sont jamais échantillonnés."""
+        sampling = SamplingFilter({"main.requests": 1000})
+        sampling.filter(make_record("main.requests"))
+        assert all(
+            sampling.filter(make_record("main.requests", logging.WARNING)) for _ in range(5)
+        )
+
+    def test_lecture_de_la_configuration(self):
+        """Test la syntaxe logger=N et le rejet des entrées invalides."""
+        assert parse_sampling("main.requests=100, main=10,") == {"main.requests": 100, "main": 10}
+        assert parse_sampling("") == {}
+        with pytest.raises(ValueError):
+            parse_sampling("main.requests")
+
+
+class TestProductionMode:
+    """Tests du pipeline QueueHandler/QueueListener."""
+
+    def test_formatage_differe(self):
+        """Test que le message n'est pas formaté dans le thread appelant."""
+        log_queue = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(log_queue)
+        handler.handle(make_record("main", args=(42,)))
+
+        record = log_queue.get_nowait()
+        assert record.msg == "ID=%s"
+        assert record.args == (42,)
+
+    def test_ecriture_par_le_listener(self, root_logger, capsys):
+        """Test que les messages sont écrits par le thread du listener, échantillonnés."""
+        listener = configure_logging(PRODUCTION_MODE, sampling={"demo.requests": 2})
+        for i in range(4):
+            logging.getLogger("demo.requests").info("Requête %s", i)
+        logging.getLogger("demo").warning("Tâche non trouvée: ID=%s", 7)
+        listener.stop()
+
+        err = capsys.readouterr().err
+        assert "Requête 0" in err and "Requête 2" in err
+        assert "Requête 1" not in err
+        assert "demo - WARNING - Tâche non trouvée: ID=7" in err
+
+    def test_mode_inconnu(self):
+        """Test le rejet d'un mode inconnu."""
+        with pytest.raises(ValueError):
+            configure_logging("verbeux")
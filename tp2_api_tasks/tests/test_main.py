@@ -30,6 +30,15 @@ def task_service():
     return TaskService()
 
 
+@pytest.fixture
+def isolated_client(monkeypatch):
+    """Crée un client de test FastAPI branché sur un service de tâches vierge."""
+    import main
+    
+    monkeypatch.setattr(main, "task_service", TaskService(check_invariants=True))
+    return TestClient(app)
+
+
 # ============================================================================
 # Tests du Service de Tâches
 # ============================================================================
@@ -96,6 +105,43 @@ class TestTaskService:
             task_service.obtenir_tache(task.id)
 
 
+class TestTaskIndex:
+    """Tests de l'index des tâches par ID."""
+    
+    def test_get_all_conserve_ordre_creation(self, task_service):
+        """Test que get_all() renvoie les tâches dans l'ordre de création."""
+        from main import TaskCreate, TaskUpdate
+        
+        for i in range(5):
+            task_service.create(TaskCreate(title=f"Task {i}"))
+        task_service.delete(3)
+        task_service.update(1, TaskUpdate(title="Task 0 bis"))
+        
+        assert [task.id for task in task_service.get_all()] == [1, 2, 4, 5]
+    
+    def test_suppression_puis_lecture(self, task_service):
+        """Test qu'une tâche supprimée n'est plus accessible."""
+        from main import TaskCreate, TaskNotFoundError
+        
+        task = task_service.create(TaskCreate(title="Test"))
+        task_service.delete(task.id)
+        
+        with pytest.raises(TaskNotFoundError):
+            task_service.get_by_id(task.id)
+        with pytest.raises(TaskNotFoundError):
+            task_service.delete(task.id)
+    
+    def test_ids_non_reutilises(self, task_service):
+        """Test qu'un ID supprimé n'est jamais réattribué."""
+        from main import TaskCreate
+        
+        task_service.create(TaskCreate(title="A"))
+        task_service.delete(1)
+        task = task_service.create(TaskCreate(title="B"))
+        
+        assert task.id == 2
+
+
 # ============================================================================
 # Tests des Endpoints API
 # ============================================================================
@@ -237,6 +283,385 @@ class TestTaskAPI:
         assert data["en_cours"] == 1
 
 
+class TestPagination:
+    """Tests de la pagination par curseur de GET /tasks."""
+    
+    def test_list_page_service(self, task_service):
+        """Test la pagination au niveau du service."""
+        from main import TaskCreate
+        
+        for i in range(5):
+            task_service.create(TaskCreate(title=f"Task {i}"))
+        task_service.delete(2)
+        
+        page, cursor = task_service.list_page(limit=2)
+        assert [task.id for task in page] == [1, 3]
+        assert cursor == 3
+        
+        page, cursor = task_service.list_page(after_id=cursor, limit=2)
+        assert [task.id for task in page] == [4, 5]
+        assert cursor is None
+    
+    def test_list_page_avec_filtre(self, task_service):
+        """Test que la pagination se combine avec le filtre done."""
+        from main import TaskCreate
+        
+        for i in range(6):
+            task_service.create(TaskCreate(title=f"Task {i}"))
+        for task_id in (2, 4, 5):
+            task_service.toggle(task_id)
+        
+        page, cursor = task_service.list_page(done=True, limit=2)
+        assert [task.id for task in page] == [2, 4]
+        page, cursor = task_service.list_page(done=True, after_id=cursor, limit=2)
+        assert [task.id for task in page] == [5]
+        assert cursor is None
+    
+    def test_pagination_api(self, isolated_client):
+        """Test les en-têtes de pagination de l'API."""
+        for i in range(3):
+            isolated_client.post("/tasks", json={"title": f"Task {i}"})
+        
+        response = isolated_client.get("/tasks?limit=2")
+        assert response.status_code == 200
+        assert [task["id"] for task in response.json()] == [1, 2]
+        assert response.headers["X-Next-Cursor"] == "2"
+        assert 'rel="next"' in response.headers["Link"]
+        
+        response = isolated_client.get("/tasks?limit=2&after_id=2")
+        assert [task["id"] for task in response.json()] == [3]
+        assert "X-Next-Cursor" not in response.headers
+    
+    def test_pagination_limite_invalide(self, isolated_client):
+        """Test qu'une taille de page hors bornes est refusée."""
+        response = isolated_client.get("/tasks?limit=0")
+        assert response.status_code == 422
+
+
+class TestExport:
+    """Tests de l'export NDJSON en flux."""
+    
+    def test_iter_tasks_par_lots(self, task_service):
+        """Test que iter_tasks() parcourt toutes les tâches par lots."""
+        from main import TaskCreate
+        
+        for i in range(7):
+            task_service.create(TaskCreate(title=f"Task {i}"))
+        
+        batches = list(task_service.iter_tasks(batch_size=3))
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert [task.id for batch in batches for task in batch] == list(range(1, 8))
+    
+    def test_export_ndjson(self, isolated_client):
+        """Test l'export NDJSON complet et filtré."""
+        import json
+        
+        for i in range(3):
+            isolated_client.post("/tasks", json={"title": f"Task {i}"})
+        isolated_client.patch("/tasks/2/toggle")
+        
+        response = isolated_client.get("/tasks/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = response.text.splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+        
+        response = isolated_client.get("/tasks/export?done=true")
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [2]
+    
+    def test_negociation_accept(self, isolated_client):
+        """Test que GET /tasks répond en NDJSON si le client le demande."""
+        isolated_client.post("/tasks", json={"title": "Task"})
+        
+        response = isolated_client.get("/tasks", headers={"Accept": "application/x-ndjson"})
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert len(response.text.splitlines()) == 1
+    
+    @pytest.mark.parametrize("query", [
+        "limit=3", "after_id=1", "sort=title", "order=desc", "cursor=abc", "limit=3&sort=title",
+    ])
+    def test_ndjson_sans_pagination_ni_tri(self, isolated_client, query):
+        """Test que la pagination et le tri sont refusés (400) en NDJSON au lieu d'être ignorés."""
+        isolated_client.post("/tasks", json={"title": "Task"})
+        
+        response = isolated_client.get(f"/tasks?{query}", headers={"Accept": "application/x-ndjson"})
+        assert response.status_code == 400
+        assert query.split("=")[0] in response.json()["detail"]
+        response = isolated_client.get(
+            "/tasks?sort=id&order=asc&done=false", headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == 200 and len(response.text.splitlines()) == 1
+
+
+class TestBulkCreate:
+    """Tests de la création en masse."""
+    
+    def test_create_many(self, task_service):
+        """Test la réservation d'une plage d'IDs contiguë."""
+        from main import TaskCreate
+        
+        task_service.create(TaskCreate(title="Avant"))
+        tasks = task_service.create_many([TaskCreate(title=f"Task {i}") for i in range(3)])
+        after = task_service.create(TaskCreate(title="Après"))
+        
+        assert [task.id for task in tasks] == [2, 3, 4]
+        assert after.id == 5
+        assert task_service.get_by_id(3).title == "Task 1"
+        assert [task.id for task in task_service.get_all()] == [1, 2, 3, 4, 5]
+    
+    def test_post_bulk(self, isolated_client):
+        """Test l'endpoint POST /tasks/bulk."""
+        response = isolated_client.post(
+            "/tasks/bulk",
+            json=[{"title": "A"}, {"title": "B", "description": "Desc"}]
+        )
+        assert response.status_code == 201
+        assert response.json() == {"count": 2, "ids": [1, 2]}
+        assert isolated_client.get("/tasks/2").json()["description"] == "Desc"
+    
+    def test_post_bulk_invalide(self, isolated_client):
+        """Test qu'un élément invalide rejette tout le lot."""
+        response = isolated_client.post("/tasks/bulk", json=[{"title": "A"}, {"title": ""}])
+        assert response.status_code == 422
+        assert isolated_client.get("/tasks").json() == []
+
+
+class TestBulkOperations:
+    """Tests des mises à jour, basculements et suppressions en masse."""
+    
+    def test_update_many_par_ids(self, task_service):
+        """Test la mise à jour d'une liste d'IDs, avec un ID inexistant."""
+        from main import TaskCreate, TaskUpdate
+        
+        task_service.create_many([TaskCreate(title=f"Task {i}") for i in range(3)])
+        results = task_service.update_many(TaskUpdate(done=True), ids=[1, 3, 99])
+        
+        assert results == {1: "updated", 3: "updated", 99: "not_found"}
+        assert [task.done for task in task_service.get_all()] == [True, False, True]
+    
+    def test_toggle_many_par_filtre(self, task_service):
+        """Test le basculement de toutes les tâches en cours."""
+        from main import TaskCreate
+        
+        task_service.create_many([TaskCreate(title=f"Task {i}") for i in range(3)])
+        task_service.toggle(2)
+        results = task_service.toggle_many(done=False)
+        
+        assert results == {1: "toggled", 3: "toggled"}
+        assert [task.done for task in task_service.get_all()] == [True, True, True]
+    
+    def test_delete_many_terminees(self, task_service):
+        """Test la purge des tâches terminées en un seul appel."""
+        from main import TaskCreate
+        
+        task_service.create_many([TaskCreate(title=f"Task {i}") for i in range(4)])
+        task_service.toggle(1)
+        task_service.toggle(3)
+        results = task_service.delete_many(done=True)
+        
+        assert results == {1: "deleted", 3: "deleted"}
+        assert [task.id for task in task_service.get_all()] == [2, 4]
+        page, _ = task_service.list_page(limit=10)
+        assert [task.id for task in page] == [2, 4]
+    
+    def test_endpoints_bulk(self, isolated_client):
+        """Test les endpoints de mise à jour, basculement et suppression en masse."""
+        isolated_client.post("/tasks/bulk", json=[{"title": f"Task {i}"} for i in range(3)])
+        
+        response = isolated_client.patch(
+            "/tasks/bulk",
+            json={"ids": [1, 2], "changes": {"title": "Renommée"}}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"matched": 2, "results": {"1": "updated", "2": "updated"}}
+        
+        response = isolated_client.patch("/tasks/bulk/toggle", json={"ids": [2, 7]})
+        assert response.json() == {"matched": 1, "results": {"2": "toggled", "7": "not_found"}}
+        
+        response = isolated_client.post("/tasks/bulk/delete", json={"done": True})
+        assert response.json() == {"matched": 1, "results": {"2": "deleted"}}
+        assert [task["id"] for task in isolated_client.get("/tasks").json()] == [1, 3]
+    
+    def test_selection_invalide(self, isolated_client):
+        """Test qu'il faut fournir exactement un critère de sélection."""
+        assert isolated_client.post("/tasks/bulk/delete", json={}).status_code == 422
+        response = isolated_client.post("/tasks/bulk/delete", json={"ids": [1], "done": True})
+        assert response.status_code == 422
+
+
+class TestCounters:
+    """Tests des compteurs maintenus pour /stats."""
+    
+    def test_compteurs_apres_mutations(self):
+        """Test les compteurs avec vérification de cohérence à chaque mutation."""
+        from main import TaskCreate, TaskUpdate
+        
+        service = TaskService(check_invariants=True)
+        service.create_many([TaskCreate(title=f"Task {i}") for i in range(6)])
+        service.toggle(1)
+        service.update(2, TaskUpdate(done=True))
+        service.update(2, TaskUpdate(done=True))
+        service.toggle_many(ids=[3, 4])
+        service.update_many(TaskUpdate(done=False), ids=[4])
+        service.delete(1)
+        service.delete_many(done=True)
+        
+        assert service.count() == 3
+        assert service.count(done=True) == 0
+        assert service.count(done=False) == 3
+    
+    def test_detection_incoherence(self, task_service, caplog):
+        """Test que check_consistency() détecte et journalise un compteur faussé."""
+        from main import TaskCreate, TaskConsistencyError
+        
+        task = task_service.create(TaskCreate(title="Test"))
+        task.done = True  # Modification hors du service
+        
+        with pytest.raises(TaskConsistencyError):
+            task_service.check_consistency()
+        assert any(
+            record.levelname == "ERROR" and "Stockage incohérent" in record.getMessage()
+            for record in caplog.records
+        )
+    
+    def test_stats_api(self, isolated_client):
+        """Test que /stats s'appuie sur les compteurs du service."""
+        isolated_client.post("/tasks/bulk", json=[{"title": f"Task {i}"} for i in range(4)])
+        isolated_client.patch("/tasks/1/toggle")
+        
+        data = isolated_client.get("/stats").json()
+        assert data == {"total": 4, "en_cours": 3, "terminees": 1, "pourcentage_completion": 25.0}
+
+
+class TestStatusIndex:
+    """Tests de l'index secondaire par statut."""
+    
+    def test_filtre_ordonne_apres_basculements(self):
+        """Test que le filtre par statut reste trié par ID après des basculements."""
+        from main import TaskCreate
+        
+        service = TaskService(check_invariants=True)
+        service.create_many([TaskCreate(title=f"Task {i}") for i in range(6)])
+        for task_id in (5, 2, 4):
+            service.toggle(task_id)
+        service.toggle(4)
+        
+        assert [task.id for task in service.get_all(done=True)] == [2, 5]
+        assert [task.id for task in service.get_all(done=False)] == [1, 3, 4, 6]
+        page, cursor = service.list_page(done=False, after_id=3, limit=1)
+        assert [task.id for task in page] == [4]
+        assert cursor == 4
+
+
+class TestSearch:
+    """Tests de la recherche plein texte."""
+    
+    def test_search_service_incremental(self):
+        """Test que l'index suit les créations, modifications et suppressions."""
+        from main import TaskCreate, TaskUpdate
+        
+        service = TaskService(check_invariants=True)
+        service.create(TaskCreate(title="Préparer la réunion", description="Salle B"))
+        service.create(TaskCreate(title="Réserver la salle"))
+        
+        assert [task.id for task in service.search("salle")] == [2, 1]
+        service.update(2, TaskUpdate(title="Réserver le train"))
+        assert [task.id for task in service.search("salle")] == [1]
+        service.delete(1)
+        assert service.search("reunion") == []
+    
+    def test_search_api(self, isolated_client):
+        """Test l'endpoint GET /tasks/search avec le filtre done."""
+        isolated_client.post("/tasks/bulk", json=[
+            {"title": "Écrire le rapport"},
+            {"title": "Relire le rapport"},
+            {"title": "Envoyer la facture"}
+        ])
+        isolated_client.patch("/tasks/1/toggle")
+        
+        response = isolated_client.get("/tasks/search?q=rapp")
+        assert response.status_code == 200
+        assert [task["id"] for task in response.json()] == [1, 2]
+        
+        response = isolated_client.get("/tasks/search?q=ecrire&done=false")
+        assert response.json() == []
+        
+        assert isolated_client.get("/tasks/search").status_code == 422
+
+
+class TestConditionalRequests:
+    """Tests des versions du stockage et des requêtes conditionnelles."""
+    
+    def test_versions_service(self, task_service):
+        """Test que chaque mutation incrémente la version globale."""
+        from main import TaskCreate, TaskNotFoundError, TaskUpdate
+        
+        assert task_service.version == 0
+        task_service.create(TaskCreate(title="A"))
+        task_service.create(TaskCreate(title="B"))
+        assert task_service.task_version(1) == 1
+        
+        task_service.update(1, TaskUpdate(title="A bis"))
+        assert task_service.version == 3
+        assert task_service.task_version(1) == 3
+        assert task_service.task_version(2) == 2
+        
+        task_service.delete(2)
+        assert task_service.version == 4
+        with pytest.raises(TaskNotFoundError):
+            task_service.task_version(2)
+    
+    def test_etag_liste(self, isolated_client):
+        """Test le 304 sur GET /tasks tant que rien ne change."""
+        isolated_client.post("/tasks", json={"title": "A"})
+        
+        response = isolated_client.get("/tasks")
+        etag = response.headers["ETag"]
+        response = isolated_client.get("/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        
+        isolated_client.patch("/tasks/1/toggle")
+        response = isolated_client.get("/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    
+    def test_etag_tache(self, isolated_client):
+        """Test que l'ETag d'une tâche ne change qu'avec cette tâche."""
+        isolated_client.post("/tasks/bulk", json=[{"title": "A"}, {"title": "B"}])
+        
+        etag = isolated_client.get("/tasks/1").headers["ETag"]
+        isolated_client.patch("/tasks/2/toggle")
+        response = isolated_client.get("/tasks/1", headers={"If-None-Match": f'W/{etag}, "autre"'})
+        assert response.status_code == 304
+        
+        isolated_client.patch("/tasks/1", json={"title": "A bis"})
+        assert isolated_client.get("/tasks/1", headers={"If-None-Match": etag}).status_code == 200
+        assert isolated_client.get("/tasks/99", headers={"If-None-Match": "*"}).status_code == 404
+    
+    def test_etag_stats(self, isolated_client):
+        """Test le 304 sur /stats."""
+        etag = isolated_client.get("/stats").headers["ETag"]
+        assert isolated_client.get("/stats", headers={"If-None-Match": etag}).status_code == 304
+    
+    def test_stats_en_une_lecture(self, isolated_client, monkeypatch):
+        """Test que /stats lit version et compteurs en un seul appel du service."""
+        import main
+        
+        isolated_client.post("/tasks/bulk", json=[{"title": "A"}, {"title": "B"}])
+        isolated_client.patch("/tasks/1/toggle")
+        
+        async def separate_read(*args):
+            raise AssertionError("lecture séparée: une écriture peut s'intercaler")
+        
+        monkeypatch.setattr(main._tasks(), "count", separate_read)
+        monkeypatch.setattr(main._tasks(), "version", separate_read)
+        response = isolated_client.get("/stats")
+        assert response.headers["ETag"] == '"stats-3"'
+        assert response.json() == {"total": 2, "en_cours": 1, "terminees": 1, "pourcentage_completion": 50.0}
+        assert "tasks_done 1" in isolated_client.get("/metrics").text
+
+
 # ============================================================================
 # Tests de Validation
 # ============================================================================
@@ -0,0 +1,126 @@
+"""
+Tests des métriques HTTP (middleware, registre, GET /metrics).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskService
+from metrics import LATENCY_BUCKETS, UNMATCHED_ROUTE, MetricsMiddleware, MetricsRegistry
+
+
+def sample(text, line_prefix):
+    """Renvoie la valeur de la ligne d'exposition qui commence par `line_prefix`."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"Ligne absente: {line_prefix}")
+
+
+@pytest.fixture
+def instrumented():
+    """Application minimale instrumentée et son registre."""
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int) -> dict:
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    @app.get("/boom")
+    def boom() -> dict:
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False), registry
+
+
+class TestRegistry:
+    """Tests du registre et du format d'exposition."""
+
+    def test_histogramme_cumulatif(self):
+        """Test que les seaux sont cumulés et que _count égale le seau +Inf."""
+        registry = MetricsRegistry()
+        for duration in (0.0001, 0.003, 0.003, 10.0):
+            registry.observe("GET", "/tasks", 200, duration)
+        text = registry.render([])
+
+        labels = 'method="GET",route="/tasks"'
+        bucket = "tasks_http_request_duration_seconds_bucket"
+        assert sample(text, f'{bucket}{{{labels},le="0.0005"}}') == 1
+        assert sample(text, f'{bucket}{{{labels},le="0.005"}}') == 3
+        assert sample(text, f'{bucket}{{{labels},le="{LATENCY_BUCKETS[-1]!r}"}}') == 3
+        assert sample(text, f'{bucket}{{{labels},le="+Inf"}}') == 4
+        assert sample(text, f"tasks_http_request_duration_seconds_count{{{labels}}}") == 4
+        assert sample(text, f"tasks_http_request_duration_seconds_sum{{{labels}}}") == pytest.approx(10.0061)
+
+    def test_jauges(self):
+        """Test l'exposition des jauges fournies."""
+        text = MetricsRegistry().render([("tasks_total", "Nombre de tâches.", 3)])
+        assert "# TYPE tasks_total gauge" in text
+        assert sample(text, "tasks_total") == 3
+
+
+class TestMiddleware:
+    """Tests du middleware ASGI."""
+
+    def test_modele_de_route(self, instrumented):
+        """Test que les requêtes sont regroupées par modèle de route, pas par ID."""
+        client, registry = instrumented
+        for item_id in (1, 2, 3):
+            assert client.get(f"/items/{item_id}").status_code == 200
+        text = registry.render([])
+
+        assert sample(text, 'tasks_http_requests_total{method="GET",route="/items/{item_id}"}') == 3
+        assert "/items/1" not in text
+
+    def test_erreurs_par_statut(self, instrumented):
+        """Test le comptage des erreurs par statut, y compris les exceptions."""
+        client, registry = instrumented
+        client.get("/items/0")
+        client.get("/items/abc")
+        assert client.get("/boom").status_code == 500
+        client.get("/inconnu/1")
+        client.get("/inconnu/2")
+        text = registry.render([])
+
+        errors = "tasks_http_errors_total"
+        assert sample(text, f'{errors}{{method="GET",route="/items/{{item_id}}",status="404"}}') == 1
+        assert sample(text, f'{errors}{{method="GET",route="/items/{{item_id}}",status="422"}}') == 1
+        assert sample(text, f'{errors}{{method="GET",route="/boom",status="500"}}') == 1
+        # Les chemins inconnus partagent un seul libellé
+        assert sample(text, f'{errors}{{method="GET",route="{UNMATCHED_ROUTE}",status="404"}}') == 2
+
+
+class TestMetricsEndpoint:
+    """Tests de GET /metrics sur l'API."""
+
+    def test_exposition(self, monkeypatch):
+        """Test le format et les jauges du service."""
+        import main
+
+        service = TaskService()
+        monkeypatch.setattr(main, "task_service", service)
+        client = TestClient(main.app)
+        task_id = client.post("/tasks", json={"title": "Mesurer"}).json()["id"]
+        client.post("/tasks", json={"title": "Exposer"})
+        client.patch(f"/tasks/{task_id}/toggle")
+        client.get(f"/tasks/{task_id}")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert sample(text, "tasks_total") == 2
+        assert sample(text, "tasks_done") == 1
+        assert sample(text, "tasks_store_version") == service.version
+        assert 'route="/tasks/{task_id}"' in text
+        assert f'route="/tasks/{task_id}"' not in text
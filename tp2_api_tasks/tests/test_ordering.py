@@ -0,0 +1,220 @@
+"""
+Tests du tri côté serveur (index de tri maintenus par le service).
+"""
+
+import json
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import TaskService
+from models import Task, TaskCreate, TaskUpdate
+from ordering import SORT_DONE, SORT_ID, SORT_KEYS, SORT_TITLE, TaskOrderIndex, decode_cursor, encode_cursor
+from storage import SQLiteTaskStore
+
+
+TITLES = ["banane", "Abricot", "cerise", "abricot", "Datte", "élan", "Zèbre"]
+
+
+def expected_ids(service, sort, descending=False, done=None):
+    """IDs attendus, par tri complet de la table."""
+    tasks = [task for task in service.get_all() if done is None or task.done == done]
+    return [task.id for task in sorted(tasks, key=SORT_KEYS[sort], reverse=descending)]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def service(request, tmp_path):
+    """Service en mémoire (index de tri maintenus) ou SQLite (tri natif)."""
+    if request.param == "memory":
+        return TaskService(check_invariants=True)
+    return TaskService(SQLiteTaskStore(str(tmp_path / "tasks.db")), check_invariants=True)
+
+
+def sorted_ids(service, sort, descending=False, done=None, limit=None, after=None):
+    """IDs d'une liste triée du service, et la clé de la page suivante."""
+    body, _, next_key, _ = service.list_sorted_json(sort, descending, done, after, limit, ("id",))
+    return [item["id"] for item in json.loads(body)], next_key
+
+
+class TestTaskOrderIndex:
+    """Tests de l'index seul."""
+
+    def test_ordre_et_mises_a_jour(self):
+        """Test le tri sans casse ni accents, l'égalité départagée par l'ID et les mises à jour."""
+        tasks = [Task(id=i, title=title) for i, title in enumerate(TITLES, start=1)]
+        index = TaskOrderIndex(SORT_TITLE, tasks, version=1)
+        assert [key[-1] for key in index.iter_keys()] == [2, 4, 1, 3, 5, 6, 7]
+
+        tasks[0].title, tasks[0].done = "zzz", True
+        index.upsert([tasks[0]])
+        index.remove([2])
+        assert [key[-1] for key in index.iter_keys()] == [4, 3, 5, 6, 7, 1]
+        assert [key[-1] for key in index.iter_keys(done=True)] == [1]
+        assert [key[-1] for key in index.iter_keys(descending=True, after=("datte", 5))] == [3, 4]
+        assert len(index) == 6
+
+    def test_curseur(self):
+        """Test l'aller-retour du curseur et le refus d'un curseur d'un autre tri."""
+        cursor = encode_cursor(SORT_TITLE, "desc", ("elan", 6))
+        assert decode_cursor(SORT_TITLE, "desc", cursor) == ("elan", 6)
+        for field, order, value in [
+            (SORT_TITLE, "asc", cursor),
+            (SORT_DONE, "desc", cursor),
+            (SORT_ID, "asc", "pas-un-curseur"),
+            (SORT_ID, "asc", encode_cursor(SORT_ID, "asc", ("1",))),
+        ]:
+            with pytest.raises(ValueError):
+                decode_cursor(field, order, value)
+
+
+class TestService:
+    """Tests des listes triées du service."""
+
+    def test_coherent_apres_mutations(self, service):
+        """Test que les index maintenus (ou le tri SQLite) donnent le même ordre qu'un tri complet."""
+        rng = random.Random(3)
+        service.create_many([TaskCreate(title=rng.choice(TITLES)) for _ in range(200)])
+        for sort in (SORT_ID, SORT_TITLE, SORT_DONE):
+            sorted_ids(service, sort)
+
+        for _ in range(300):
+            task_id = rng.randint(1, 260)
+            operation = rng.random()
+            try:
+                if operation < 0.3:
+                    service.toggle(task_id)
+                elif operation < 0.6:
+                    service.update(task_id, TaskUpdate(title=rng.choice(TITLES)))
+                elif operation < 0.8:
+                    service.delete(task_id)
+                else:
+                    service.create(TaskCreate(title=rng.choice(TITLES)))
+            except Exception:
+                pass
+
+        for sort in (SORT_ID, SORT_TITLE, SORT_DONE):
+            for descending in (False, True):
+                for done in (None, False, True):
+                    assert sorted_ids(service, sort, descending, done)[0] == expected_ids(
+                        service, sort, descending, done
+                    )
+
+    @pytest.mark.parametrize("sort", [SORT_TITLE, SORT_DONE])
+    @pytest.mark.parametrize("done", [None, False])
+    def test_pagination(self, service, sort, done):
+        """Test que les pages successives couvrent la liste, curseur compris."""
+        service.create_many([TaskCreate(title=title) for title in TITLES * 3])
+        service.toggle_many(ids=[2, 3, 5, 7])
+        expected = expected_ids(service, sort, descending=True, done=done)
+        ids, after = [], None
+        while True:
+            page, after = sorted_ids(service, sort, True, done, limit=4, after=after)
+            ids += page
+            if after is None:
+                break
+            # La dernière tâche lue disparaît: le curseur reste valide
+            service.delete(page[-1])
+        assert ids == expected
+
+    def test_autre_processus(self, tmp_path):
+        """Test que le tri voit les écritures d'un autre service sur la même base."""
+        path = str(tmp_path / "tasks.db")
+        first = TaskService(SQLiteTaskStore(path))
+        second = TaskService(SQLiteTaskStore(path))
+        first.create(TaskCreate(title="banane"))
+        assert sorted_ids(first, SORT_TITLE)[0] == [1]
+        second.create(TaskCreate(title="abricot"))
+        first.create(TaskCreate(title="cerise"))
+        assert sorted_ids(first, SORT_TITLE)[0] == [2, 1, 3]
+        assert first.order_ready(SORT_TITLE)
+
+    def test_base_sans_cle_de_tri(self, tmp_path):
+        """Test qu'une base créée avant le tri reçoit et remplit title_key."""
+        path = str(tmp_path / "tasks.db")
+        SQLiteTaskStore(path).close()
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "DROP INDEX idx_tasks_title; DROP INDEX idx_tasks_done_title; "
+            "ALTER TABLE tasks DROP COLUMN title_key; "
+            "INSERT INTO tasks (id, title, done, version) VALUES (1, 'Été', 0, 1), (2, 'date', 0, 2);"
+        )
+        connection.close()
+        service = TaskService(SQLiteTaskStore(path))
+        assert sorted_ids(service, SORT_TITLE)[0] == [2, 1]
+
+    def test_requetes_servies_par_index(self, tmp_path):
+        """Test que SQLite lit une page triée dans un index, sans tri temporaire."""
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+        plans = []
+        connection = store._connection()
+        connection.set_trace_callback(
+            lambda sql: plans.append(sql) if "ORDER BY" in sql and not sql.startswith("EXPLAIN") else None
+        )
+        for sort, after in [(SORT_TITLE, ("a", 1)), (SORT_DONE, (False, 1)), (SORT_ID, (1,))]:
+            for done in (None, True):
+                store.sorted_page(sort, True, done, after, 10)
+        connection.set_trace_callback(None)
+        for sql in plans:
+            plan = " ".join(row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert "TEMP B-TREE" not in plan and "SCAN" not in plan, (sql, plan)
+
+
+class TestAPI:
+    """Tests des paramètres sort, order et cursor de GET /tasks."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        """Client de test sur un service contenant TITLES."""
+        import main
+
+        service = TaskService()
+        service.create_many([TaskCreate(title=title) for title in TITLES])
+        service.toggle(3)
+        monkeypatch.setattr(main, "task_service", service)
+        return TestClient(main.app)
+
+    def test_tri(self, client):
+        """Test le tri par titre, par statut et l'ordre décroissant."""
+        titles = [task["title"] for task in client.get("/tasks?sort=title").json()]
+        assert titles == ["Abricot", "abricot", "banane", "cerise", "Datte", "élan", "Zèbre"]
+        assert [task["id"] for task in client.get("/tasks?sort=done&order=desc").json()][:2] == [3, 7]
+        assert [task["id"] for task in client.get("/tasks?order=desc&done=false").json()] == [7, 6, 5, 4, 2, 1]
+
+    def test_pages(self, client):
+        """Test la pagination par curseur d'une liste triée."""
+        response = client.get("/tasks?sort=title&limit=3&fields=id")
+        assert response.json() == [{"id": 2}, {"id": 4}, {"id": 1}]
+        cursor = response.headers["x-next-cursor"]
+        assert f"cursor={cursor}" in response.headers["link"]
+        assert client.get(f"/tasks?sort=title&limit=3&fields=id&cursor={cursor}").json() == [
+            {"id": 3}, {"id": 5}, {"id": 6}
+        ]
+
+    def test_titres_accentues(self, client):
+        """Test que les initiales accentuées sont rangées avec leur lettre de base."""
+        import main
+
+        main.task_service.create_many([TaskCreate(title=title) for title in ("Éclair", "date", "Été", "fraise")])
+        titles = [task["title"] for task in client.get("/tasks?sort=title&fields=title").json()]
+        assert titles == [
+            "Abricot", "abricot", "banane", "cerise", "date", "Datte", "Éclair", "élan", "Été", "fraise", "Zèbre"
+        ]
+        descending = [task["title"] for task in client.get("/tasks?sort=title&order=desc&fields=title").json()]
+        assert descending[:3] == ["Zèbre", "fraise", "Été"]
+
+    @pytest.mark.parametrize("query", [
+        "sort=priority",
+        "order=up",
+        "sort=title&after_id=2",
+        "sort=title&cursor=abc",
+        "sort=done&cursor=" + encode_cursor(SORT_TITLE, "asc", ("a", 1)),
+    ])
+    def test_parametres_invalides(self, client, query):
+        """Test les valeurs refusées (422)."""
+        assert client.get(f"/tasks?{query}").status_code == 422
@@ -0,0 +1,152 @@
+"""
+Tests du profilage à la demande des requêtes.
+"""
+
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from async_service import AsyncTaskService
+from main import TaskService
+from models import Task, TaskCreate
+from profiling import PHASES, ProfiledRoute, ProfileStore, ProfilingMiddleware
+from storage import SQLiteTaskStore
+
+
+def server_timing(response):
+    """Durées de l'en-tête Server-Timing, par phase (ms)."""
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response.headers["server-timing"])
+    }
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    """Application minimale avec routes profilées, sur SQLite (appels dans le pool)."""
+    executor = ThreadPoolExecutor(max_workers=2)
+    tasks = AsyncTaskService(TaskService(SQLiteTaskStore(str(tmp_path / "tasks.db"))), executor)
+    store = ProfileStore(max_profiles=2)
+    app = FastAPI()
+    app.router.route_class = ProfiledRoute
+
+    @app.post("/tasks", response_model=Task, status_code=201)
+    async def create(task_create: TaskCreate) -> Task:
+        return await tasks.create(task_create)
+
+    middleware = ProfilingMiddleware(app, store=store, sample_rate=0.0, token="secret")
+    yield TestClient(middleware), store
+    executor.shutdown()
+
+
+class TestProfiling:
+    """Tests du middleware et de la classe de route."""
+
+    def test_server_timing_sans_profil(self, profiled):
+        """Test que chaque réponse a ses phases, sans profil gardé."""
+        client, store = profiled
+        response = client.post("/tasks", json={"title": "Acheter du lait"})
+        timings = server_timing(response)
+        assert set(timings) == set(PHASES) | {"total"}
+        assert timings["service"] > 0
+        assert sum(timings[name] for name in PHASES) <= timings["total"]
+        assert "x-profile-id" not in response.headers and len(store) == 0
+
+    def test_profil_declenche_par_en_tete(self, profiled):
+        """Test qu'un profil est gardé, service inclus, si le jeton correspond."""
+        client, store = profiled
+        assert "x-profile-id" not in client.post(
+            "/tasks", json={"title": "Acheter du lait"}, headers={"X-Profile": "autre"}
+        ).headers
+        response = client.post("/tasks", json={"title": "Acheter du pain"}, headers={"X-Profile": "secret"})
+        record = store.get(int(response.headers["x-profile-id"]))
+        assert record.route == "/tasks" and record.status == 201
+        # Le stockage SQLite n'est appelé que dans le pool: profil du thread fusionné
+        report = record.report(limit=1000)
+        assert "storage.py" in report and "main.py" in report
+
+    def test_validation_echouee(self, profiled):
+        """Test qu'une requête invalide compte dans la phase validation."""
+        client, _ = profiled
+        response = client.post("/tasks", json={})
+        timings = server_timing(response)
+        assert response.status_code == 422
+        assert timings["validation"] > 0 and timings["service"] == timings["serialisation"] == 0
+
+    def test_tampon_circulaire(self, profiled):
+        """Test que seuls les derniers profils sont gardés."""
+        client, store = profiled
+        ids = [
+            int(client.post("/tasks", json={"title": f"Tâche {i}"}, headers={"X-Profile": "secret"})
+                .headers["x-profile-id"])
+            for i in range(3)
+        ]
+        assert [record.id for record in store.records()] == ids[:0:-1]
+        assert store.get(ids[0]) is None
+
+    def test_echantillonnage(self, profiled):
+        """Test qu'un taux de 1 profile toutes les requêtes."""
+        client, store = profiled
+        client.app.sample_rate = 1.0
+        client.post("/tasks", json={"title": "Acheter du lait"})
+        assert len(store) == 1
+
+
+class TestAdmin:
+    """Tests des routes d'administration de main.py."""
+
+    def test_desactive_par_defaut(self):
+        """Test que les routes répondent 404 sans TASKS_PROFILING=1."""
+        import main
+
+        client = TestClient(main.app)
+        assert main.profile_store is None
+        assert client.get("/admin/profiles").status_code == 404
+        assert "server-timing" not in client.get("/stats").headers
+
+    def test_liste_et_rapport(self, monkeypatch, profiled):
+        """Test la liste des profils et le rapport pstats d'un profil."""
+        import main
+
+        client, store = profiled
+        profile_id = client.post(
+            "/tasks", json={"title": "Acheter du lait"}, headers={"X-Profile": "secret"}
+        ).headers["x-profile-id"]
+        monkeypatch.setattr(main, "profile_store", store)
+        monkeypatch.setattr(main, "PROFILING_TOKEN", "secret")
+        admin = TestClient(main.app, headers={"X-Profile": "secret"})
+
+        summaries = admin.get("/admin/profiles").json()
+        assert summaries[0]["id"] == int(profile_id) and set(summaries[0]["phases_ms"]) == set(PHASES)
+        report = admin.get(f"/admin/profiles/{profile_id}", params={"sort": "tottime", "limit": 5})
+        assert report.status_code == 200 and report.text.startswith("POST /tasks -> 201")
+        assert admin.get(f"/admin/profiles/{profile_id}", params={"sort": "nom"}).status_code == 422
+        assert admin.get("/admin/profiles/999").status_code == 404
+
+    @pytest.mark.parametrize("token, headers", [
+        ("secret", {}),
+        ("secret", {"X-Profile": "autre"}),
+        (None, {"X-Profile": "1"}),
+    ])
+    def test_jeton_exige(self, monkeypatch, profiled, token, headers):
+        """Test que les profils ne sont servis qu'avec le jeton configuré (403 sinon)."""
+        import main
+
+        client, store = profiled
+        profile_id = client.post(
+            "/tasks", json={"title": "Acheter du lait"}, headers={"X-Profile": "secret"}
+        ).headers["x-profile-id"]
+        monkeypatch.setattr(main, "profile_store", store)
+        monkeypatch.setattr(main, "PROFILING_TOKEN", token)
+        admin = TestClient(main.app)
+
+        for path in ("/admin/profiles", f"/admin/profiles/{profile_id}"):
+            response = admin.get(path, headers=headers)
+            assert response.status_code == 403 and "storage.py" not in response.text
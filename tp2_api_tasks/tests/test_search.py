@@ -0,0 +1,76 @@
+"""
+Tests unitaires de l'index de recherche plein texte.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from search import InvertedIndex, normalize, tokenize
+
+
+class TestNormalisation:
+    """Tests de la normalisation des mots."""
+    
+    def test_accents_et_casse(self):
+        """Test le retrait des accents et des majuscules."""
+        assert normalize("Élève À l'École") == "eleve a l'ecole"
+    
+    def test_tokenize(self):
+        """Test le découpage en mots, ligatures comprises."""
+        assert tokenize("Cœur_de-métier, 2024!") == ["coeur", "de", "metier", "2024"]
+        assert tokenize(None) == []
+
+
+class TestInvertedIndex:
+    """Tests de l'index inversé."""
+    
+    def test_recherche_exacte_et_prefixe(self):
+        """Test la recherche par mot exact et par préfixe."""
+        index = InvertedIndex()
+        index.index(1, "Acheter du lait", None)
+        index.index(2, "Achat groupé", "acheter en gros")
+        index.index(3, "Appeler le plombier", None)
+        
+        assert [task_id for task_id, _ in index.search("ach", 10)] == [1, 2]
+        assert [task_id for task_id, _ in index.search("acheter", 10)] == [1, 2]
+        assert index.search("xyz", 10) == []
+    
+    def test_tous_les_mots_requis(self):
+        """Test que tous les mots de la requête doivent être présents."""
+        index = InvertedIndex()
+        index.index(1, "Acheter du lait", None)
+        index.index(2, "Acheter du pain", None)
+        
+        assert [task_id for task_id, _ in index.search("ache lai", 10)] == [1]
+    
+    def test_classement_titre_avant_description(self):
+        """Test qu'un mot du titre pèse plus qu'un mot de la description."""
+        index = InvertedIndex()
+        index.index(1, "Courses", "penser au fromage")
+        index.index(2, "Fromage", None)
+        
+        assert [task_id for task_id, _ in index.search("fromage", 10)] == [2, 1]
+    
+    def test_reindexation_et_suppression(self):
+        """Test la mise à jour incrémentale de l'index."""
+        index = InvertedIndex()
+        index.index(1, "Réunion équipe", None)
+        index.index(1, "Déjeuner équipe", None)
+        
+        assert index.search("reunion", 10) == []
+        assert [task_id for task_id, _ in index.search("dejeuner", 10)] == [1]
+        
+        index.remove(1)
+        assert index.search("equipe", 10) == []
+        assert len(index) == 0
+    
+    def test_filtre_et_limite(self):
+        """Test le filtre sur les IDs et la limite de résultats."""
+        index = InvertedIndex()
+        for task_id in range(1, 6):
+            index.index(task_id, "Tâche récurrente", None)
+        
+        results = index.search("tache", 2, accept=lambda task_id: task_id % 2 == 1)
+        assert [task_id for task_id, _ in results] == [1, 3]
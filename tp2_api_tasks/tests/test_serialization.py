@@ -0,0 +1,229 @@
+"""
+Tests de la sérialisation JSON rapide et du cache des tâches encodées.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import serialization
+from async_service import AsyncTaskService
+from main import TaskService
+from models import Task, TaskCreate, TaskUpdate
+from serialization import TaskJSONCache, encode_projection, encode_task, encode_task_fields, parse_fields
+
+
+TASKS = [
+    Task(id=1, title="Acheter du lait", done=True),
+    Task(id=2, title='Tâche "citée" \\ € 😀\n\x01', description="Détails fin"),
+]
+
+
+@pytest.fixture
+def isolated_client(monkeypatch):
+    """Client de test branché sur un service de tâches vierge."""
+    import main
+
+    service = TaskService(check_invariants=True)
+    monkeypatch.setattr(main, "task_service", service)
+    return TestClient(main.app), service
+
+
+class TestEncoding:
+    """Tests de l'encodage des tâches."""
+
+    @pytest.mark.parametrize("task", TASKS, ids=["simple", "caracteres-speciaux"])
+    def test_identique_a_fastapi(self, task):
+        """Test que les octets sont ceux de JSONResponse (sans validation)."""
+        assert encode_task(task) == JSONResponse(task.model_dump()).body
+
+    def test_repli_sur_json(self, monkeypatch):
+        """Test que le repli sans orjson produit les mêmes octets."""
+        expected = [encode_task(task) for task in TASKS]
+        monkeypatch.setattr(serialization, "dumps", serialization._json_dumps)
+        assert [encode_task(task) for task in TASKS] == expected
+
+
+class TestProjection:
+    """Tests de la projection des champs (?fields=)."""
+
+    def test_parse_fields(self):
+        """Test l'ordre du modèle, les doublons et les champs inconnus."""
+        assert parse_fields("done,id, done") == ("id", "done")
+        with pytest.raises(ValueError, match="inconnus: secret"):
+            parse_fields("id,secret")
+        with pytest.raises(ValueError):
+            parse_fields(" , ")
+
+    def test_encodage(self):
+        """Test que seuls les champs demandés sont encodés."""
+        assert encode_task_fields(TASKS[1], ("title",)) == JSONResponse({"title": TASKS[1].title}).body
+        assert json.loads(encode_projection(TASKS, ("id", "done"))) == [
+            {"id": 1, "done": True}, {"id": 2, "done": False}
+        ]
+        assert encode_projection([], ("id",)) == b"[]"
+
+
+class TestCache:
+    """Tests du cache par version."""
+
+    def test_invalidation_par_version(self):
+        """Test qu'une nouvelle version réencode la tâche."""
+        cache = TaskJSONCache()
+        task = Task(id=1, title="Avant")
+        first = cache.encode(task, 1)
+        task.title = "Après"
+        assert cache.encode(task, 1) is first
+        assert json.loads(cache.encode(task, 2))["title"] == "Après"
+
+    def test_liste(self):
+        """Test l'assemblage d'un tableau JSON à partir des fragments."""
+        cache = TaskJSONCache()
+        loaded = []
+
+        def load(task_ids):
+            loaded.append(task_ids)
+            return [task for task in TASKS if task.id in task_ids]
+
+        assert cache.encode_list([], [], load) == b"[]"
+        body = cache.encode_list([1, 2], [1, 1], load)
+        assert json.loads(body) == [task.model_dump() for task in TASKS]
+        assert cache.encode_list([1, 2], [1, 2], load) == body
+        # Seule la tâche d'une autre version est rechargée; une tâche
+        # supprimée entre-temps est omise
+        assert loaded == [[1, 2], [2]]
+        assert json.loads(cache.encode_list([1, 3], [1, 1], load)) == [TASKS[0].model_dump()]
+        cache.discard([1, 42])
+        assert len(cache) == 1
+
+    def test_desactive(self):
+        """Test qu'un cache désactivé encode sans rien garder."""
+        cache = TaskJSONCache(enabled=False)
+        assert cache.encode_list([1], [1], lambda task_ids: TASKS[:1]) == b"[" + encode_task(TASKS[0]) + b"]"
+        assert cache.encode(TASKS[1], 1) == encode_task(TASKS[1])
+        assert len(cache) == 0
+
+
+class TestService:
+    """Tests des lectures JSON du service."""
+
+    def test_mises_a_jour_visibles(self):
+        """Test que les modifications et suppressions invalident le cache."""
+        service = TaskService(check_invariants=True)
+        task = service.create(TaskCreate(title="Initiale"))
+        service.create(TaskCreate(title="Autre"))
+        service.get_all_json()
+
+        service.update(task.id, TaskUpdate(title="Modifiée"))
+        service.toggle(task.id)
+        body, count, _ = service.get_all_json()
+        assert count == 2
+        assert json.loads(body)[0] == {"id": 1, "title": "Modifiée", "done": True, "description": None}
+
+        service.delete(task.id)
+        assert [item["id"] for item in json.loads(service.get_all_json()[0])] == [2]
+        assert len(service._json) == 1
+
+    def test_pages(self):
+        """Test la pagination JSON et son curseur."""
+        service = TaskService()
+        for i in range(5):
+            service.create(TaskCreate(title=f"Tâche {i}"))
+        body, count, next_cursor, _ = service.list_page_json(after_id=1, limit=2)
+        assert [item["id"] for item in json.loads(body)] == [2, 3]
+        assert (count, next_cursor) == (2, 3)
+        assert service.list_page_json(after_id=3, limit=2)[2] is None
+
+    def test_ecriture_pendant_la_lecture(self, monkeypatch):
+        """Test qu'une écriture ne s'intercale pas entre versions et tâches d'une liste."""
+        service = TaskService()
+        service.create(TaskCreate(title="Initiale"))
+        before = service.version
+        get_many = service._store.get_many
+        writers = []
+
+        def slow_get_many(task_ids):
+            # Lance une écriture concurrente et lui laisse le temps d'aboutir
+            writer = threading.Thread(target=service.update, args=(1, TaskUpdate(title="Modifiée")))
+            writer.start()
+            writer.join(0.2)
+            writers.append(writer)
+            return get_many(task_ids)
+
+        monkeypatch.setattr(service._store, "get_many", slow_get_many)
+        body, _, version = service.get_all_json()
+        writers[0].join()
+        monkeypatch.setattr(service._store, "get_many", get_many)
+
+        assert version == before and json.loads(body)[0]["title"] == "Initiale"
+        body, _, version = service.get_all_json()
+        assert version > before and json.loads(body)[0]["title"] == "Modifiée"
+
+
+class TestAPI:
+    """Tests des réponses HTTP pré-encodées."""
+
+    def test_reponses(self, isolated_client):
+        """Test GET /tasks et GET /tasks/{id}: corps, type et en-têtes."""
+        client, service = isolated_client
+        created = client.post("/tasks", json={"title": "Été", "description": "Plage"}).json()
+        client.post("/tasks", json={"title": "Hiver"})
+
+        response = client.get("/tasks")
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"] == f'"tasks-{service.version}"'
+        assert response.json()[0] == created
+
+        response = client.get("/tasks?limit=1")
+        assert [task["id"] for task in response.json()] == [1]
+        assert response.headers["x-next-cursor"] == "1"
+
+        client.patch("/tasks/1", json={"title": "Automne"})
+        response = client.get("/tasks/1")
+        assert response.json()["title"] == "Automne"
+        assert response.headers["etag"] == f'"task-1-{service.task_version(1)}"'
+        assert client.get("/tasks/99").status_code == 404
+
+    def test_etag_du_corps_envoye(self, isolated_client, monkeypatch):
+        """Test que l'ETag de GET /tasks vient de la version lue avec le corps."""
+        client, service = isolated_client
+        client.post("/tasks", json={"title": "Été"})
+        before = service.version
+
+        async def version_then_write(self):
+            # Écriture entre le contrôle If-None-Match et la lecture du corps
+            version = self.service.version
+            self.service.update(1, TaskUpdate(title=f"Hiver {version}"))
+            return version
+
+        monkeypatch.setattr(AsyncTaskService, "version", version_then_write)
+        for url in ("/tasks", "/tasks?limit=10", "/tasks?sort=title", "/tasks?fields=id,title"):
+            response = client.get(url)
+            assert response.headers["etag"] == f'"tasks-{service.version}"' != f'"tasks-{before}"'
+            assert response.json()[0]["title"] == f"Hiver {before}"
+            before = service.version
+
+    def test_projection(self, isolated_client):
+        """Test le paramètre fields de GET /tasks et GET /tasks/{id}."""
+        client, _ = isolated_client
+        client.post("/tasks", json={"title": "Été", "description": "Plage" * 500})
+        client.post("/tasks", json={"title": "Hiver"})
+
+        assert client.get("/tasks?fields=id,done").json() == [{"id": 1, "done": False}, {"id": 2, "done": False}]
+        response = client.get("/tasks?fields=id&limit=1")
+        assert response.json() == [{"id": 1}] and response.headers["x-next-cursor"] == "1"
+        assert client.get("/tasks/1?fields=done,title").json() == {"title": "Été", "done": False}
+        assert client.get("/tasks?fields=id,title,done,description").json() == client.get("/tasks").json()
+        ndjson = client.get("/tasks?fields=id", headers={"Accept": "application/x-ndjson"})
+        assert ndjson.text == '{"id":1}\n{"id":2}\n'
+
+        response = client.get("/tasks?fields=id,secret")
+        assert response.status_code == 422 and "secret" in response.json()["detail"]
+        assert client.get("/tasks/99?fields=id").status_code == 404
@@ -0,0 +1,339 @@
+"""
+Tests des backends de stockage: même contrat pour la mémoire, SQLite et le journal.
+"""
+
+import multiprocessing
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import compact
+from compact import CompactTaskStore
+from journal import JournaledTaskStore
+from main import TaskService
+from models import Task, TaskCreate, TaskUpdate
+from storage import MemoryTaskStore, SQLiteTaskStore, create_store
+
+
+@pytest.fixture(params=["memory", "sqlite", "journal", "compact"])
+def store(request, tmp_path):
+    """Instancie chaque backend de stockage."""
+    if request.param == "memory":
+        backend = MemoryTaskStore()
+    elif request.param == "sqlite":
+        backend = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    elif request.param == "journal":
+        backend = JournaledTaskStore(str(tmp_path / "journal"))
+    else:
+        backend = CompactTaskStore()
+    yield backend
+    backend.close()
+
+
+def create_in_process(path, count):
+    """Crée `count` tâches depuis un processus distinct (cible de multiprocessing)."""
+    service = TaskService(SQLiteTaskStore(path))
+    for i in range(count):
+        task = service.create(TaskCreate(title=f"Tâche {i}"))
+        if i % 2:
+            service.toggle(task.id)
+    service.store.close()
+
+
+def make_tasks(store, *titles):
+    """Réserve des IDs et insère une tâche par titre."""
+    first_id = store.allocate_ids(len(titles))
+    tasks = [Task(id=first_id + i, title=title) for i, title in enumerate(titles)]
+    store.insert(tasks)
+    return tasks
+
+
+class TestStoreContract:
+    """Contrat commun des backends."""
+    
+    def test_insertion_et_lecture(self, store):
+        """Test l'insertion, la lecture par ID et la pagination."""
+        make_tasks(store, "A", "B", "C")
+        
+        assert store.get(2).title == "B"
+        assert store.get(99) is None
+        assert [task.id for task in store.get_many([3, 99, 1])] == [3, 1]
+        assert [task.id for task in store.page(after_id=1, limit=1)] == [2]
+        assert [task.id for task in store.page()] == [1, 2, 3]
+        assert store.count() == 3
+    
+    def test_mises_a_jour_et_versions(self, store):
+        """Test update, toggle, compteurs et versions."""
+        make_tasks(store, "A", "B")
+        version = store.version
+        
+        updated = store.update([1, 42], {"title": "A bis", "done": True})
+        assert [task.title for task in updated] == ["A bis"]
+        assert store.get(1).done is True
+        assert store.version > version
+        assert store.task_version(1) == store.version
+        
+        store.toggle([1, 2])
+        assert store.ids(done=True) == [2]
+        assert store.count(done=False) == 1
+        assert [task.id for task in store.page(done=True)] == [2]
+        store.check_consistency()
+    
+    def test_versions_d_une_page(self, store):
+        """Test que page_versions() renvoie les IDs de la page et leurs versions."""
+        make_tasks(store, "A", "B", "C")
+        store.toggle([2])
+        
+        assert store.page_versions(after_id=1) == ([2, 3], [store.task_version(2), store.task_version(3)])
+        assert store.page_versions(done=True)[0] == [2]
+        assert store.page_versions(limit=2)[0] == [1, 2]
+    
+    def test_mise_a_jour_sans_changement(self, store):
+        """Test qu'une valeur identique ne change pas la version."""
+        make_tasks(store, "A")
+        version = store.version
+        
+        store.update([1], {"title": "A", "done": False})
+        assert store.version == version
+    
+    def test_suppression(self, store):
+        """Test la suppression et les compteurs associés."""
+        make_tasks(store, "A", "B", "C")
+        store.toggle([2])
+        
+        deleted = store.delete([2, 3, 7])
+        assert [task.id for task in deleted] == [2, 3]
+        assert store.count() == 1
+        assert store.count(done=True) == 0
+        assert store.task_version(2) is None
+        store.check_consistency()
+    
+    def test_prefixe_partage_par_beaucoup_de_mots(self, store, tmp_path):
+        """Test qu'un préfixe commun à plus de 200 mots trouve les mêmes tâches que SQLite."""
+        titles = [f"a{i:04d}word" for i in range(500)]
+        reference = SQLiteTaskStore(str(tmp_path / "reference.db"))
+        make_tasks(reference, *titles)
+        make_tasks(store, *titles)
+        expected = {task.id for task in reference.search("a", None, 1000)}
+        assert len(expected) == 500
+        assert {task.id for task in store.search("a", None, 1000)} == expected
+        assert len(store.search("a0", None, 300)) == 300
+        reference.close()
+    
+    def test_compteurs(self, store):
+        """Test que counters() renvoie version, total et terminées."""
+        make_tasks(store, "A", "B", "C")
+        store.toggle([1, 3])
+        store.delete([3])
+        assert store.counters() == (store.version, 2, 1) == (6, store.count(), store.count(done=True))
+    
+    def test_recherche(self, store):
+        """Test la recherche plein texte, avec accents et préfixes."""
+        make_tasks(store, "Préparer la réunion", "Réserver la salle", "Réunion d'équipe")
+        store.toggle([3])
+        
+        assert {task.id for task in store.search("reun", None, 10)} == {1, 3}
+        assert [task.id for task in store.search("reunion equi", None, 10)] == [3]
+        assert [task.id for task in store.search("reunion", False, 10)] == [1]
+        store.update([2], {"title": "Réserver le train"})
+        assert store.search("salle", None, 10) == []
+    
+    def test_ids_alloues_uniques(self, store):
+        """Test que les plages d'IDs ne se chevauchent pas."""
+        first = store.allocate_ids(10)
+        second = store.allocate_ids()
+        assert second == first + 10
+
+
+class TestMemoryStore:
+    """Tests spécifiques au backend en mémoire."""
+    
+    def test_dump_et_restore(self):
+        """Test qu'un stockage restauré reproduit l'état et les versions."""
+        store = MemoryTaskStore()
+        make_tasks(store, "Préparer la réunion", "Réserver la salle", "Appeler")
+        store.toggle([2])
+        store.delete([3])
+        
+        restored = MemoryTaskStore.restore(*store.dump())
+        assert restored.dump() == store.dump()
+        assert restored.ids(done=True) == [2]
+        assert restored.task_version(1) == store.task_version(1)
+        assert [task.id for task in restored.search("reun", None, 10)] == [1]
+        assert restored.allocate_ids() == 4
+        restored.check_consistency()
+    
+    def test_index_plein_texte_construit_a_la_demande(self):
+        """Test que les écritures avant la première recherche sont prises en compte."""
+        restored = MemoryTaskStore.restore([(1, "Acheter du pain", None, False, 1)], 1, 2)
+        make_tasks(restored, "Acheter du lait")
+        restored.update([1], {"title": "Vendre du pain"})
+        
+        assert [task.id for task in restored.search("acheter", None, 10)] == [2]
+        restored.check_consistency()
+
+
+class TestCompactStore:
+    """Tests spécifiques au backend en colonnes."""
+    
+    def test_insertion_dans_le_desordre(self):
+        """Test des IDs insérés hors d'ordre et des IDs réservés jamais insérés."""
+        store = CompactTaskStore()
+        first = store.allocate_ids(4)
+        store.insert([Task(id=first + 3, title="D", done=True)])
+        store.insert([Task(id=first, title="A", description="Détails")])
+        
+        assert store.ids() == [1, 4]
+        assert store.get(2) is None and store.task_version(2) is None
+        assert store.get(1).description == "Détails"
+        assert store.page_versions(done=True) == ([4], [1])
+        store.check_consistency()
+    
+    def test_compactage(self, monkeypatch):
+        """Test que le texte remplacé ou supprimé est récupéré sans altérer les tâches."""
+        monkeypatch.setattr(compact, "_COMPACT_MIN_BYTES", 64)
+        store = CompactTaskStore()
+        make_tasks(store, *(f"Tâche {i}" for i in range(20)))
+        store.delete([3])
+        for round_ in range(5):
+            store.update(list(range(1, 21)), {"description": f"Révision {round_} ✓"})
+        
+        live = sum(len(compact._record(task.title, task.description)) for task in store.page())
+        text, _ = store._packed
+        assert len(text) <= 2 * live
+        assert store.get(20).title == "Tâche 19"
+        assert store.get(20).description == "Révision 4 ✓"
+        assert store.count() == 19
+        store.check_consistency()
+    
+    def test_service(self):
+        """Test le service complet sur le backend en colonnes."""
+        service = TaskService(CompactTaskStore(), check_invariants=True)
+        service.create_many([TaskCreate(title=f"Réunion {i}") for i in range(5)])
+        service.toggle_many([2, 4])
+        service.update(3, TaskUpdate(title="Appeler", done=True))
+        service.delete(5)
+        
+        assert service.count() == 4 and service.count(done=True) == 3
+        assert [task.id for task in service.list_page(done=True, limit=2)[0]] == [2, 3]
+        assert [task.id for task in service.search("reunion", done=False)] == [1]
+        body, count, _ = service.get_all_json(done=True)
+        assert count == 3 and b'"title":"Appeler","done":true' in body
+    
+    def test_plus_compact_que_la_memoire(self):
+        """Test que les colonnes occupent moins de 64 octets par tâche courte."""
+        store = CompactTaskStore()
+        make_tasks(store, *(f"Tâche {i}" for i in range(1000)))
+        assert store.memory_usage() < 64 * 1000
+
+
+class TestSQLiteStore:
+    """Tests spécifiques au backend SQLite."""
+    
+    def test_persistance(self, tmp_path):
+        """Test que les données survivent à la réouverture de la base."""
+        path = str(tmp_path / "tasks.db")
+        service = TaskService(SQLiteTaskStore(path))
+        service.create(TaskCreate(title="Durable"))
+        service.update(1, TaskUpdate(done=True))
+        version = service.version
+        service.store.close()
+        
+        reopened = TaskService(SQLiteTaskStore(path), check_invariants=True)
+        assert reopened.get_by_id(1).done is True
+        assert reopened.version == version
+        assert reopened.create(TaskCreate(title="Suivante")).id == 2
+        reopened.store.close()
+    
+    def test_mode_wal_et_connexions_par_thread(self, tmp_path):
+        """Test le mode WAL et l'usage d'une connexion par thread."""
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+        mode = store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+        
+        threads = [threading.Thread(target=store.count) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(store._connections) == 4
+        store.close()
+    
+    def test_synchronous(self, tmp_path):
+        """Test que chaque commit est durable par défaut (synchronous=FULL), NORMAL sur demande."""
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+        assert store._connection().execute("PRAGMA synchronous").fetchone()[0] == 2
+        store.close()
+        store = create_store("sqlite", str(tmp_path / "tasks.db"), sqlite_synchronous="normal")
+        assert store._connection().execute("PRAGMA synchronous").fetchone()[0] == 1
+        store.close()
+        with pytest.raises(ValueError):
+            SQLiteTaskStore(str(tmp_path / "tasks.db"), "FULL; DROP TABLE tasks")
+    
+    def test_service_sqlite(self, tmp_path):
+        """Test le service complet sur SQLite, opérations en masse comprises."""
+        service = TaskService(SQLiteTaskStore(str(tmp_path / "tasks.db")), check_invariants=True)
+        service.create_many([TaskCreate(title=f"Tâche {i}") for i in range(5)])
+        service.toggle_many(ids=[1, 2, 3])
+        
+        assert service.delete_many(done=True) == {1: "deleted", 2: "deleted", 3: "deleted"}
+        page, cursor = service.list_page(limit=1)
+        assert [task.id for task in page] == [4]
+        assert cursor == 4
+        service.store.close()
+
+
+    def test_transaction_englobante(self, tmp_path):
+        """Test que les écritures d'une transaction englobante sont annulées ensemble."""
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+        make_tasks(store, "A")
+        
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                make_tasks(store, "B")
+                store.toggle([1])
+                raise RuntimeError("annulation")
+        
+        assert store.count() == 1
+        assert store.get(1).done is False
+        store.check_consistency()
+        store.close()
+    
+    def test_plusieurs_processus(self, tmp_path):
+        """Test que plusieurs processus partagent la base sans collision d'IDs."""
+        path = str(tmp_path / "tasks.db")
+        SQLiteTaskStore(path).close()
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=create_in_process, args=(path, 25)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert all(process.exitcode == 0 for process in processes)
+        
+        store = SQLiteTaskStore(path)
+        assert store.ids() == list(range(1, 101))
+        assert store.count(done=True) == 48
+        store.check_consistency()
+        store.close()
+
+
+class TestCreateStore:
+    """Tests de la sélection du backend par configuration."""
+    
+    def test_backends(self, tmp_path):
+        """Test la création de chaque backend et le rejet d'un nom inconnu."""
+        assert isinstance(create_store("memory"), MemoryTaskStore)
+        store = create_store("sqlite", str(tmp_path / "tasks.db"))
+        assert isinstance(store, SQLiteTaskStore)
+        store.close()
+        store = create_store("journal", journal_dir=str(tmp_path / "journal"))
+        assert isinstance(store, JournaledTaskStore)
+        store.close()
+        assert isinstance(create_store("compact"), CompactTaskStore)
+        with pytest.raises(ValueError):
+            create_store("redis")